@@ -0,0 +1,30 @@
+import json
+import os
+
+import numpy as np
+
+from BrothersTrusts.CoinSniper.Backtest.app import Backtester, load_price_paths, load_signals
+
+
+def run_local(prices_path=None, output_path=None):
+    path = prices_path or os.getenv("BACKTEST_PRICES")
+    if not path:
+        raise ValueError("Provide a price path file via argument or BACKTEST_PRICES env var.")
+    contracts, times, prices = load_price_paths(path)
+    signals = load_signals()
+    opened_at = np.array([
+        (signals.get(contract) or {}).get("created_at") or np.nan for contract in contracts
+    ])
+
+    result = Backtester().run(contracts, times, prices, opened_at=opened_at)
+    print(json.dumps(result["summary"], indent=2))
+
+    output_path = output_path or os.getenv("BACKTEST_OUTPUT")
+    if output_path:
+        with open(output_path, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"Wrote {len(result['fills'])} fills to {output_path}")
+
+
+if __name__ == "__main__":
+    run_local()
@@ -0,0 +1,240 @@
+import glob
+import json
+import os
+
+import numpy as np
+
+from BrothersTrusts.CoinSniper.Shared.contracts import extract_contracts_from_tweets
+from BrothersTrusts.CoinSniper.Shared.strategy import (
+    SELL_REASONS,
+    evaluate_exits,
+    exit_params_from_env,
+    sell_reason_label,
+)
+from BrothersTrusts.CoinSniper.Twitter.app import parse_created_at
+from BrothersTrusts.CoinSniper.Twitter.parse import iter_tweet_file
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SIGNAL_PATHS = [os.path.join(REPO_ROOT, "results.json")] + sorted(
+    glob.glob(os.path.join(REPO_ROOT, "Twitter-Test-Data", "*.json"))
+)
+
+
+def load_signals(paths=None):
+    """First sighting of every contract in recorded TweetScout dumps, streamed
+    a tweet at a time so a multi-GB recording loads in constant memory.
+
+    Returns `{contract: {"handle": ..., "created_at": unix_ts, "tweet_id": ...}}`.
+    """
+    signals = {}
+    for path in paths or DEFAULT_SIGNAL_PATHS:
+        for tweet in iter_tweet_file(path):
+            created_at = parse_created_at(tweet["created_at"])
+            for contract in extract_contracts_from_tweets([tweet]):
+                known = signals.get(contract)
+                if known and known["created_at"] is not None and (created_at is None or known["created_at"] <= created_at):
+                    continue
+                signals[contract] = {
+                    "handle": tweet.get("screen_name"),
+                    "created_at": created_at,
+                    "tweet_id": tweet["id_str"] or None,
+                }
+    return signals
+
+
+def align_price_paths(price_paths):
+    """Pack `{contract: [[timestamp, price], ...]}` into `(contracts, times, prices)`
+    arrays of shape (N, T), padding shorter paths with NaN."""
+    contracts = list(price_paths)
+    ticks = max((len(path) for path in price_paths.values()), default=0)
+    times = np.full((len(contracts), ticks), np.nan)
+    prices = np.full((len(contracts), ticks), np.nan)
+    for row, contract in enumerate(contracts):
+        path = np.asarray(price_paths[contract], dtype=float).reshape(-1, 2)
+        times[row, :len(path)] = path[:, 0]
+        prices[row, :len(path)] = path[:, 1]
+    return contracts, times, prices
+
+
+def mask_before_open(times, prices, opened_at=None):
+    """Blank out quotes before each position opened; a missing (None/NaN)
+    `opened_at` falls back to the contract's first quote. Returns `(prices, opened_at)`."""
+    prices = np.asarray(prices, dtype=float)
+    first_quote = np.fmin.reduce(np.where(np.isnan(prices), np.nan, times), axis=1)
+    if opened_at is None:
+        opened_at = first_quote
+    opened_at = np.asarray(opened_at, dtype=float)
+    opened_at = np.where(np.isnan(opened_at), first_quote, opened_at)
+    with np.errstate(invalid="ignore"):
+        prices = np.where(times >= opened_at[:, None], prices, np.nan)
+    return prices, opened_at
+
+
+def load_price_paths(path):
+    with open(path) as f:
+        return align_price_paths(json.load(f))
+
+
+class Backtester:
+    """Replays `TelegramBot.apply_prices` / `evaluate_sell` over recorded price paths.
+
+    Every contract is a row and every poll cycle a column, so a tick is one set
+    of NumPy operations across all contracts. The rule order, early returns and
+    float rounding follow the live code exactly; `tests/test_backtest.py` holds
+    the two to the same fills tick for tick.
+    """
+
+    def __init__(self, **overrides):
+        params = exit_params_from_env()
+        unknown = set(overrides) - set(params)
+        if unknown:
+            raise ValueError(f"Unknown exit parameters: {sorted(unknown)}")
+        params.update(overrides)
+        self.max_hold_seconds = params["max_hold_seconds"]
+        self.time_exit_multiplier = params["time_exit_multiplier"]
+        self.trailing_start_multiplier = params["trailing_start_multiplier"]
+        self.trailing_stop_factor = params["trailing_stop_factor"]
+        self.hard_stop_factor = params["hard_stop_factor"]
+        self.take_profit_levels = [tuple(level) for level in params["take_profit_levels"]]
+
+    @classmethod
+    def from_bot(cls, bot):
+        return cls(
+            max_hold_seconds=bot.max_hold_seconds,
+            time_exit_multiplier=bot.time_exit_multiplier,
+            trailing_start_multiplier=bot.trailing_start_multiplier,
+            trailing_stop_factor=bot.trailing_stop_factor,
+            hard_stop_factor=bot.hard_stop_factor,
+            take_profit_levels=bot.take_profit_levels,
+        )
+
+    def simulate(self, prices, times, opened_at, entries=None):
+        """Run the exit rules over `prices` (N, T); NaN or <= 0 means no quote that tick.
+
+        `times` is (N, T) or (T,), `opened_at` is (N,), `entries` optionally seeds
+        the entry price the way `buy_token` does. Returns the final position
+        arrays plus one array per fill column.
+        """
+        prices = np.asarray(prices, dtype=float)
+        count, ticks = prices.shape
+        times = np.broadcast_to(np.asarray(times, dtype=float), prices.shape)
+        opened_at = np.broadcast_to(np.asarray(opened_at, dtype=float), (count,))
+
+        entry = np.zeros(count) if entries is None else np.nan_to_num(np.asarray(entries, dtype=float)).copy()
+        high = entry.copy()
+        last_price = entry.copy()
+        sold = np.zeros(count)
+
+        fill_rows, fill_ticks, fill_pct, fill_price, fill_reason, fill_level = [], [], [], [], [], []
+
+        for tick in range(ticks):
+            price = prices[:, tick]
+            with np.errstate(invalid="ignore"):
+                active = (sold < 1.0) & (price > 0)
+            if not active.any():
+                if (sold >= 1.0).all():
+                    break
+                continue
+
+            fresh = active & (entry == 0.0)
+            entry[fresh] = price[fresh]
+            high[fresh] = price[fresh]
+            high[active] = np.maximum(high[active], price[active])
+            last_price[active] = price[active]
+
+            pct, reason, level = evaluate_exits(self, entry, high, sold, price, times[:, tick] - opened_at)
+            fired = np.nonzero(reason >= 0)[0]
+            if fired.size:
+                fill_rows.append(fired)
+                fill_ticks.append(np.full(fired.size, tick))
+                fill_pct.append(pct[fired].copy())
+                fill_price.append(price[fired].copy())
+                fill_reason.append(reason[fired].copy())
+                fill_level.append(level[fired].copy())
+                sold[fired] = np.minimum(sold[fired] + pct[fired] / 100, 1.0)
+
+        def _concat(parts, dtype):
+            return np.concatenate(parts).astype(dtype) if parts else np.zeros(0, dtype=dtype)
+
+        return {
+            "entry": entry,
+            "high": high,
+            "sold": sold,
+            "last_price": last_price,
+            "fill_rows": _concat(fill_rows, int),
+            "fill_ticks": _concat(fill_ticks, int),
+            "fill_pct": _concat(fill_pct, float),
+            "fill_price": _concat(fill_price, float),
+            "fill_reason": _concat(fill_reason, int),
+            "fill_level": _concat(fill_level, int),
+        }
+
+    def reason_label(self, reason, level):
+        return sell_reason_label(self, reason, level)
+
+    def run(self, contracts, times, prices, opened_at=None, entries=None, buy_amount_sol=1.0):
+        """Simulate and report fills, per-trade P&L (in SOL) and summary stats.
+
+        Ticks before a contract's `opened_at` are ignored, as the live bot only
+        monitors a contract after buying it (see `mask_before_open`).
+        """
+        times = np.asarray(times, dtype=float)
+        prices, opened_at = mask_before_open(times, prices, opened_at)
+        state = self.simulate(prices, times, opened_at, entries)
+        return self.report(contracts, times, state, buy_amount_sol)
+
+    def report(self, contracts, times, state, buy_amount_sol=1.0):
+        entry = state["entry"]
+        rows = state["fill_rows"]
+        fraction = state["fill_pct"] / 100
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fill_return = np.where(entry[rows] > 0, state["fill_price"] / entry[rows] - 1.0, 0.0)
+            open_return = np.where(entry > 0, state["last_price"] / entry - 1.0, 0.0)
+        realized = np.zeros(len(contracts))
+        np.add.at(realized, rows, fraction * fill_return * buy_amount_sol)
+        unrealized = (1.0 - state["sold"]) * open_return * buy_amount_sol
+
+        times = np.broadcast_to(times, (len(contracts), times.shape[-1]))
+        fills = [
+            {
+                "contract": contracts[row],
+                "tick": int(tick),
+                "time": float(times[row, tick]),
+                "price": float(price),
+                "percentage": int(pct),
+                "reason": self.reason_label(reason, level),
+            }
+            for row, tick, price, pct, reason, level in zip(
+                rows, state["fill_ticks"], state["fill_price"], state["fill_pct"],
+                state["fill_reason"], state["fill_level"],
+            )
+        ]
+        trades = [
+            {
+                "contract": contract,
+                "entry": float(entry[row]),
+                "high": float(state["high"][row]),
+                "sold": float(state["sold"][row]),
+                "last_price": float(state["last_price"][row]),
+                "realized_pnl": float(realized[row]),
+                "unrealized_pnl": float(unrealized[row]),
+            }
+            for row, contract in enumerate(contracts)
+        ]
+        traded = entry > 0
+        exited = np.zeros(len(contracts), dtype=bool)
+        exited[rows] = True
+        summary = {
+            "contracts": len(contracts),
+            "traded": int(traded.sum()),
+            "fully_exited": int((state["sold"] >= 1.0).sum()),
+            "fills": len(fills),
+            "fills_by_reason": {
+                label: int((state["fill_reason"] == index).sum()) for index, label in enumerate(SELL_REASONS)
+            },
+            "realized_pnl": float(realized.sum()),
+            "unrealized_pnl": float(unrealized[traded].sum()),
+            "mean_realized_return": float(realized[traded].mean() / buy_amount_sol) if traded.any() else 0.0,
+            "win_rate": float((realized[exited] > 0).mean()) if exited.any() else 0.0,
+        }
+        return {"fills": fills, "trades": trades, "summary": summary}
@@ -0,0 +1,147 @@
+import itertools
+import json
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from BrothersTrusts.CoinSniper.Backtest.app import Backtester, load_price_paths, load_signals, mask_before_open
+
+DEFAULT_SEARCH_SPACE = {
+    "trailing_start_multiplier": (1.5, 4.0),
+    "trailing_stop_factor": (0.5, 0.95),
+    "hard_stop_factor": (0.4, 0.9),
+    "time_exit_multiplier": (1.0, 2.0),
+    "max_hold_seconds": (300, 7200),
+    "take_profit_levels": [
+        [(2.0, 0.30), (5.0, 0.60), (10.0, 0.90)],
+        [(1.5, 0.25), (3.0, 0.50), (6.0, 0.75)],
+        [(2.0, 0.50), (4.0, 0.80)],
+        [(3.0, 0.50), (10.0, 0.90)],
+    ],
+}
+
+_worker_data = {}
+
+
+def grid_configs(grid):
+    """Every combination of `{param: [values, ...]}`."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def random_configs(space, samples, seed=None):
+    """`samples` draws from `{param: (low, high) | [choices, ...]}`; integer bounds draw integers."""
+    rng = random.Random(seed)
+    configs = []
+    for _ in range(samples):
+        config = {}
+        for name, domain in space.items():
+            if isinstance(domain, tuple):
+                low, high = domain
+                config[name] = rng.randint(low, high) if isinstance(low, int) and isinstance(high, int) else rng.uniform(low, high)
+            else:
+                config[name] = rng.choice(domain)
+        configs.append(config)
+    return configs
+
+
+def score(state, times):
+    """Mean return per position (realized plus marked-to-market) and the max
+    drawdown of the realized equity curve, both in units of position size."""
+    entry = state["entry"]
+    traded = entry > 0
+    positions = max(int(traded.sum()), 1)
+    rows = state["fill_rows"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fill_pnl = state["fill_pct"] / 100 * (state["fill_price"] / entry[rows] - 1.0)
+        open_pnl = np.where(traded, (1.0 - state["sold"]) * (state["last_price"] / entry - 1.0), 0.0)
+
+    fill_times = np.broadcast_to(times, (len(entry), np.shape(times)[-1]))[rows, state["fill_ticks"]]
+    equity = np.cumsum(fill_pnl[np.argsort(fill_times, kind="stable")]) / positions
+    peak = np.maximum.accumulate(np.concatenate(([0.0], equity)))
+    drawdown = float((peak - np.concatenate(([0.0], equity))).max())
+    return {
+        "return": float((fill_pnl.sum() + open_pnl.sum()) / positions),
+        "max_drawdown": drawdown,
+        "fills": int(rows.size),
+    }
+
+
+def pareto_front(results):
+    """Results not dominated on (higher return, lower drawdown), sorted by drawdown."""
+    ordered = sorted(results, key=lambda result: (result["max_drawdown"], -result["return"]))
+    front = []
+    best_return = -np.inf
+    for result in ordered:
+        if result["return"] > best_return:
+            front.append(result)
+            best_return = result["return"]
+    return front
+
+
+def _init_worker(data_dir):
+    # Memory-mapped and read-only: every worker shares the parent's page cache
+    # instead of unpickling its own copy of the price matrix.
+    for name in ("times", "prices", "opened_at"):
+        _worker_data[name] = np.load(os.path.join(data_dir, f"{name}.npy"), mmap_mode="r")
+
+
+def _evaluate(indexed_config):
+    index, config = indexed_config
+    state = Backtester(**config).simulate(
+        _worker_data["prices"], _worker_data["times"], _worker_data["opened_at"]
+    )
+    return {"index": index, "params": config, **score(state, _worker_data["times"])}
+
+
+def run_sweep(times, prices, configs, opened_at=None, workers=None):
+    """Evaluate every config on a process pool (one process per core by default).
+
+    Returns `(results, front)` where `results` follows `configs` order.
+    """
+    times = np.asarray(times, dtype=float)
+    prices, opened_at = mask_before_open(times, prices, opened_at)
+    workers = workers or os.cpu_count() or 1
+    with tempfile.TemporaryDirectory(prefix="coinsniper-sweep-") as data_dir:
+        # Column-major so each tick's prices are contiguous in the mapping.
+        np.save(os.path.join(data_dir, "prices.npy"), np.asfortranarray(prices))
+        np.save(os.path.join(data_dir, "times.npy"), np.asfortranarray(times))
+        np.save(os.path.join(data_dir, "opened_at.npy"), opened_at)
+        chunksize = max(1, len(configs) // (workers * 8))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data_dir,)) as pool:
+            results = list(pool.map(_evaluate, enumerate(configs), chunksize=chunksize))
+    return results, pareto_front(results)
+
+
+def run_local(prices_path=None, samples=None, output_path=None):
+    path = prices_path or os.getenv("BACKTEST_PRICES")
+    if not path:
+        raise ValueError("Provide a price path file via argument or BACKTEST_PRICES env var.")
+    samples = int(samples or os.getenv("SWEEP_SAMPLES", "1000"))
+    contracts, times, prices = load_price_paths(path)
+    signals = load_signals()
+    opened_at = np.array([
+        (signals.get(contract) or {}).get("created_at") or np.nan for contract in contracts
+    ])
+
+    configs = random_configs(DEFAULT_SEARCH_SPACE, samples, seed=int(os.getenv("SWEEP_SEED", "0")))
+    started = time.perf_counter()
+    results, front = run_sweep(times, prices, configs, opened_at=opened_at)
+    elapsed = time.perf_counter() - started
+    print(f"Evaluated {len(results)} configs over {len(contracts)} contracts in {elapsed:.1f}s")
+    for result in front:
+        print(f"return={result['return']:+.4f} drawdown={result['max_drawdown']:.4f} params={result['params']}")
+
+    output_path = output_path or os.getenv("SWEEP_OUTPUT")
+    if output_path:
+        with open(output_path, "w") as f:
+            json.dump({"results": results, "pareto_front": front}, f, indent=2)
+        print(f"Wrote sweep results to {output_path}")
+
+
+if __name__ == "__main__":
+    run_local()
@@ -0,0 +1,45 @@
+import asyncio
+import multiprocessing
+import os
+import secrets
+import sys
+
+from BrothersTrusts.CoinSniper.Cluster.app import IngestWorker
+
+
+def run_worker(worker_id=None):
+    """Run one ingest worker; start more at any time to spread the handles further."""
+    asyncio.run(IngestWorker(worker_id).run())
+
+
+def run_cluster(twitter_users=None, workers=None):
+    """Run the execution process here with `CLUSTER_WORKERS` ingest workers beside it."""
+    from BrothersTrusts.CoinSniper.Controller.app import Controller
+
+    users = twitter_users or os.getenv("TWITTER_USERS", "")
+    if isinstance(users, str):
+        users = [user.strip() for user in users.split(",") if user.strip()]
+    if not users:
+        raise ValueError("Provide twitter users via argument or TWITTER_USERS env var.")
+    os.environ.setdefault("CLUSTER_PORT", "8766")
+    # The spawned workers inherit it; extra workers started by hand need it too.
+    os.environ.setdefault("CLUSTER_TOKEN", secrets.token_hex(16))
+    count = workers or int(os.getenv("CLUSTER_WORKERS", "2"))
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=run_worker, args=(f"worker-{index}",), daemon=True) for index in range(count)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        asyncio.run(Controller(users).run())
+    finally:
+        for process in processes:
+            process.terminate()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["worker"]:
+        run_worker(sys.argv[2] if len(sys.argv) > 2 else None)
+    else:
+        run_cluster()
@@ -0,0 +1,262 @@
+import asyncio
+import os
+import re
+import socket
+
+from BrothersTrusts.CoinSniper.Cluster.ipc import MAX_MESSAGE_BYTES, read_message, write_message
+from BrothersTrusts.CoinSniper.Cluster.ring import HashRing
+from BrothersTrusts.CoinSniper.Shared.contracts import extract_contracts_from_tweets
+from BrothersTrusts.CoinSniper.Twitter.app import TwitterClient, parse_created_at
+from BrothersTrusts.CoinSniper.Twitter.cache import UserIdCache
+from BrothersTrusts.CoinSniper.Twitter.scheduler import TweetScheduler
+
+
+def worker_cache_path(worker_id, path=None):
+    """`USER_ID_CACHE_PATH` with the worker id in it, so no two workers write one file."""
+    path = path if path is not None else os.getenv("USER_ID_CACHE_PATH", "user_id_cache.json")
+    if not path:
+        return ""
+    root, ext = os.path.splitext(path)
+    return root + "." + re.sub(r"[^\w.-]", "_", worker_id) + ext
+
+
+class ClusterServer:
+    """Execution side of multi-process mode, run inside the `Controller`.
+
+    Ingest workers connect over local TCP and are placed on a `HashRing`;
+    every join or leave re-splits `controller.twitter_users` and pushes each
+    worker its new handles, together with the newest tweet id already seen
+    for each, so a handle that changes hands is picked up where it left off.
+    Workers must present `CLUSTER_TOKEN` and send back contracts they
+    extracted, which go onto the controller's `SignalBus`. Dedup stays in that one bus: its check-and-add never awaits,
+    so two workers reporting the same contract yield exactly one `/buy`.
+
+    All workers spend one TweetScout key, so each is sent an equal share of
+    `TWEETSCOUT_RPM` / `TWEETSCOUT_BURST` with its handles, and a rate-limit
+    pause one worker hits is relayed to all the others.
+    """
+
+    def __init__(self, controller, host=None, port=None, token=None):
+        self.controller = controller
+        self.host = host or os.getenv("CLUSTER_HOST", "127.0.0.1")
+        self.port = int(os.getenv("CLUSTER_PORT", "0")) if port is None else port
+        self.token = token if token is not None else os.getenv("CLUSTER_TOKEN") or None
+        self.requests_per_minute = float(os.getenv("TWEETSCOUT_RPM", "60"))
+        self.burst = float(os.getenv("TWEETSCOUT_BURST", "5"))
+        self.ring = HashRing()
+        self.workers = {}  # worker id -> writer
+        self.assignment = {}  # worker id -> (handles, budget) it was last sent
+        self.last_seen = {}  # handle -> newest tweet id any worker has reported
+        self._rebalance_lock = asyncio.Lock()
+        self._server = None
+
+    async def start(self):
+        if not self.token:
+            raise ValueError("CLUSTER_TOKEN is required to accept ingest workers")
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_MESSAGE_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+        print(f"Waiting for ingest workers on {self.host}:{self.port}")
+        return self._server
+
+    async def serve(self):
+        if not self._server:
+            await self.start()
+        await self._server.serve_forever()
+
+    async def close(self):
+        if self._server:
+            self._server.close()
+            for writer in list(self.workers.values()):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def rebalance(self):
+        """Send every worker whose share of the handles or of the budget changed its new share."""
+        async with self._rebalance_lock:
+            assignment = self.ring.assign(self.controller.twitter_users)
+            budget = (
+                self.requests_per_minute / max(1, len(assignment)),
+                max(1.0, self.burst / max(1, len(assignment))),
+            )
+            for worker_id, handles in assignment.items():
+                writer = self.workers.get(worker_id)
+                if writer is None or (set(handles), budget) == self.assignment.get(worker_id):
+                    continue
+                self.assignment[worker_id] = (set(handles), budget)
+                try:
+                    await write_message(writer, {
+                        "type": "assign",
+                        "handles": {handle: self.last_seen.get(handle) for handle in handles},
+                        "requests_per_minute": budget[0],
+                        "burst": budget[1],
+                    })
+                except ConnectionError:
+                    pass
+            print(f"Handles across {len(assignment)} workers: "
+                  + ", ".join(f"{worker_id}={len(handles)}" for worker_id, handles in sorted(assignment.items())))
+
+    async def relay_pause(self, worker_id, seconds):
+        """TweetScout rate limited `worker_id`: pause every other worker too."""
+        print(f"Ingest worker {worker_id} was rate limited; pausing all workers for {seconds:.1f}s")
+        for other_id, writer in list(self.workers.items()):
+            if other_id == worker_id:
+                continue
+            try:
+                await write_message(writer, {"type": "pause", "seconds": seconds})
+            except ConnectionError:
+                pass
+
+    def receive_signals(self, worker_id, message):
+        handle = message.get("handle")
+        last_seen = message.get("last_seen")
+        if handle and last_seen:
+            self.last_seen[handle] = max(last_seen, self.last_seen.get(handle) or 0)
+        for signal in message.get("signals") or ():
+            signal["worker"] = worker_id
+            self.controller.signal_bus.publish(signal)
+
+    async def _handle(self, reader, writer):
+        worker_id = None
+        try:
+            hello = await read_message(reader)
+            if not hello or hello.get("type") != "hello" or hello.get("token") != self.token:
+                return
+            worker_id = str(hello.get("worker") or "%s:%s" % writer.get_extra_info("peername")[:2])
+            previous = self.workers.get(worker_id)
+            if previous:
+                previous.close()
+            self.workers[worker_id] = writer
+            self.assignment.pop(worker_id, None)
+            self.ring.add(worker_id)
+            print(f"Ingest worker {worker_id} joined")
+            await self.rebalance()
+            while (message := await read_message(reader)) is not None:
+                if message.get("type") == "signals":
+                    self.receive_signals(worker_id, message)
+                elif message.get("type") == "pause":
+                    await self.relay_pause(worker_id, float(message.get("seconds") or 0))
+        except (ConnectionError, ValueError) as exc:
+            print(f"Ingest worker {worker_id} connection failed: {exc}")
+        finally:
+            writer.close()
+            if worker_id and self.workers.get(worker_id) is writer:
+                del self.workers[worker_id]
+                self.assignment.pop(worker_id, None)
+                self.ring.remove(worker_id)
+                print(f"Ingest worker {worker_id} left")
+                await self.rebalance()
+
+
+class IngestWorker:
+    """One ingest process: polls the handles the `ClusterServer` assigned it,
+    extracts contracts locally and ships them to the execution process.
+
+    Owns its own `TwitterClient` and `TweetScheduler`, so a slow TweetScout
+    response or a heavy extraction pass only delays this worker's handles. The
+    scheduler spends the budget share the server sends, and the user id cache
+    is persisted to a file of this worker's own (`worker_cache_path`).
+    Reconnects (and waits to be reassigned) if the execution process goes away.
+    """
+
+    def __init__(self, worker_id=None, host=None, port=None, token=None):
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.host = host or os.getenv("CLUSTER_HOST", "127.0.0.1")
+        self.port = int(os.getenv("CLUSTER_PORT", "8766")) if port is None else port
+        self.token = token if token is not None else os.getenv("CLUSTER_TOKEN") or None
+        self.reconnect_seconds = float(os.getenv("CLUSTER_RECONNECT_SECONDS", "1"))
+        self.twitter_client = TwitterClient()
+        self.twitter_client.user_id_cache = UserIdCache(worker_cache_path(self.worker_id))
+        self.tweet_scheduler = TweetScheduler([])
+        self.twitter_client.request_gate = self.tweet_scheduler.acquire
+        self.twitter_client.response_listener = self.tweet_scheduler.observe_response
+        self.tweet_scheduler.pause_listener = self.share_pause
+        self._writer = None
+        self._send_lock = asyncio.Lock()
+        self._pause_tasks = set()
+
+    @property
+    def handles(self):
+        return self.tweet_scheduler.user_handles
+
+    def assign(self, handles, requests_per_minute=None, burst=None):
+        """Poll exactly `handles` (`{handle: last seen tweet id or None}`) from now on,
+        within `requests_per_minute` / `burst` when the server sent a budget share."""
+        last_seen_ids = self.twitter_client.last_seen_tweet_ids
+        for handle, last_seen in handles.items():
+            if last_seen:
+                last_seen_ids[handle] = max(last_seen, last_seen_ids.get(handle) or 0)
+        self.tweet_scheduler.set_handles(handles)
+        if requests_per_minute:
+            self.tweet_scheduler.set_budget(requests_per_minute, burst or 1.0)
+        print(f"Worker {self.worker_id} now polls {len(handles)} handles "
+              f"at {self.tweet_scheduler.requests_per_minute:g} requests/min")
+
+    def share_pause(self, seconds):
+        """Tell the server about a rate-limit pause so it pauses the other workers."""
+        task = asyncio.get_running_loop().create_task(self.send({"type": "pause", "seconds": seconds}))
+        self._pause_tasks.add(task)
+        task.add_done_callback(self._pause_tasks.discard)
+
+    async def poll_handle(self, user_handle):
+        user_id, tweets = await self.twitter_client.fetch_new_tweets(user_handle)
+        if not user_id or not tweets or user_handle not in self.handles:
+            return
+        signals = []
+        for tweet in tweets:
+            contracts = extract_contracts_from_tweets([tweet])
+            if contracts:
+                signals.append({
+                    "source": "twitter",
+                    "handle": user_handle,
+                    "created_at": parse_created_at(tweet.get("created_at")) if isinstance(tweet, dict) else None,
+                    "contracts": contracts,
+                })
+        if signals:
+            self.tweet_scheduler.record_contract(user_handle)
+        await self.send({
+            "type": "signals",
+            "handle": user_handle,
+            "last_seen": self.twitter_client.last_seen_tweet_ids.get(user_handle),
+            "signals": signals,
+        })
+
+    async def send(self, message):
+        async with self._send_lock:
+            if self._writer is None:
+                print(f"Worker {self.worker_id} is disconnected; dropping its {message['type']} message")
+                return
+            await write_message(self._writer, message)
+
+    async def run(self):
+        scheduler_task = asyncio.create_task(self.tweet_scheduler.run(self.poll_handle))
+        try:
+            while True:
+                try:
+                    reader, writer = await asyncio.open_connection(self.host, self.port, limit=MAX_MESSAGE_BYTES)
+                except OSError as exc:
+                    print(f"Worker {self.worker_id} cannot reach {self.host}:{self.port}: {exc}")
+                    await asyncio.sleep(self.reconnect_seconds)
+                    continue
+                self._writer = writer
+                try:
+                    await write_message(writer, {"type": "hello", "worker": self.worker_id, "token": self.token})
+                    while (message := await read_message(reader)) is not None:
+                        if message.get("type") == "assign":
+                            self.assign(
+                                message.get("handles") or {}, message.get("requests_per_minute"), message.get("burst")
+                            )
+                        elif message.get("type") == "pause":
+                            self.tweet_scheduler.pause(float(message.get("seconds") or 0))
+                except (ConnectionError, ValueError) as exc:
+                    print(f"Worker {self.worker_id} lost the execution process: {exc}")
+                finally:
+                    self._writer = None
+                    writer.close()
+                    # Whoever takes over these handles gets them from the server.
+                    self.assign({})
+                await asyncio.sleep(self.reconnect_seconds)
+        finally:
+            scheduler_task.cancel()
+            await self.twitter_client.http.aclose()
+            await asyncio.to_thread(self.twitter_client.user_id_cache.close)
@@ -0,0 +1,18 @@
+import json
+
+# One JSON object per line over a local TCP stream. Signals are small and the
+# stream already orders them, so nothing heavier is needed.
+MAX_MESSAGE_BYTES = 1 << 20
+
+
+async def read_message(reader):
+    """Next message from `reader`, or None at EOF."""
+    line = await reader.readline()
+    if not line:
+        return None
+    return json.loads(line)
+
+
+async def write_message(writer, message):
+    writer.write(json.dumps(message, separators=(",", ":")).encode() + b"\n")
+    await writer.drain()
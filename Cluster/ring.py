@@ -0,0 +1,59 @@
+import bisect
+import hashlib
+import os
+
+
+def _hash(key):
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent hashing of handles onto workers.
+
+    Each worker owns `replicas` points on the ring and a handle goes to the
+    first point clockwise of its hash, so adding or removing a worker only
+    moves the handles that land on (or leave) that worker's points.
+    """
+
+    def __init__(self, nodes=(), replicas=None):
+        self.replicas = replicas or int(os.getenv("CLUSTER_RING_REPLICAS", "100"))
+        self._points = []  # sorted hashes
+        self._owners = {}  # hash -> node
+        self.nodes = set()
+        for node in nodes:
+            self.add(node)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def add(self, node):
+        if node in self.nodes:
+            return
+        self.nodes.add(node)
+        for replica in range(self.replicas):
+            point = _hash(f"{node}#{replica}")
+            if point not in self._owners:
+                bisect.insort(self._points, point)
+                self._owners[point] = node
+
+    def remove(self, node):
+        if node not in self.nodes:
+            return
+        self.nodes.discard(node)
+        self._points = [point for point in self._points if self._owners[point] != node]
+        self._owners = {point: self._owners[point] for point in self._points}
+
+    def node_for(self, key):
+        if not self._points:
+            return None
+        index = bisect.bisect(self._points, _hash(key.lstrip("@").lower())) % len(self._points)
+        return self._owners[self._points[index]]
+
+    def assign(self, keys):
+        """`{node: [keys]}` for every node, including nodes that get none."""
+        assignment = {node: [] for node in self.nodes}
+        for key in keys:
+            node = self.node_for(key)
+            if node is not None:
+                assignment[node].append(key)
+        return assignment
@@ -1,51 +1,221 @@
 import asyncio
 import os
+import time
 
+from BrothersTrusts.CoinSniper.Cluster.app import ClusterServer
+from BrothersTrusts.CoinSniper.Shared.contracts import extract_contracts, is_valid_address
+from BrothersTrusts.CoinSniper.Shared.http import get_transport
+from BrothersTrusts.CoinSniper.Shared.ingest import SignalBus
+from BrothersTrusts.CoinSniper.Shared.metrics import metrics
+from BrothersTrusts.CoinSniper.Shared.profiler import LoopProfiler
+from BrothersTrusts.CoinSniper.Shared.standby import LeaderLock
+from BrothersTrusts.CoinSniper.Shared.state import open_state_store
 from BrothersTrusts.CoinSniper.Telegram.app import TelegramBot
-from BrothersTrusts.CoinSniper.Twitter.app import TwitterClient
+from BrothersTrusts.CoinSniper.Twitter.app import TwitterClient, parse_created_at
+from BrothersTrusts.CoinSniper.Twitter.scheduler import TweetScheduler
+
+
+def _log_startup_failure(future):
+    exc = None if future.cancelled() else future.exception()
+    if exc and not isinstance(exc, asyncio.CancelledError):
+        print(f"Start-up failed: {exc}; Telegram will reconnect on the next send")
 
 
 class Controller:
-    def __init__(self, twitter_users):
-        self.telegram_bot = TelegramBot()
+    def __init__(self, twitter_users, telegram_bot=None):
+        self.started_at = time.perf_counter()
+        self.http = get_transport()
+        self.telegram_bot = telegram_bot or TelegramBot()
         self.twitter_client = TwitterClient()
         self.twitter_users = twitter_users  # List of Twitter handles
-        self.seen_contracts = set()
-        self.poll_interval_seconds = int(os.getenv("TWEET_POLL_SECONDS", "120"))
-
-    async def process_tweets(self):
-        """Fetch tweets, extract contract addresses, and send them via Telegram."""
-        for user_handle in self.twitter_users:
-            print(f"Checking tweets from @{user_handle}...")
-
-            user_id = self.twitter_client.get_user_id(user_handle)
-            print('user_id:', str(user_id))
-            if not user_id:
-                print(f"Skipping {user_handle}: Could not fetch user ID.")
-                continue
-
-            tweets = self.twitter_client.get_latest_tweets(user_handle, user_id)
-            contracts = self.twitter_client.extract_sol_contracts(tweets)
-            print('contracts in controller: ' + str(contracts))
-
-            if contracts:
-                for contract in contracts:
-                    if contract in self.seen_contracts:
-                        continue
-                    self.seen_contracts.add(contract)
-                    await self.telegram_bot.buy_token(contract)
-            else:
-                print(f"No valid Solana contract addresses found in tweets from @{user_handle}.")
+        # With CLUSTER_PORT set, ingest workers poll the handles and this process only executes.
+        self.cluster = ClusterServer(self) if os.getenv("CLUSTER_PORT") else None
+        # With STANDBY_LOCK_PATH set, a second instance waits fully warmed up and
+        # takes over as soon as the primary holding the lock exits.
+        self.standby_lock = LeaderLock(os.getenv("STANDBY_LOCK_PATH")) if os.getenv("STANDBY_LOCK_PATH") else None
+        self._first_poll_at = None
+        self._active_since = self.started_at  # start-up, or the moment a standby took over
+        self.tweet_scheduler = TweetScheduler(self.twitter_users)
+        self.twitter_client.request_gate = self.tweet_scheduler.acquire
+        self.twitter_client.response_listener = self.tweet_scheduler.observe_response
+        self.state_store = open_state_store()
+        self.seen_contracts = self.state_store.load_seen_contracts() if self.state_store else set()
+        self.metrics = metrics
+        self.signal_bus = SignalBus(
+            self.extract_signal_contracts,
+            self.telegram_bot.buy_token,
+            self.seen_contracts,
+            state_store=self.state_store,
+            metrics=self.metrics,
+            on_contracts=self._on_signal_contracts,
+        )
+        self.signal_channels = [
+            channel.strip() for channel in os.getenv("TELEGRAM_SIGNAL_CHANNELS", "").split(",") if channel.strip()
+        ]
+        if self.signal_channels:
+            self.telegram_bot.watch_channels(self.signal_channels, self.signal_bus.publish)
+        self.signal_http_port = int(os.getenv("SIGNAL_HTTP_PORT", "0"))
+        self.signal_http_token = os.getenv("SIGNAL_HTTP_TOKEN") or None
+        self.signal_http_origin = os.getenv("SIGNAL_HTTP_ORIGIN") or None
+        self.metrics_port = int(os.getenv("METRICS_PORT", "0"))
+        self.metrics_dump_path = os.getenv("METRICS_DUMP_PATH")
+        self.metrics_dump_seconds = float(os.getenv("METRICS_DUMP_SECONDS", "60"))
+        self.loop_profiler = LoopProfiler(self.metrics) if os.getenv("LOOP_PROFILER", "1") != "0" else None
+        self.loop_profile_path = os.getenv("LOOP_PROFILE_PATH")
+        self._metrics_tasks = []
+        self._ingest_tasks = []
+
+    async def start_metrics(self):
+        """Expose latency histograms over HTTP and/or a periodically rewritten JSON file,
+        and start the event-loop profiler."""
+        if self.loop_profiler:
+            self.loop_profiler.start()
+            if self.loop_profile_path:
+                self._metrics_tasks.append(asyncio.create_task(
+                    self.loop_profiler.dump_periodically(self.loop_profile_path, self.metrics_dump_seconds)
+                ))
+        if self.metrics_port:
+            server = await self.metrics.serve(port=self.metrics_port)
+            self._metrics_tasks.append(asyncio.create_task(server.serve_forever()))
+            print(f"Serving metrics on http://127.0.0.1:{self.metrics_port}/")
+        if self.metrics_dump_path:
+            self._metrics_tasks.append(asyncio.create_task(
+                self.metrics.dump_periodically(self.metrics_dump_path, self.metrics_dump_seconds)
+            ))
+
+    def stop_metrics(self):
+        for task in self._metrics_tasks:
+            task.cancel()
+        self._metrics_tasks = []
+        if self.loop_profiler:
+            self.loop_profiler.stop()
+            if self.loop_profile_path:
+                try:
+                    self.loop_profiler.dump(self.loop_profile_path)
+                except OSError as exc:
+                    print(f"Failed to dump loop profile to {self.loop_profile_path}: {exc}")
+
+    async def start_ingest(self):
+        """Start the signal bus consumer and, if configured, the local HTTP signal endpoint."""
+        if self.signal_http_port:
+            server = await self.signal_bus.serve_http(
+                port=self.signal_http_port, token=self.signal_http_token, origin=self.signal_http_origin
+            )
+            self._ingest_tasks.append(asyncio.create_task(server.serve_forever(), name="ingest.http"))
+            print(f"Accepting signals on http://127.0.0.1:{self.signal_http_port}/signal")
+        self._ingest_tasks.append(asyncio.create_task(self.signal_bus.run(), name="ingest.bus"))
+
+    def stop_ingest(self):
+        for task in self._ingest_tasks:
+            task.cancel()
+        self._ingest_tasks = []
+
+    async def poll_handle(self, user_handle):
+        """Fetch one handle's new tweets onto the signal bus; driven by the tweet scheduler."""
+        user_id, tweets = await self.twitter_client.fetch_new_tweets(user_handle)
+        if self._first_poll_at is None:
+            self._first_poll_at = time.perf_counter()
+            self.metrics.observe("time_to_first_poll", self._first_poll_at - self._active_since)
+            print(f"First TweetScout poll done {(self._first_poll_at - self._active_since) * 1000:.0f} ms after start")
+        self.handle_tweets(user_handle, user_id, tweets)
+
+    def handle_tweets(self, user_handle, user_id, tweets):
+        print(f"Checked tweets from @{user_handle}...")
+        print('user_id:', str(user_id))
+        if not user_id:
+            print(f"Skipping {user_handle}: Could not fetch user ID.")
+            return
+        for tweet in tweets:
+            created_at = parse_created_at(tweet.get("created_at")) if isinstance(tweet, dict) else None
+            self.signal_bus.publish({
+                "source": "twitter", "handle": user_handle, "created_at": created_at, "tweet": tweet,
+            })
+
+    def extract_signal_contracts(self, signal):
+        if "contracts" in signal:  # already extracted by an ingest worker; trust no address it sent
+            return [
+                contract for contract in signal["contracts"]
+                if isinstance(contract, str) and is_valid_address(contract)
+            ]
+        if "tweet" in signal:
+            return self.twitter_client.extract_sol_contracts([signal["tweet"]])
+        return extract_contracts(signal.get("text"))
+
+    def _on_signal_contracts(self, signal, contracts):
+        if signal.get("source") == "twitter":
+            self.tweet_scheduler.record_contract(signal["handle"])
+
+    async def warm_up(self):
+        """Connect Telegram, resolve TweetScout user ids and open the upstream
+        connections side by side; failures are logged and retried on first use."""
+        started = time.perf_counter()
+        steps = {
+            "Telegram connect": self.telegram_bot.connect(),
+            "HTTP warm-up": self.http.warm([self.twitter_client.base_url, self.telegram_bot.helius_rpc_url]),
+        }
+        if not self.cluster:
+            steps["user id warm-up"] = self.twitter_client.async_warm_user_ids(self.twitter_users)
+        results = await asyncio.gather(*steps.values(), return_exceptions=True)
+        for name, result in zip(steps, results):
+            if isinstance(result, Exception):
+                print(f"{name} failed: {result}")
+        self.metrics.observe("startup_warm_up", time.perf_counter() - started)
+        print(f"Warmed up Telegram, TweetScout and Helius in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    async def take_over(self):
+        """Become the primary: wait, warmed up, for the lock, then pick up the
+        state the previous primary persisted. Returns whether it had to wait."""
+        if self.standby_lock.try_acquire():
+            return False
+        print("Another instance is primary; warming up as hot standby")
+        # Connected but deaf until the lock is ours: a GMGN fill seen now belongs
+        # to the primary, and a row written now would clobber its state.
+        self.telegram_bot.enter_standby()
+        await self.warm_up()
+        await self.standby_lock.acquire()
+        if self.state_store:
+            await asyncio.to_thread(self.state_store.flush)
+            seen = await asyncio.to_thread(self.state_store.load_seen_contracts)
+            self.seen_contracts.clear()
+            self.seen_contracts.update(seen)
+        await asyncio.to_thread(self.telegram_bot.reload_state)
+        self.telegram_bot.leave_standby()
+        self._active_since = time.perf_counter()
+        print("Primary lock acquired; taking over")
+        return True
 
     async def run(self):
-        """Start the full process of fetching tweets and sending messages."""
+        """Start the full process of fetching tweets and sending messages.
+
+        The first TweetScout poll does not wait for start-up: Telegram connects
+        and connections warm up alongside it, and buys queue until Telegram is
+        ready. A hot standby does all of that before it can take over instead.
+        """
+        startup = None
         try:
-            await self.telegram_bot.start()
-            while True:
-                await self.process_tweets()
-                await asyncio.sleep(self.poll_interval_seconds)
+            await self.start_metrics()
+            warmed = await self.take_over() if self.standby_lock else False
+            startup = asyncio.gather(self.telegram_bot.start(), *([] if warmed else [self.warm_up()]))
+            startup.add_done_callback(_log_startup_failure)
+            await self.start_ingest()
+            if self.cluster:
+                await self.cluster.serve()
+            else:
+                await self.tweet_scheduler.run(self.poll_handle)
         except Exception as e:
             print(f"An error occurred: {e}")
+        finally:
+            if startup is not None:
+                startup.cancel()
+            self.stop_ingest()
+            if self.cluster:
+                await self.cluster.close()
             await self.telegram_bot.close()
-        await self.telegram_bot.close()
+            await self.http.aclose()
+            await asyncio.to_thread(self.twitter_client.user_id_cache.close)
+            self.stop_metrics()
+            if self.state_store:
+                await asyncio.to_thread(self.state_store.close)
+            if self.standby_lock:
+                self.standby_lock.release()
 
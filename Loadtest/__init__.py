@@ -0,0 +1,52 @@
+import json
+import os
+
+from BrothersTrusts.CoinSniper.Loadtest.app import LoadTest, compare_results
+from BrothersTrusts.CoinSniper.Loadtest.fakes import FaultProfile
+
+
+def parse_levels(value):
+    """`"10:100,200:2000"` -> `[(10, 100), (200, 2000)]` (handles:positions)."""
+    levels = []
+    for item in value.split(","):
+        handles, _, positions = item.strip().partition(":")
+        if handles:
+            levels.append((int(handles), int(positions or 0)))
+    return levels
+
+
+def run_local(output_path=None):
+    latency = float(os.getenv("LOADTEST_LATENCY", "0.02"))
+    error_rate = float(os.getenv("LOADTEST_ERROR_RATE", "0"))
+    load_test = LoadTest(
+        seconds=float(os.getenv("LOADTEST_SECONDS", "10")),
+        signals_per_second=float(os.getenv("LOADTEST_SIGNALS_PER_SECOND", "2")),
+        poll_seconds=float(os.getenv("LOADTEST_POLL_SECONDS", "1")),
+        tweetscout_faults=FaultProfile(latency=latency, jitter=latency, error_rate=error_rate, seed=0),
+        helius_faults=FaultProfile(latency=latency, jitter=latency, error_rate=error_rate, seed=1),
+        telegram_faults=FaultProfile(latency=latency, jitter=latency, seed=2),
+    )
+    result = load_test.run(parse_levels(os.getenv("LOADTEST_LEVELS", "10:100,50:500,200:2000")))
+    for level in result["levels"]:
+        print(
+            f"{level['handles']:4d} handles {level['positions']:5d} positions | "
+            f"signal->buy p95 {level['signal_to_buy']['p95_ms']:8.1f} ms | "
+            f"poll cycle p95 {level['price_poll_cycle']['p95_ms']:7.1f} ms | "
+            f"loop lag p99 {level['loop_lag']['p99_ms']:6.1f} ms | "
+            f"rss {level['rss_bytes'] / 2 ** 20:6.1f} MiB"
+        )
+
+    baseline_path = os.getenv("LOADTEST_BASELINE")
+    if baseline_path and os.path.exists(baseline_path):
+        with open(baseline_path) as f:
+            for row in compare_results(json.load(f), result):
+                print(row)
+
+    output_path = output_path or os.getenv("LOADTEST_OUTPUT", "loadtest.json")
+    with open(output_path, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"Wrote load test results to {output_path}")
+
+
+if __name__ == "__main__":
+    run_local()
@@ -0,0 +1,200 @@
+import asyncio
+import contextlib
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+
+from BrothersTrusts.CoinSniper.Controller.app import Controller
+from BrothersTrusts.CoinSniper.Loadtest.fakes import (
+    FakeHelius,
+    FakeTelegramClient,
+    FakeTweetScout,
+    FakeUpstreams,
+    FaultProfile,
+    fake_contract,
+)
+from BrothersTrusts.CoinSniper.Shared.metrics import LatencyHistogram, Metrics
+from BrothersTrusts.CoinSniper.Telegram.app import TelegramBot
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMPARED_STAGES = ("signal_to_buy", "price_poll_cycle", "loop_lag")
+
+
+def rss_bytes():
+    """Current resident set size (Linux), else the peak reported by `getrusage`."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@contextlib.contextmanager
+def patched_env(values):
+    saved = {key: os.environ.get(key) for key in values}
+    os.environ.update({key: str(value) for key, value in values.items()})
+    try:
+        yield
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+class LoadTest:
+    """Runs the real `Controller` and `TelegramBot` against local fake upstreams.
+
+    Each level polls `handles` TweetScout accounts while `positions` trades are
+    open, posts contract tweets at `signals_per_second` and measures
+    tweet-posted to `/buy`-sent latency, price-poll cycle time, event-loop lag
+    and memory. The fakes run on their own thread so only the bot's own work
+    shows up as loop lag.
+    """
+
+    def __init__(self, seconds=10.0, signals_per_second=2.0, poll_seconds=1.0, seed=0,
+                 tweetscout_faults=None, helius_faults=None, telegram_faults=None):
+        self.seconds = seconds
+        self.signals_per_second = signals_per_second
+        self.poll_seconds = poll_seconds
+        self.seed = seed
+        self.tweetscout_faults = tweetscout_faults or FaultProfile(seed=seed)
+        self.helius_faults = helius_faults or FaultProfile(seed=seed + 1)
+        self.telegram_faults = telegram_faults or FaultProfile(seed=seed + 2)
+
+    def _env(self, handles, tweetscout, helius):
+        return {
+            "TWEET_SCOUT_API_KEY": "loadtest",
+            "TWEET_SCOUT_BASE_URL": tweetscout.base_url,
+            "HELIUS_API_KEY": "loadtest",
+            "HELIUS_RPC_URL": f"{helius.base_url}/",
+            "API_ID": "1",
+            "API_HASH": "loadtest",
+            "STATE_DB_PATH": "",
+            "USER_ID_CACHE_PATH": "",
+            "METRICS_PORT": "0",
+            # Budget is not what is under test: let every handle poll at `poll_seconds`.
+            "TWEETSCOUT_RPM": str(max(60.0, 120 * len(handles) / self.poll_seconds)),
+            "TWEETSCOUT_BURST": str(max(5, len(handles))),
+            "TWEET_MIN_INTERVAL": str(self.poll_seconds),
+            "TWEET_POLL_SECONDS": str(self.poll_seconds),
+            "TWEET_MAX_CONCURRENCY": str(min(50, max(1, len(handles)))),
+        }
+
+    async def _sample_loop_lag(self, histogram, interval=0.01):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            histogram.observe(time.perf_counter() - started - interval)
+
+    async def _post_signals(self, tweetscout, handles, posted, rng):
+        while True:
+            await asyncio.sleep(rng.expovariate(self.signals_per_second))
+            contract = fake_contract(rng)
+            posted[contract] = time.perf_counter()
+            tweetscout.post(rng.choice(handles), f"new gem {contract} aping now")
+
+    async def run_level(self, handle_count, position_count):
+        rng = random.Random(f"{self.seed}:{handle_count}:{position_count}")
+        handles = [f"handle{index}" for index in range(handle_count)]
+        tweetscout = FakeTweetScout(self.tweetscout_faults)
+        helius = FakeHelius(self.helius_faults, seed=self.seed)
+        telegram_client = FakeTelegramClient(faults=self.telegram_faults)
+        posted = {}
+        signal_to_buy = LatencyHistogram()
+        loop_lag = LatencyHistogram()
+
+        def _on_send(handle, message, sent_at):
+            parts = message.split()
+            if parts[0] == "/buy" and parts[1] in posted:
+                signal_to_buy.observe(sent_at - posted[parts[1]])
+
+        telegram_client.on_send = _on_send
+        rss_before = rss_bytes()
+        with FakeUpstreams(tweetscout, helius), patched_env(self._env(handles, tweetscout, helius)), \
+                open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            bot = TelegramBot(client=telegram_client)
+            controller = Controller(handles, telegram_bot=bot)
+            level_metrics = Metrics()
+            controller.metrics = bot.metrics = controller.twitter_client.metrics = level_metrics
+            controller.signal_bus.metrics = level_metrics
+            now = time.time()
+            for _ in range(position_count):
+                bot.trades[fake_contract(rng)] = {
+                    "entry": 1.0, "high": 1.0, "sold": 0.0, "opened_at": now, "last_price": 1.0,
+                    "entry_source": "helius",
+                }
+
+            tasks = [
+                asyncio.create_task(controller.run()),
+                asyncio.create_task(self._sample_loop_lag(loop_lag)),
+                asyncio.create_task(self._post_signals(tweetscout, handles, posted, rng)),
+            ]
+            await asyncio.sleep(self.seconds)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await bot.close()
+            await controller.http.aclose()
+
+        poll_cycle = level_metrics.histogram("price_poll_cycle")
+        return {
+            "handles": handle_count,
+            "positions": position_count,
+            "seconds": self.seconds,
+            "signals_posted": len(posted),
+            "buys": len([message for _, message, _ in telegram_client.sent if message.startswith("/buy")]),
+            "sells": len([message for _, message, _ in telegram_client.sent if message.startswith("/sell")]),
+            "signal_to_buy": signal_to_buy.summary(),
+            "price_poll_cycle": poll_cycle.summary() if poll_cycle else LatencyHistogram().summary(),
+            "loop_lag": loop_lag.summary(),
+            "rss_bytes": rss_bytes(),
+            "rss_growth_bytes": rss_bytes() - rss_before,
+            "tweetscout": {"requests": tweetscout.requests, "errors": tweetscout.errors},
+            "helius": {"requests": helius.requests, "errors": helius.errors},
+            "telegram": {"sent": len(telegram_client.sent), "failures": telegram_client.failures},
+        }
+
+    def run(self, levels):
+        """Run each `(handles, positions)` level on a fresh event loop."""
+        return {
+            "generated_at": time.time(),
+            "commit": git_commit(),
+            "python": sys.version.split()[0],
+            "config": {
+                "seconds": self.seconds,
+                "signals_per_second": self.signals_per_second,
+                "poll_seconds": self.poll_seconds,
+                "seed": self.seed,
+            },
+            "levels": [asyncio.run(self.run_level(handles, positions)) for handles, positions in levels],
+        }
+
+
+def compare_results(baseline, current):
+    """p95 of every stage per level, previous vs current, as printable rows."""
+    previous = {(level["handles"], level["positions"]): level for level in baseline.get("levels", [])}
+    rows = []
+    for level in current["levels"]:
+        before = previous.get((level["handles"], level["positions"]))
+        if not before:
+            continue
+        for stage in COMPARED_STAGES:
+            old, new = before[stage]["p95_ms"], level[stage]["p95_ms"]
+            change = (new / old - 1) * 100 if old else 0.0
+            rows.append(f"{level['handles']}h/{level['positions']}p {stage:17s} p95 {old:9.2f} -> {new:9.2f} ms ({change:+.0f}%)")
+    return rows
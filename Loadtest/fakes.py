@@ -0,0 +1,363 @@
+import asyncio
+import itertools
+import json
+import math
+import random
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+
+from BrothersTrusts.CoinSniper.Shared.contracts import BASE58_ALPHABET, SOLANA_ADDRESS_BYTES
+
+
+class FaultProfile:
+    """Injected upstream behaviour: fixed plus jittered latency and an error rate."""
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._random = random.Random(seed)
+
+    def delay(self):
+        return self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def fails(self):
+        return self.error_rate > 0 and self._random.random() < self.error_rate
+
+
+class FakeServer:
+    """Minimal keep-alive HTTP/1.1 JSON server; subclasses implement `route`."""
+
+    def __init__(self, faults=None):
+        self.faults = faults or FaultProfile()
+        self.requests = 0
+        self.errors = 0
+        self.base_url = None
+        self._server = None
+        self._writers = set()
+
+    async def start(self, host="127.0.0.1", port=0):
+        self._server = await asyncio.start_server(self._handle, host, port)
+        port = self._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{port}"
+        return self.base_url
+
+    async def close(self):
+        if self._server:
+            self._server.close()
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+
+    def route(self, method, path, body):
+        """Return `(status, payload)` for one request."""
+        raise NotImplementedError
+
+    async def _handle(self, reader, writer):
+        self._writers.add(writer)
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                method, target, _ = request_line.split(" ", 2)
+                headers = {}
+                for line in header_lines:
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", "0") or 0))
+
+                self.requests += 1
+                delay = self.faults.delay()
+                if delay:
+                    await asyncio.sleep(delay)
+                if self.faults.fails():
+                    self.errors += 1
+                    status, payload = self.faults.error_status, {"error": "injected failure"}
+                else:
+                    try:
+                        status, payload = self.route(method, target.split("?", 1)[0], json.loads(body) if body else None)
+                    except Exception as exc:
+                        status, payload = 500, {"error": str(exc)}
+
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            # Torn down by `FakeUpstreams`; end quietly (3.11's stream callback
+            # logs a traceback for handler tasks that finish cancelled).
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+
+def fake_contract(rng):
+    """A random, valid 32-byte base58 Solana address."""
+    value = rng.getrandbits(8 * SOLANA_ADDRESS_BYTES) | 1 << (8 * SOLANA_ADDRESS_BYTES - 1)
+    chars = []
+    while value:
+        value, index = divmod(value, 58)
+        chars.append(BASE58_ALPHABET[index])
+    return "".join(reversed(chars))
+
+
+def tweetscout_timestamp(unix_seconds):
+    return datetime.fromtimestamp(unix_seconds, timezone.utc).strftime("%a %b %d %H:%M:%S %z %Y")
+
+
+class FakeTweetScout(FakeServer):
+    """`GET /handle-to-id/<handle>` and `POST /user-tweets`, backed by `post()`ed tweets."""
+
+    PAGE_SIZE = 20
+
+    def __init__(self, faults=None):
+        super().__init__(faults)
+        self._tweets = {}  # user id -> newest-first tweet payloads
+        self._ids = itertools.count(10 ** 18)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def user_id(handle):
+        return str(zlib.crc32(handle.lstrip("@").lower().encode()))
+
+    def post(self, handle, text):
+        """Publish a tweet for `handle` (thread-safe); returns its id."""
+        tweet_id = next(self._ids)
+        tweet = {
+            "id_str": str(tweet_id),
+            "created_at": tweetscout_timestamp(time.time()),
+            "full_text": text,
+        }
+        with self._lock:
+            self._tweets.setdefault(self.user_id(handle), []).insert(0, tweet)
+        return tweet_id
+
+    def route(self, method, path, body):
+        if method == "GET" and path.startswith("/handle-to-id/"):
+            return 200, {"id": self.user_id(path.rsplit("/", 1)[1])}
+        if method == "POST" and path == "/user-tweets":
+            offset = int((body or {}).get("cursor") or 0)
+            with self._lock:
+                tweets = self._tweets.get(str((body or {}).get("user_id")), [])
+                page = tweets[offset:offset + self.PAGE_SIZE]
+                more = offset + self.PAGE_SIZE < len(tweets)
+            return 200, {"tweets": page, "next_cursor": str(offset + self.PAGE_SIZE) if more else None}
+        return 404, {"error": "not found"}
+
+
+class FakeHelius(FakeServer):
+    """Helius JSON-RPC `getAsset` / `getAssetBatch` with scripted price paths.
+
+    `price_paths` maps a contract to `f(seconds_since_start) -> price`;
+    unlisted contracts follow a seeded random walk around 1.0.
+    """
+
+    def __init__(self, faults=None, price_paths=None, volatility=0.01, seed=0):
+        super().__init__(faults)
+        self.price_paths = dict(price_paths or {})
+        self.volatility = volatility
+        self.seed = seed
+        self.started_at = time.monotonic()
+        self._walks = {}
+
+    def price(self, contract):
+        elapsed = time.monotonic() - self.started_at
+        path = self.price_paths.get(contract)
+        if path is not None:
+            return path(elapsed)
+        rng, level, last = self._walks.get(contract) or (random.Random(f"{self.seed}:{contract}"), 0.0, 0.0)
+        steps = max(1, int((elapsed - last) * 10))
+        level += rng.gauss(0, self.volatility) * math.sqrt(steps)
+        self._walks[contract] = (rng, level, elapsed)
+        return math.exp(level)
+
+    def _asset(self, contract):
+        return {"id": contract, "token_info": {"price_info": {"price_per_token": self.price(contract)}}}
+
+    def route(self, method, path, body):
+        if method != "POST" or not body:
+            return 404, {"error": "not found"}
+        if body.get("method") == "getAsset":
+            return 200, {"jsonrpc": "2.0", "id": body.get("id"), "result": self._asset(body["params"]["id"])}
+        if body.get("method") == "getAssetBatch":
+            result = [self._asset(contract) for contract in body["params"]["ids"]]
+            return 200, {"jsonrpc": "2.0", "id": body.get("id"), "result": result}
+        return 200, {"jsonrpc": "2.0", "id": body.get("id"), "error": {"code": -32601, "message": "method not found"}}
+
+
+class FakePriceStream:
+    """JSON-RPC WebSocket price feed for `Telegram.stream.PriceStream`.
+
+    Answers `accountSubscribe` / `accountUnsubscribe` and pushes a tick for
+    every subscribed contract each `interval` seconds, priced by `price`
+    (e.g. `FakeHelius.price`, so both paths see the same market). Ticks are
+    pool reserves: the first carries both sides, later ones only the quote
+    side that moved. `drop()` cuts every connection to exercise reconnects.
+    Needs aiohttp.
+    """
+
+    BASE_RESERVE = 1e9
+
+    def __init__(self, price, interval=0.05):
+        self.price = price
+        self.interval = interval
+        self.base_url = None
+        self.connections = 0
+        self.subscribes = 0
+        self.ticks = 0
+        self._runner = None
+        self._sockets = set()
+
+    async def start(self, host="127.0.0.1", port=0):
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get("/", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.base_url = f"ws://{host}:{port}/"
+        return self.base_url
+
+    async def drop(self):
+        for ws in list(self._sockets):
+            await ws.close()
+
+    async def close(self):
+        await self.drop()
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def _push(self, ws, subscriptions):
+        sent = {}
+        while not ws.closed:
+            for subscription, contract in list(subscriptions.items()):
+                quote = self.price(contract) * self.BASE_RESERVE
+                value = {"quote_reserve": quote}
+                if subscription not in sent:
+                    value["base_reserve"] = self.BASE_RESERVE
+                elif sent[subscription] == quote:
+                    continue
+                sent[subscription] = quote
+                self.ticks += 1
+                await ws.send_str(json.dumps({
+                    "jsonrpc": "2.0",
+                    "method": "accountNotification",
+                    "params": {"subscription": subscription, "result": {"value": value}},
+                }))
+            await asyncio.sleep(self.interval)
+
+    async def _handle(self, request):
+        from aiohttp import web
+
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections += 1
+        self._sockets.add(ws)
+        subscriptions = {}
+        pusher = asyncio.create_task(self._push(ws, subscriptions))
+        ids = itertools.count(1)
+        try:
+            async for message in ws:
+                body = json.loads(message.data)
+                if body.get("method") == "accountSubscribe":
+                    self.subscribes += 1
+                    subscription = next(ids)
+                    subscriptions[subscription] = body["params"][0]
+                    result = subscription
+                else:
+                    result = subscriptions.pop(body["params"][0], None) is not None
+                await ws.send_str(json.dumps({"jsonrpc": "2.0", "id": body.get("id"), "result": result}))
+        finally:
+            pusher.cancel()
+            self._sockets.discard(ws)
+        return ws
+
+
+class FakeTelegramClient:
+    """Stand-in for `telethon.TelegramClient` with injectable connect and send latency and send failures.
+
+    Every sent message is kept with its `perf_counter` timestamp in `sent`;
+    `on_send` (if set) is called with `(handle, message, sent_at)`.
+    """
+
+    def __init__(self, *args, faults=None, connect_latency=0.0, **kwargs):
+        self.faults = faults or FaultProfile()
+        self.connect_latency = connect_latency
+        self.connected = False
+        self.sent = []
+        self.failures = 0
+        self.handlers = []
+        self.on_send = None
+
+    def add_event_handler(self, handler, event):
+        self.handlers.append((handler, event))
+
+    def is_connected(self):
+        return self.connected
+
+    async def start(self):
+        if self.connect_latency:
+            await asyncio.sleep(self.connect_latency)
+        self.connected = True
+
+    async def send_message(self, handle, message):
+        delay = self.faults.delay()
+        if delay:
+            await asyncio.sleep(delay)
+        if self.faults.fails():
+            self.failures += 1
+            raise ConnectionError("injected Telegram send failure")
+        sent_at = time.perf_counter()
+        self.sent.append((handle, message, sent_at))
+        if self.on_send:
+            self.on_send(handle, message, sent_at)
+
+    async def run_until_disconnected(self):
+        while self.connected:
+            await asyncio.sleep(3600)
+
+    async def disconnect(self):
+        self.connected = False
+
+
+class FakeUpstreams:
+    """Runs fake servers on their own event loop thread, so their work never
+    shows up as lag on the loop under test."""
+
+    def __init__(self, *servers):
+        self.servers = servers
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        for server in self.servers:
+            asyncio.run_coroutine_threadsafe(server.start(), self._loop).result()
+        return self
+
+    def __exit__(self, *exc_info):
+        for server in self.servers:
+            asyncio.run_coroutine_threadsafe(server.close(), self._loop).result()
+        asyncio.run_coroutine_threadsafe(self._cancel_handlers(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    @staticmethod
+    async def _cancel_handlers():
+        """Finish connection handlers still parked on a keep-alive read."""
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,91 @@
+import re
+from functools import lru_cache
+
+BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+_BASE58_INDEX = {char: index for index, char in enumerate(BASE58_ALPHABET)}
+
+# Cheap prefilter: base58-looking words of plausible length. Every hit is then
+# checked by `is_valid_address`, so this only has to be fast, not precise.
+CONTRACT_CANDIDATE_PATTERN = re.compile(r"\b[A-HJ-NP-Za-km-z1-9]{32,44}\b")
+URL_PATTERN = re.compile(
+    r"https?://\S+|www\.\S+|\b(?:[a-z0-9-]+\.)+[a-z]{2,}/\S*",
+    re.IGNORECASE,
+)
+
+SOLANA_ADDRESS_BYTES = 32
+
+
+@lru_cache(maxsize=4096)
+def is_valid_address(candidate):
+    """True if `candidate` base58-decodes to exactly a 32-byte Solana public key."""
+    value = 0
+    for char in candidate:
+        index = _BASE58_INDEX.get(char)
+        if index is None:
+            return False
+        value = value * 58 + index
+    leading_zeros = len(candidate) - len(candidate.lstrip("1"))
+    return leading_zeros + (value.bit_length() + 7) // 8 == SOLANA_ADDRESS_BYTES
+
+
+def _url_spans(text):
+    return [match.span() for match in URL_PATTERN.finditer(text)]
+
+
+def _inside(spans, start, end):
+    for span_start, span_end in spans:
+        if span_start <= start and end <= span_end:
+            return True
+    return False
+
+
+def iter_contracts(text):
+    """Yield validated contract addresses from `text` in order of appearance,
+    skipping anything that sits inside a URL (media ids, link slugs)."""
+    if not text or len(text) < 32:
+        return
+    url_spans = None
+    for match in CONTRACT_CANDIDATE_PATTERN.finditer(text):
+        if url_spans is None:
+            url_spans = _url_spans(text)
+        if url_spans and _inside(url_spans, *match.span()):
+            continue
+        candidate = match.group()
+        if is_valid_address(candidate):
+            yield candidate
+
+
+def extract_contracts(text):
+    """Unique validated contract addresses in `text`, in order of appearance."""
+    return list(dict.fromkeys(iter_contracts(text)))
+
+
+def extract_first_contract(text):
+    return next(iter_contracts(text), None)
+
+
+def tweet_texts(tweet):
+    """Every text field of a tweet worth scanning: its own text plus any quoted
+    or retweeted text. Accepts plain strings, raw TweetScout tweets or the
+    trimmed records produced by `TwitterClient`."""
+    if isinstance(tweet, str):
+        return [tweet]
+    texts = [tweet.get("full_text") or ""]
+    for key in ("quoted_status", "retweeted_status"):
+        nested = tweet.get(key)
+        if nested:
+            texts.append(nested.get("full_text") or "")
+    for key in ("quoted_text", "retweeted_text"):
+        if tweet.get(key):
+            texts.append(tweet[key])
+    return texts
+
+
+def extract_contracts_from_tweets(tweets):
+    """Unique validated contract addresses across a whole page of tweets."""
+    seen = {}
+    for tweet in tweets:
+        for text in tweet_texts(tweet):
+            for contract in iter_contracts(text):
+                seen.setdefault(contract, None)
+    return list(seen)
@@ -0,0 +1,206 @@
+import asyncio
+import importlib.util
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import httpx
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class HttpTransport:
+    """Pooled keep-alive HTTP for TweetScout and Helius.
+
+    One `httpx.AsyncClient` (event-loop callers) and one `httpx.Client` (callers
+    already on a worker thread) are shared by every component, so a poll reuses
+    a warm TCP+TLS connection instead of paying a handshake. HTTP/2 is used
+    when the optional `h2` package is installed. 429 and 5xx responses and
+    transport errors are retried with full-jitter exponential backoff,
+    honouring `Retry-After` when the server sends it.
+    """
+
+    def __init__(self, transport=None, async_transport=None):
+        self.timeout = float(os.getenv("HTTP_TIMEOUT", "10"))
+        self.max_retries = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+        self.backoff_base = float(os.getenv("HTTP_BACKOFF_BASE", "0.25"))
+        self.backoff_max = float(os.getenv("HTTP_BACKOFF_MAX", "5"))
+        self.max_connections_per_host = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "20"))
+        self.http2 = importlib.util.find_spec("h2") is not None
+        self._transport = transport
+        self._async_transport = async_transport
+        self._client = None
+        self._async_client = None
+        self._host_limits = {}
+        self._async_host_limits = {}
+        self._lock = threading.Lock()
+
+    def _client_kwargs(self):
+        limits = httpx.Limits(
+            max_connections=self.max_connections_per_host * 4,
+            max_keepalive_connections=self.max_connections_per_host * 4,
+        )
+        return {"timeout": self.timeout, "limits": limits, "http2": self.http2}
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(transport=self._transport, **self._client_kwargs())
+            return self._client
+
+    @property
+    def async_client(self):
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(transport=self._async_transport, **self._client_kwargs())
+        return self._async_client
+
+    def _host_limit(self, url):
+        host = urlsplit(str(url)).netloc
+        with self._lock:
+            limit = self._host_limits.get(host)
+            if limit is None:
+                limit = self._host_limits[host] = threading.BoundedSemaphore(self.max_connections_per_host)
+            return limit
+
+    def _async_host_limit(self, url):
+        host = urlsplit(str(url)).netloc
+        limit = self._async_host_limits.get(host)
+        if limit is None:
+            limit = self._async_host_limits[host] = asyncio.Semaphore(self.max_connections_per_host)
+        return limit
+
+    def backoff(self, attempt, response=None):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def request(self, method, url, before_attempt=None, on_response=None, **kwargs):
+        """Send a request on the shared async pool, retrying 429/5xx and transport errors.
+
+        `before_attempt` (awaited) and `on_response` run around every attempt,
+        retries included, so callers can budget and watch rate limits.
+        """
+        limit = self._async_host_limit(url)
+        for attempt in range(self.max_retries + 1):
+            response = None
+            if before_attempt is not None:
+                await before_attempt()
+            try:
+                async with limit:
+                    response = await self.async_client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                if attempt == self.max_retries:
+                    raise
+            else:
+                if on_response is not None:
+                    on_response(response)
+                if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                    return response
+            await asyncio.sleep(self.backoff(attempt, response))
+
+    async def stream(self, method, url, consume, before_attempt=None, on_response=None, **kwargs):
+        """`request`, but the body is not buffered: the final response is handed,
+        still open, to `await consume(response)`. Returns `(response, result)`.
+
+        A transport error part-way through the body retries the whole request,
+        so `consume` must start from scratch on every call.
+        """
+        limit = self._async_host_limit(url)
+        for attempt in range(self.max_retries + 1):
+            response = None
+            if before_attempt is not None:
+                await before_attempt()
+            try:
+                async with limit:
+                    async with self.async_client.stream(method, url, **kwargs) as response:
+                        if on_response is not None:
+                            on_response(response)
+                        if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                            return response, await consume(response)
+            except httpx.TransportError:
+                if attempt == self.max_retries:
+                    raise
+            await asyncio.sleep(self.backoff(attempt, response))
+
+    def request_sync(self, method, url, **kwargs):
+        """Blocking twin of `request` for code already running off the event loop."""
+        limit = self._host_limit(url)
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                with limit:
+                    response = self.client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                if attempt == self.max_retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                    return response
+            time.sleep(self.backoff(attempt, response))
+
+    def stream_sync(self, method, url, consume, **kwargs):
+        """Blocking twin of `stream`."""
+        limit = self._host_limit(url)
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                with limit:
+                    with self.client.stream(method, url, **kwargs) as response:
+                        if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                            return response, consume(response)
+            except httpx.TransportError:
+                if attempt == self.max_retries:
+                    raise
+            time.sleep(self.backoff(attempt, response))
+
+    def _warm_sync(self, urls):
+        for url in urls:
+            try:
+                self.client.head(url)
+            except httpx.HTTPError:
+                pass
+
+    async def warm(self, urls):
+        """Open a connection to each URL's host in both pools so the first real
+        request skips the TCP+TLS handshake. Failures are ignored."""
+
+        async def _warm_async(url):
+            try:
+                await self.async_client.head(url)
+            except httpx.HTTPError:
+                pass
+
+        started = time.perf_counter()
+        await asyncio.gather(
+            asyncio.to_thread(self._warm_sync, urls),
+            *(_warm_async(url) for url in urls),
+        )
+        return time.perf_counter() - started
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+        self._async_host_limits = {}
+
+
+_transport = None
+
+
+def get_transport():
+    """The process-wide transport shared by TwitterClient and TelegramBot."""
+    global _transport
+    if _transport is None:
+        _transport = HttpTransport()
+    return _transport
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import time
+
+
+class SignalBus:
+    """One queue for contract signals from every source, feeding a single
+    extraction -> dedup -> buy stage.
+
+    A signal is a dict with at least `source` and `handle`, optional
+    `created_at` (unix seconds) and either a `tweet` record or a `text`.
+    Sources only `publish`; `run` (or `drain`) consumes in arrival order, so
+    when several sources report the same contract the first arrival buys and
+    the rest are counted as duplicates.
+    """
+
+    def __init__(self, extract, buy, seen_contracts, state_store=None, metrics=None, on_contracts=None):
+        self.extract = extract
+        self.buy = buy
+        self.seen_contracts = seen_contracts
+        self.state_store = state_store
+        self.metrics = metrics
+        self.on_contracts = on_contracts
+        self.queue = asyncio.Queue()
+        self.first_seen = {}  # contract -> (perf_counter, source) of the arrival that bought it
+        self.duplicates = {}  # source -> signals dropped because another arrival came first
+
+    def publish(self, signal):
+        signal.setdefault("received_at", time.perf_counter())
+        self.queue.put_nowait(signal)
+
+    async def process(self, signal):
+        source = signal.get("source", "unknown")
+        handle = signal.get("handle") or "unknown"
+        started = time.perf_counter()
+        if self.metrics:
+            self.metrics.observe("ingest_queue_wait", started - signal["received_at"], source=source)
+
+        contracts = self.extract(signal)
+        if self.metrics:
+            self.metrics.observe("extraction", time.perf_counter() - started, handle=handle)
+        if not contracts:
+            return []
+        print(f"contracts from {source} @{handle}: {contracts}")
+        if self.on_contracts:
+            self.on_contracts(signal, contracts)
+
+        bought = []
+        for contract in contracts:
+            started = time.perf_counter()
+            is_new = contract not in self.seen_contracts
+            if is_new:
+                self.seen_contracts.add(contract)
+                self.first_seen[contract] = (started, source)
+                if self.state_store:
+                    self.state_store.add_seen(contract)
+            else:
+                self.duplicates[source] = self.duplicates.get(source, 0) + 1
+                first = self.first_seen.get(contract)
+                if first and first[1] != source and self.metrics:
+                    self.metrics.observe("cross_source_lag", started - first[0], source=source)
+            if self.metrics:
+                self.metrics.observe("dedup", time.perf_counter() - started, handle=handle)
+            if is_new:
+                await self.buy(contract, signal=signal)
+                bought.append(contract)
+        return bought
+
+    async def drain(self):
+        """Process whatever is queued right now, without a running consumer (for tests)."""
+        while not self.queue.empty():
+            await self._process_next(self.queue.get_nowait())
+
+    async def run(self):
+        while True:
+            await self._process_next(await self.queue.get())
+
+    async def _process_next(self, signal):
+        try:
+            await self.process(signal)
+        except Exception as exc:
+            print(f"Failed to act on {signal.get('source')} signal from @{signal.get('handle')}: {exc}")
+        finally:
+            self.queue.task_done()
+
+    async def serve_http(self, host="127.0.0.1", port=8765, token=None, origin=None):
+        """Accept signals as `POST /signal` JSON `{"message", "username", "source"}`
+        from the Discord extension.
+
+        Any page in the browser can reach a localhost port, so `token` is
+        required and must come in an `X-Signal-Token` header, the body must be
+        `application/json`, and a request carrying an `Origin` must come from
+        `origin` (default: any `chrome-extension://` origin). No CORS headers
+        are sent; the extension's host permission lets it post without them."""
+        if not token:
+            raise ValueError("SIGNAL_HTTP_TOKEN is required to accept signals over HTTP")
+
+        def _allowed_origin(value):
+            if value is None:
+                return True  # not a browser page, e.g. curl with the token
+            return value == origin if origin else value.startswith("chrome-extension://")
+
+        def _response(writer, status, payload):
+            body = json.dumps(payload).encode()
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n".encode()
+                + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+                + body
+            )
+
+        async def _handle(reader, writer):
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                method, path, _ = request_line.split(" ", 2)
+                headers = {}
+                for line in header_lines:
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                content_type = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+                if method != "POST" or path.split("?", 1)[0] != "/signal":
+                    _response(writer, "404 Not Found", {"error": "POST /signal"})
+                elif not _allowed_origin(headers.get("origin")):
+                    _response(writer, "403 Forbidden", {"error": "origin not allowed"})
+                elif headers.get("x-signal-token") != token:
+                    _response(writer, "401 Unauthorized", {"error": "bad token"})
+                elif content_type != "application/json":
+                    _response(writer, "415 Unsupported Media Type", {"error": "application/json required"})
+                else:
+                    body = await reader.readexactly(int(headers.get("content-length") or 0))
+                    try:
+                        payload = json.loads(body or b"{}")
+                    except ValueError:
+                        payload = None
+                    text = payload.get("message") or payload.get("text") if isinstance(payload, dict) else None
+                    if not isinstance(text, str) or not text:
+                        _response(writer, "400 Bad Request", {"error": "message required"})
+                    else:
+                        self.publish({
+                            "source": str(payload.get("source") or "http"),
+                            "handle": str(payload.get("username") or "unknown"),
+                            "created_at": time.time(),
+                            "text": text,
+                        })
+                        _response(writer, "202 Accepted", {"status": "queued"})
+                await writer.drain()
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError, ConnectionError):
+                pass
+            finally:
+                writer.close()
+
+        return await asyncio.start_server(_handle, host, port)
@@ -0,0 +1,130 @@
+import asyncio
+import json
+import math
+import os
+import time
+from contextlib import contextmanager
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram: fixed memory, ~5% relative error on percentiles."""
+
+    GROWTH = 1.05
+    MIN_SECONDS = 1e-5
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        seconds = max(float(seconds), 0.0)
+        if seconds <= self.MIN_SECONDS:
+            index = 0
+        else:
+            index = int(math.log(seconds / self.MIN_SECONDS, self.GROWTH)) + 1
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, quantile):
+        if not self.count:
+            return 0.0
+        rank = quantile * self.count
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(self.MIN_SECONDS * self.GROWTH ** index, self.max)
+        return self.max
+
+    def summary(self):
+        """Milliseconds, which is the unit everyone reads these in."""
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.50) * 1000, 3),
+            "p95_ms": round(self.percentile(0.95) * 1000, 3),
+            "p99_ms": round(self.percentile(0.99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class Metrics:
+    """Named latency histograms, each kept overall and per label set (e.g. per handle)."""
+
+    def __init__(self):
+        self._histograms = {}
+
+    def observe(self, name, seconds, **labels):
+        keys = [(name, ())]
+        if labels:
+            keys.append((name, tuple(sorted(labels.items()))))
+        for key in keys:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = LatencyHistogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def histogram(self, name, **labels):
+        return self._histograms.get((name, tuple(sorted(labels.items()))))
+
+    def snapshot(self):
+        snapshot = {}
+        for (name, labels), histogram in sorted(self._histograms.items()):
+            snapshot.setdefault(name, []).append({"labels": dict(labels), **histogram.summary()})
+        return snapshot
+
+    def dump(self, path):
+        _write_json(path, {"generated_at": time.time(), "metrics": self.snapshot()})
+
+    async def dump_periodically(self, path, interval_seconds):
+        while True:
+            await asyncio.sleep(interval_seconds)
+            # The histograms are only safe to read on the loop thread that records
+            # into them; only the file write goes to a worker thread.
+            payload = {"generated_at": time.time(), "metrics": self.snapshot()}
+            try:
+                await asyncio.to_thread(_write_json, path, payload)
+            except OSError as exc:
+                print(f"Failed to dump metrics to {path}: {exc}")
+
+    async def serve(self, host="127.0.0.1", port=9108):
+        """Serve the snapshot as JSON on any `GET` to `http://host:port/`."""
+
+        async def _handle(reader, writer):
+            try:
+                await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                pass
+            body = json.dumps(self.snapshot()).encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+            writer.close()
+
+        return await asyncio.start_server(_handle, host, port)
+
+
+# Process-wide registry shared by the Controller, TwitterClient and TelegramBot.
+metrics = Metrics()
+
+
+def _write_json(path, payload):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp_path, path)
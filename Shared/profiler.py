@@ -0,0 +1,201 @@
+import asyncio
+import asyncio.events
+import collections
+import json
+import os
+import sys
+import threading
+import time
+
+from BrothersTrusts.CoinSniper.Shared.metrics import LatencyHistogram, metrics as default_metrics
+
+_original_run = asyncio.events.Handle._run
+_active = None  # the started LoopProfiler, if any
+
+
+def _profiled_run(handle):
+    profiler = _active
+    if profiler is None or threading.get_ident() != profiler.loop_thread:
+        return _original_run(handle)
+    profiler._current = handle
+    started = profiler._running_since = time.perf_counter()
+    try:
+        return _original_run(handle)
+    finally:
+        profiler._running_since = None
+        profiler._account(handle, time.perf_counter() - started)
+
+
+def task_label(callback):
+    """Who a loop callback runs for: the task's name if it was given one, else
+    its coroutine (e.g. `TelegramBot.monitor_prices`), else the callback."""
+    owner = getattr(callback, "__self__", None)
+    if isinstance(owner, asyncio.Task):
+        name = owner.get_name()
+        if not name.startswith("Task-"):
+            return name
+        coro = owner.get_coro()
+        return getattr(coro, "__qualname__", None) or type(coro).__name__
+    return getattr(callback, "__qualname__", None) or type(callback).__name__
+
+
+class LoopProfiler:
+    """Always-on runtime profiler for the asyncio loop.
+
+    - Loop lag: a coroutine sleeps `LOOP_LAG_INTERVAL` and records how late it
+      wakes as the `loop_lag` histogram.
+    - Per-task time: every callback the loop runs is timed and charged to its
+      task (see `task_label`), giving steps / busy time / worst step per task.
+    - Blocking calls: a watchdog thread samples the loop thread's stack every
+      `LOOP_SAMPLE_INTERVAL` while a callback is running. A callback that
+      holds the loop past `LOOP_BLOCK_THRESHOLD` is kept, with the stack seen
+      while it blocked, in `blocked` and counted as `loop_blocked`.
+
+    The samples double as a profile of where loop time goes; `folded()` emits
+    them in the collapsed-stack format flamegraph.pl and speedscope read.
+    An idle loop costs nothing beyond the lag coroutine: the watchdog only
+    walks the stack while a callback is running.
+    """
+
+    def __init__(self, metrics=None):
+        self.metrics = metrics or default_metrics
+        self.lag_interval = float(os.getenv("LOOP_LAG_INTERVAL", "0.01"))
+        self.block_threshold = float(os.getenv("LOOP_BLOCK_THRESHOLD", "0.05"))
+        self.sample_interval = float(os.getenv("LOOP_SAMPLE_INTERVAL", "0.01"))
+        self.max_stacks = int(os.getenv("LOOP_PROFILE_MAX_STACKS", "5000"))
+        self.tasks = {}  # label -> [steps, busy seconds, worst step seconds]
+        self.samples = collections.Counter()  # folded stack -> samples
+        self.blocked = collections.deque(maxlen=int(os.getenv("LOOP_BLOCKED_HISTORY", "100")))
+        self.loop_thread = None
+        self._current = None
+        self._running_since = None
+        self._blocked_stack = (None, None)  # (handle, stack) last sampled past the threshold
+        self._lag_task = None
+        self._watchdog = None
+        self._stopped = threading.Event()
+
+    # -- lifecycle ---------------------------------------------------------
+
+    def start(self):
+        """Start profiling the running loop (call from inside it)."""
+        global _active
+        self.loop_thread = threading.get_ident()
+        self._stopped.clear()
+        _active = self
+        asyncio.events.Handle._run = _profiled_run
+        self._lag_task = asyncio.create_task(self._sample_lag(), name="loop_profiler.lag")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-profiler", daemon=True)
+        self._watchdog.start()
+
+    def stop(self):
+        global _active
+        if _active is self:
+            _active = None
+            asyncio.events.Handle._run = _original_run
+        if self._lag_task:
+            self._lag_task.cancel()
+            self._lag_task = None
+        self._stopped.set()
+        if self._watchdog:
+            self._watchdog.join()
+            self._watchdog = None
+
+    # -- loop side ---------------------------------------------------------
+
+    async def _sample_lag(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.lag_interval)
+            self.metrics.observe("loop_lag", max(time.perf_counter() - started - self.lag_interval, 0.0))
+
+    def _account(self, handle, elapsed):
+        label = task_label(handle._callback)
+        stats = self.tasks.get(label)
+        if stats is None:
+            stats = self.tasks[label] = [0, 0.0, 0.0]
+        stats[0] += 1
+        stats[1] += elapsed
+        if elapsed > stats[2]:
+            stats[2] = elapsed
+        if elapsed >= self.block_threshold:
+            sampled_handle, stack = self._blocked_stack
+            stack = stack if sampled_handle is handle else None
+            self.blocked.append({"at": time.time(), "task": label, "ms": round(elapsed * 1000, 3), "stack": stack})
+            self.metrics.observe("loop_blocked", elapsed, task=label)
+            where = stack[-1] if stack else "no stack sampled"
+            print(f"Event loop blocked {elapsed * 1000:.0f} ms by {label} at {where}")
+
+    # -- watchdog thread ---------------------------------------------------
+
+    def _watch(self):
+        while not self._stopped.wait(self.sample_interval):
+            since, handle = self._running_since, self._current
+            if since is None:
+                continue
+            frame = sys._current_frames().get(self.loop_thread)
+            if frame is None:
+                continue
+            stack = self._stack(frame)
+            key = ";".join([task_label(handle._callback), *stack])
+            if key in self.samples or len(self.samples) < self.max_stacks:
+                self.samples[key] += 1
+            else:
+                self.samples["[other]"] += 1
+            if time.perf_counter() - since >= self.block_threshold:
+                self._blocked_stack = (handle, stack)
+
+    @staticmethod
+    def _stack(frame):
+        """Outermost-first frames above the loop's own dispatch."""
+        frames = []
+        while frame is not None and frame.f_code is not _profiled_run.__code__:
+            code = frame.f_code
+            name = getattr(code, "co_qualname", code.co_name)
+            frames.append(f"{name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        frames.reverse()
+        return frames
+
+    # -- output ------------------------------------------------------------
+
+    # Call these on the loop thread, which is the one mutating `tasks`, `blocked`
+    # and the lag histogram; the watchdog only adds to `samples`, which is
+    # copied in one step. `dump_periodically` writes the result off the loop.
+
+    def report(self):
+        tasks = {
+            label: {"steps": steps, "busy_ms": round(busy * 1000, 3), "max_step_ms": round(worst * 1000, 3)}
+            for label, (steps, busy, worst) in sorted(dict(self.tasks).items(), key=lambda item: -item[1][1])
+        }
+        return {
+            "lag": (self.metrics.histogram("loop_lag") or LatencyHistogram()).summary(),
+            "tasks": tasks,
+            "blocked": list(self.blocked),
+            "samples": sum(dict(self.samples).values()),
+        }
+
+    def folded(self):
+        """Collapsed stacks (`task;outer;...;inner count`), one per line."""
+        samples = sorted(dict(self.samples).items(), key=lambda item: -item[1])
+        return "".join(f"{stack} {count}\n" for stack, count in samples)
+
+    def dump(self, path):
+        """Write the folded stacks to `path` and the report to `path.json`."""
+        _write_profile(path, self.folded(), self.report())
+
+    async def dump_periodically(self, path, interval_seconds):
+        while True:
+            await asyncio.sleep(interval_seconds)
+            folded, report = self.folded(), self.report()
+            try:
+                await asyncio.to_thread(_write_profile, path, folded, report)
+            except OSError as exc:
+                print(f"Failed to dump loop profile to {path}: {exc}")
+
+
+def _write_profile(path, folded, report):
+    for target, text in ((path, folded), (f"{path}.json", json.dumps(report, indent=2))):
+        tmp_path = f"{target}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(text)
+        os.replace(tmp_path, target)
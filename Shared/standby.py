@@ -0,0 +1,49 @@
+import asyncio
+import os
+
+
+class LeaderLock:
+    """An exclusive `flock` on a file decides which of several identical
+    processes is the primary.
+
+    The kernel drops the lock the moment its holder exits, however it dies,
+    so a hot standby that keeps retrying (`STANDBY_POLL_SECONDS`, default
+    50 ms) takes over within one retry. POSIX only.
+    """
+
+    def __init__(self, path, poll_seconds=None):
+        self.path = path
+        self.poll_seconds = float(os.getenv("STANDBY_POLL_SECONDS", "0.05")) if poll_seconds is None else poll_seconds
+        self._fd = None
+        self.held = False
+
+    def try_acquire(self):
+        import fcntl
+
+        if self.held:
+            return True
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        os.ftruncate(self._fd, 0)
+        os.write(self._fd, f"{os.getpid()}\n".encode())
+        self.held = True
+        return True
+
+    async def acquire(self):
+        while not self.try_acquire():
+            await asyncio.sleep(self.poll_seconds)
+
+    def release(self):
+        if self._fd is None:
+            return
+        if self.held:
+            import fcntl
+
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            self.held = False
+        os.close(self._fd)
+        self._fd = None
@@ -0,0 +1,123 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    contract TEXT PRIMARY KEY,
+    sold REAL NOT NULL,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS seen_contracts (
+    contract TEXT PRIMARY KEY,
+    seen_at REAL NOT NULL
+);
+"""
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def open_state_store(path=None):
+    """The process-wide store for `path` (default `STATE_DB_PATH`), or None when
+    persistence is disabled with an empty path. Controller and TelegramBot both
+    call this and end up sharing one writer."""
+    path = path if path is not None else os.getenv("STATE_DB_PATH", "coinsniper_state.db")
+    if not path:
+        return None
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None or store.closed:
+            store = _stores[path] = StateStore(path)
+        return store
+
+
+class StateStore:
+    """SQLite (WAL) store for trades and the dedup set.
+
+    Mutations only touch an in-memory pending map, so callers on the event loop
+    never wait on disk. A daemon thread coalesces them and writes one
+    transaction every `flush_seconds`.
+    """
+
+    def __init__(self, path, flush_seconds=None):
+        self.path = path
+        self.flush_seconds = float(
+            flush_seconds if flush_seconds is not None else os.getenv("STATE_FLUSH_SECONDS", "0.2")
+        )
+        self.closed = False
+        self._pending_trades = {}
+        self._pending_seen = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def load_open_trades(self):
+        with self._write_lock:
+            rows = self._conn.execute("SELECT contract, data FROM trades WHERE sold < 1.0").fetchall()
+        return {contract: json.loads(data) for contract, data in rows}
+
+    def load_seen_contracts(self):
+        with self._write_lock:
+            rows = self._conn.execute("SELECT contract FROM seen_contracts").fetchall()
+        return {contract for (contract,) in rows}
+
+    def save_trade(self, contract, trade):
+        with self._lock:
+            self._pending_trades[contract] = dict(trade)
+        self._ensure_writer()
+
+    def add_seen(self, contract):
+        with self._lock:
+            self._pending_seen.setdefault(contract, time.time())
+        self._ensure_writer()
+
+    def _ensure_writer(self):
+        if self._thread is None and not self.closed:
+            self._thread = threading.Thread(target=self._run, name="state-store-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self.closed:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as exc:
+                print(f"Failed to persist state to {self.path}: {exc}")
+
+    def flush(self):
+        with self._lock:
+            trades, self._pending_trades = self._pending_trades, {}
+            seen, self._pending_seen = self._pending_seen, {}
+        if not trades and not seen:
+            return
+        now = time.time()
+        with self._write_lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO trades (contract, sold, data, updated_at) VALUES (?, ?, ?, ?)",
+                [(contract, trade.get("sold", 0.0), json.dumps(trade), now) for contract, trade in trades.items()],
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO seen_contracts (contract, seen_at) VALUES (?, ?)",
+                list(seen.items()),
+            )
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+        with self._write_lock:
+            self._conn.close()
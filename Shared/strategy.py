@@ -0,0 +1,91 @@
+import os
+
+import numpy as np
+
+DEFAULT_TAKE_PROFIT_LEVELS = (
+    (2.0, 0.30),
+    (5.0, 0.60),
+    (10.0, 0.90),
+)
+
+# Reason labels used by `TelegramBot.evaluate_sell`; index order is the order rules are checked.
+SELL_REASONS = (
+    "take profit",
+    "Trailing stop hit",
+    "Hard stop loss",
+    "Time-based exit",
+)
+TAKE_PROFIT, TRAILING_STOP, HARD_STOP, TIME_EXIT = range(len(SELL_REASONS))
+
+
+def exit_params_from_env():
+    """Exit strategy parameters shared by the live bot and the backtester."""
+    return {
+        "max_hold_seconds": int(os.getenv("MAX_HOLD_SECONDS", "1800")),
+        "time_exit_multiplier": float(os.getenv("TIME_EXIT_MULTIPLIER", "1.2")),
+        "trailing_start_multiplier": float(os.getenv("TRAILING_START_MULTIPLIER", "2.0")),
+        "trailing_stop_factor": float(os.getenv("TRAILING_STOP_FACTOR", "0.75")),
+        "hard_stop_factor": float(os.getenv("HARD_STOP_FACTOR", "0.7")),
+        "take_profit_levels": [tuple(level) for level in DEFAULT_TAKE_PROFIT_LEVELS],
+    }
+
+
+def evaluate_exits(rules, entry, high, sold, price, held_seconds):
+    """Run the exit rules over arrays of positions in one pass.
+
+    `rules` carries the `exit_params_from_env` attributes (a `TelegramBot` or
+    `Backtester`); `high` must already include `price`. Returns `(pct, reason,
+    level)`: the whole percentage to sell, an index into `SELL_REASONS` (-1 for
+    no action) and the take-profit level that fired (-1 otherwise). The rule
+    order and early returns match the original per-trade `evaluate_sell`.
+    """
+    count = len(price)
+    with np.errstate(invalid="ignore"):
+        pending = (entry > 0) & (sold < 1.0) & (price > 0)
+    multiplier = np.zeros(count)
+    multiplier[pending] = price[pending] / entry[pending]
+    pct = np.zeros(count)
+    reason = np.full(count, -1)
+    level = np.full(count, -1)
+
+    for index, (level_multiplier, target_sold) in enumerate(rules.take_profit_levels):
+        hit = pending & (multiplier >= level_multiplier) & (sold < target_sold)
+        if hit.any():
+            pct[hit] = np.round((target_sold - sold[hit]) * 100)
+            reason[hit] = TAKE_PROFIT
+            level[hit] = index
+            pending &= ~hit
+
+    remaining = np.round((1.0 - sold) * 100)
+    # Only a trailing stop that fires ends the checks; above the trailing start
+    # the hard stop and time exit still apply when it does not.
+    trailing = (
+        pending
+        & (multiplier >= rules.trailing_start_multiplier)
+        & (price <= high * rules.trailing_stop_factor)
+    )
+    pct[trailing] = remaining[trailing]
+    reason[trailing] = TRAILING_STOP
+    pending &= ~trailing
+
+    hard_stop = pending & (price <= entry * rules.hard_stop_factor)
+    pct[hard_stop] = remaining[hard_stop]
+    reason[hard_stop] = HARD_STOP
+    pending &= ~hard_stop
+
+    timed_out = (
+        pending
+        & (held_seconds > rules.max_hold_seconds)
+        & (multiplier < rules.time_exit_multiplier)
+    )
+    pct[timed_out] = remaining[timed_out]
+    reason[timed_out] = TIME_EXIT
+
+    reason[pct <= 0] = -1
+    return pct, reason, level
+
+
+def sell_reason_label(rules, reason, level):
+    if reason == TAKE_PROFIT:
+        return f"{rules.take_profit_levels[level][0]}x take profit"
+    return SELL_REASONS[reason]
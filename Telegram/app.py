@@ -1,16 +1,43 @@
-from telethon import TelegramClient, events
 import os
 import asyncio
 import re
 import time
-import requests
+import httpx
+import numpy as np
 from dotenv import load_dotenv
 
+from BrothersTrusts.CoinSniper.Shared.contracts import extract_first_contract
+from BrothersTrusts.CoinSniper.Shared.http import get_transport
+from BrothersTrusts.CoinSniper.Shared.metrics import metrics
+from BrothersTrusts.CoinSniper.Shared.state import open_state_store
+from BrothersTrusts.CoinSniper.Telegram.cache import PriceCache
+from BrothersTrusts.CoinSniper.Telegram.outbox import CommandQueue
+from BrothersTrusts.CoinSniper.Telegram.positions import PositionBook
+from BrothersTrusts.CoinSniper.Telegram.scheduler import PriceScheduler
+from BrothersTrusts.CoinSniper.Telegram.stream import PriceStream
+from BrothersTrusts.CoinSniper.Shared.strategy import exit_params_from_env
+
 load_dotenv()
 
+HELIUS_RPC_URL = "https://mainnet.helius-rpc.com/"
+
+# Telethon takes ~0.4 s to import and nothing before the first TweetScout poll
+# needs it, so it is loaded on first connect (off the event loop) instead.
+TelegramClient = None
+events = None
+
+
+def _load_telethon():
+    global TelegramClient, events
+    if events is None:
+        import telethon
+
+        events = telethon.events
+        TelegramClient = TelegramClient or telethon.TelegramClient
+
 
 class TelegramBot:
-    def __init__(self):
+    def __init__(self, client=None):
         self.api_id = os.getenv("API_ID")
         self.api_hash = os.getenv("API_HASH")
         self.helius_api_key = os.getenv("HELIUS_API_KEY")
@@ -18,80 +45,218 @@ class TelegramBot:
         if not self.api_id or not self.api_hash:
             raise ValueError("API_ID and API_HASH must be set in environment variables.")
 
-        session_name = os.getenv("TELEGRAM_SESSION", "coinsniper_session")
-        self.client = TelegramClient(session_name, self.api_id, self.api_hash)
+        self.session_name = os.getenv("TELEGRAM_SESSION", "coinsniper_session")
+        self.client = client
+        if self.client is None and TelegramClient is not None:
+            self.client = self._build_client()
+        self._handlers = []  # (handler, NewMessage filters), registered once the client exists
+        self._connect_task = None
+        # A hot standby connects early but must neither act on messages nor write
+        # state until it holds the primary lock (see `enter_standby`).
+        self.standby = False
         self.gmgn_bot = os.getenv("GMGN_BOT", "@GMGN_sol04_bot")
         self.dyor_bot = os.getenv("DYOR_BOT", "@TrenchyBot")
         self.buy_amount_sol = os.getenv("BUY_AMOUNT_SOL", "0.00015")
 
-        self.trades = {}
+        self.trades = PositionBook()
+        self.state_store = open_state_store()
+        if self.state_store:
+            self.trades.update(self.state_store.load_open_trades())
         self.price_poll_seconds = float(os.getenv("PRICE_POLL_SECONDS", "5"))
-        self.max_hold_seconds = int(os.getenv("MAX_HOLD_SECONDS", "1800"))
-        self.time_exit_multiplier = float(os.getenv("TIME_EXIT_MULTIPLIER", "1.2"))
-        self.trailing_start_multiplier = float(os.getenv("TRAILING_START_MULTIPLIER", "2.0"))
-        self.trailing_stop_factor = float(os.getenv("TRAILING_STOP_FACTOR", "0.75"))
-        self.hard_stop_factor = float(os.getenv("HARD_STOP_FACTOR", "0.7"))
-        self.take_profit_levels = [
-            (2.0, 0.30),
-            (5.0, 0.60),
-            (10.0, 0.90),
-        ]
+        self.price_batch_size = int(os.getenv("PRICE_BATCH_SIZE", "100"))
+        self.price_request_timeout = float(os.getenv("PRICE_REQUEST_TIMEOUT", "10"))
+        self.helius_rpc_url = os.getenv("HELIUS_RPC_URL", HELIUS_RPC_URL)
+        self.http = get_transport()
+        self.price_cache = PriceCache()
+        exit_params = exit_params_from_env()
+        self.max_hold_seconds = exit_params["max_hold_seconds"]
+        self.time_exit_multiplier = exit_params["time_exit_multiplier"]
+        self.trailing_start_multiplier = exit_params["trailing_start_multiplier"]
+        self.trailing_stop_factor = exit_params["trailing_stop_factor"]
+        self.hard_stop_factor = exit_params["hard_stop_factor"]
+        self.take_profit_levels = exit_params["take_profit_levels"]
 
         self._monitor_task = None
         self._client_task = None
+        self.metrics = metrics
+        self._buy_sent_at = {}  # contract -> (perf_counter when /buy went out, handle)
+        self._entry_tasks = set()
+        self._monitor_wakeup = None
+        self.price_scheduler = PriceScheduler(self)
+        self.commands = CommandQueue(self)
+        self.price_stream = PriceStream(self)
+        self._stream_task = None
+
+        self.add_handler(self._handle_gmgn_message, from_users=self.gmgn_bot)
+
+    def _build_client(self):
+        _load_telethon()
+        return TelegramClient(self.session_name, self.api_id, self.api_hash)
+
+    def add_handler(self, handler, **filters):
+        """Call `handler` for new messages matching `filters` (see `events.NewMessage`)."""
+        self._handlers.append((handler, filters))
+        if self.client is not None and not self.standby:
+            _load_telethon()
+            self.client.add_event_handler(handler, events.NewMessage(**filters))
+
+    def enter_standby(self):
+        """Ignore incoming messages and persist nothing until `leave_standby`, so a
+        standby's connected client cannot write rows over the primary's."""
+        self.standby = True
+        if self.client is not None:
+            for handler, _ in self._handlers:
+                self.client.remove_event_handler(handler)
+
+    def leave_standby(self):
+        """Start handling messages and persisting trades (this process is primary now)."""
+        self.standby = False
+        if self.client is not None:
+            _load_telethon()
+            for handler, filters in self._handlers:
+                self.client.add_event_handler(handler, events.NewMessage(**filters))
+
+    async def connect(self):
+        """Build and start the Telegram client once, however many callers race
+        here; Telethon is imported in a worker thread so polling is not held up."""
+        task = self._connect_task
+        if task is None or (task.done() and (task.cancelled() or task.exception())):
+            task = self._connect_task = asyncio.create_task(self._connect(), name="telegram.connect")
+        await asyncio.shield(task)
+
+    async def _connect(self):
+        if self.client is None:
+            await asyncio.to_thread(_load_telethon)
+            self.client = self._build_client()
+            if not self.standby:
+                for handler, filters in self._handlers:
+                    self.client.add_event_handler(handler, events.NewMessage(**filters))
+        if not self.client.is_connected():
+            await self.client.start()
 
-        self.client.add_event_handler(
-            self._handle_gmgn_message, events.NewMessage(from_users=self.gmgn_bot)
-        )
+    def reload_state(self):
+        """Replace open positions with what the state store holds (standby takeover)."""
+        if self.state_store:
+            self.state_store.flush()
+            self.trades.clear()
+            self.trades.update(self.state_store.load_open_trades())
 
     async def start(self):
-        if not self.client.is_connected():
-            await self.client.start()
+        await self.connect()
         if not self._client_task:
-            self._client_task = asyncio.create_task(self.client.run_until_disconnected())
+            self._client_task = asyncio.create_task(self.client.run_until_disconnected(), name="telegram.client")
         if not self._monitor_task:
-            self._monitor_task = asyncio.create_task(self.monitor_prices())
+            self._monitor_task = asyncio.create_task(self.monitor_prices(), name="telegram.monitor")
+        if self.price_stream.url and not self._stream_task:
+            self._stream_task = asyncio.create_task(self.price_stream.run(), name="telegram.stream")
 
     async def close(self):
+        for task in list(self._entry_tasks):
+            task.cancel()
+        self.commands.close()
         if self._monitor_task:
             self._monitor_task.cancel()
             self._monitor_task = None
+        if self._stream_task:
+            self._stream_task.cancel()
+            self._stream_task = None
         if self._client_task:
             self._client_task.cancel()
             self._client_task = None
-        if self.client.is_connected():
+        if self._connect_task and not self._connect_task.done():
+            self._connect_task.cancel()
+        if self.client is not None and self.client.is_connected():
             await self.client.disconnect()
+        if self.state_store:
+            await asyncio.to_thread(self.state_store.flush)
+
+    def _persist_trade(self, contract):
+        if self.state_store and not self.standby and contract in self.trades:
+            self.state_store.save_trade(contract, self.trades[contract])
 
     async def send_message(self, handle, message):
         await self.start()
         await self.client.send_message(handle, message)
         print(f"Sent command: {message}")
 
-    async def buy_token(self, contract):
-        await self.send_message(self.gmgn_bot, f"/buy {contract} {self.buy_amount_sol}")
+    def _record_entry_capture(self, contract, source):
+        sent = self._buy_sent_at.pop(contract, None)
+        if sent:
+            sent_at, handle = sent
+            self.metrics.observe(
+                "entry_price_capture", time.perf_counter() - sent_at, handle=handle, source=source
+            )
+
+    def _set_entry(self, contract, entry_price, source):
+        """Record where a position's entry price came from. The GMGN fill
+        confirmation is authoritative and replaces an earlier Helius or monitor
+        estimate as long as nothing has been sold against it yet."""
+        trade = self.trades.get(contract)
+        if not trade or not entry_price:
+            return False
+        if trade["entry"] != 0.0 and not (
+            source == "gmgn" and trade.get("entry_source") != "gmgn" and trade["sold"] == 0.0
+        ):
+            return False
+        trade["entry"] = entry_price
+        trade["high"] = max(trade["high"], entry_price)
+        trade["last_price"] = entry_price
+        trade["entry_source"] = source
+        self._record_entry_capture(contract, source)
+        self._persist_trade(contract)
+        return True
+
+    async def _discover_entry(self, contract):
         entry_price = await self.query_price(contract)
+        self._set_entry(contract, entry_price, "helius")
+
+    async def settle_entries(self):
+        """Wait for every background entry-price lookup started by `buy_token`."""
+        if self._entry_tasks:
+            await asyncio.gather(*list(self._entry_tasks), return_exceptions=True)
+
+    async def buy_token(self, contract, signal=None):
+        """Send `/buy` and return as soon as it is out; the entry price is
+        discovered in the background so back-to-back buys never wait on Helius."""
+        signal = signal or {}
+        handle = signal.get("handle") or "unknown"
+        sent_at = await self.commands.buy(self.gmgn_bot, f"/buy {contract} {self.buy_amount_sol}")
+        if signal.get("created_at"):
+            self.metrics.observe("signal_to_buy", time.time() - signal["created_at"], handle=handle)
+
         if contract not in self.trades:
+            self._buy_sent_at[contract] = (sent_at, handle)
             self.trades[contract] = {
-                "entry": entry_price or 0.0,
-                "high": entry_price or 0.0,
+                "entry": 0.0,
+                "high": 0.0,
                 "sold": 0.0,
                 "opened_at": time.time(),
-                "last_price": entry_price or 0.0,
+                "last_price": 0.0,
+                "entry_source": None,
             }
+            self._persist_trade(contract)
+            task = asyncio.create_task(self._discover_entry(contract), name="telegram.entry_price")
+            self._entry_tasks.add(task)
+            task.add_done_callback(self._entry_tasks.discard)
+            self.wake_monitor()
         print(f"Buy submitted for {contract} at {self.buy_amount_sol} SOL")
 
-    async def sell_token(self, contract, percentage, reason):
+    async def sell_token(self, contract, percentage, reason, triggered_at=None):
+        """Queue `/sell` behind any more urgent command and wait until it is sent."""
         if contract in self.trades and self.trades[contract]["sold"] < 1.0:
-            sell_cmd = f"/sell {contract} {percentage}%"
-            await self.send_message(self.gmgn_bot, sell_cmd)
-            self.trades[contract]["sold"] += percentage / 100
-            self.trades[contract]["sold"] = min(self.trades[contract]["sold"], 1.0)
-            print(f"Sold {percentage}% of {contract} | Reason: {reason}")
+            triggered_at = triggered_at or time.perf_counter()
+
+            def _on_sent(percentage, reason, sent_at):
+                self.metrics.observe("trigger_to_sell", sent_at - triggered_at, reason=reason)
+                trade = self.trades[contract]
+                trade["sold"] = min(trade["sold"] + percentage / 100, 1.0)
+                self._persist_trade(contract)
+                print(f"Sold {percentage}% of {contract} | Reason: {reason}")
+
+            await self.commands.sell(self.gmgn_bot, contract, percentage, reason, on_sent=_on_sent)
 
     def extract_sol_contract(self, msg):
-        contract_pattern = re.compile(r"\b[A-HJ-NP-Za-km-z1-9]{32,44}\b")
-        contracts = contract_pattern.findall(msg)
-        return contracts[0] if contracts else None
+        return extract_first_contract(msg)
 
     def extract_token_price(self, message):
         price_patterns = [
@@ -104,105 +269,206 @@ class TelegramBot:
                 return float(match.group(1))
         return None
 
-    def _fetch_price_sync(self, contract):
-        if not self.helius_api_key:
-            return 0.0
-        response = requests.post(
-            f"https://mainnet.helius-rpc.com/?api-key={self.helius_api_key}",
-            headers={"Content-Type": "application/json"},
-            json={
-                "jsonrpc": "2.0",
-                "id": "price",
-                "method": "getAsset",
-                "params": {"id": contract},
-            },
-            timeout=10,
-        )
-        response.raise_for_status()
-        data = response.json()
+    def _helius_rpc(self, payload):
+        # The key goes in `params` so the pooled connection is keyed on the bare host.
+        # httpx still puts it in the request URL, which its errors quote, so they
+        # are re-raised with the key masked before anyone prints them.
+        try:
+            response = self.http.request_sync(
+                "POST",
+                self.helius_rpc_url,
+                params={"api-key": self.helius_api_key},
+                headers={"Content-Type": "application/json"},
+                json=payload,
+                timeout=self.price_request_timeout,
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as exc:
+            raise RuntimeError(f"Helius {payload.get('method')} failed: {self._redact(exc)}") from None
+        return response.json()
+
+    @staticmethod
+    def _parse_asset_price(asset):
         price = (
-            data.get("result", {})
+            (asset or {})
             .get("token_info", {})
             .get("price_info", {})
             .get("price_per_token")
         )
         return float(price) if price else 0.0
 
+    def _redact(self, exc):
+        text = str(exc)
+        return text.replace(self.helius_api_key, "***") if self.helius_api_key else text
+
+    def _fetch_price_sync(self, contract):
+        if not self.helius_api_key:
+            return 0.0
+        data = self._helius_rpc({
+            "jsonrpc": "2.0",
+            "id": "price",
+            "method": "getAsset",
+            "params": {"id": contract},
+        })
+        return self._parse_asset_price(data.get("result", {}))
+
+    def _fetch_prices_sync(self, contracts):
+        """Fetch prices for many contracts with one `getAssetBatch` call per chunk."""
+        prices = {}
+        if not self.helius_api_key or not contracts:
+            return prices
+        chunk_size = max(1, self.price_batch_size)
+        for start in range(0, len(contracts), chunk_size):
+            chunk = contracts[start:start + chunk_size]
+            assets = self._helius_rpc({
+                "jsonrpc": "2.0",
+                "id": "price-batch",
+                "method": "getAssetBatch",
+                "params": {"ids": chunk},
+            }).get("result") or []
+            for contract, asset in zip(chunk, assets):
+                if asset and asset.get("id"):
+                    contract = asset["id"]
+                prices[contract] = self._parse_asset_price(asset)
+        return prices
+
+    async def _fetch_price(self, contract):
+        return await asyncio.to_thread(self._fetch_price_sync, contract)
+
     async def query_price(self, contract):
+        """Price one contract, served from `price_cache` when a recent or in-flight lookup exists."""
         try:
-            return await asyncio.to_thread(self._fetch_price_sync, contract)
+            return await self.price_cache.get_or_fetch(contract, self._fetch_price)
         except Exception as exc:
             print(f"Failed to fetch price for {contract}: {exc}")
             return 0.0
 
+    async def query_prices(self, contracts):
+        """Return a `{contract: price}` map for `contracts` using batched lookups.
+
+        Always goes to Helius (the monitor asks only for what is due) and
+        refreshes `price_cache` with the results for other readers.
+        """
+        try:
+            prices = await asyncio.to_thread(self._fetch_prices_sync, list(contracts))
+            self.price_cache.put_many(prices)
+            return prices
+        except Exception as exc:
+            print(f"Failed to fetch batched prices for {len(contracts)} contracts: {exc}")
+            return {}
+
+    def watch_channels(self, channels, publish):
+        """Forward every new message in `channels` to `publish` as a signal."""
+
+        async def _on_message(event):
+            chat = event.chat or await event.get_chat()
+            created_at = event.message.date.timestamp() if event.message.date else None
+            publish({
+                "source": "telegram",
+                "handle": getattr(chat, "username", None) or str(event.chat_id),
+                "created_at": created_at,
+                "text": event.message.text or "",
+            })
+
+        self.add_handler(_on_message, chats=channels)
+
     async def _handle_gmgn_message(self, event):
         message = event.message.text or ""
         contract = self.extract_sol_contract(message)
         entry_price = self.extract_token_price(message)
 
-        if contract and entry_price and contract in self.trades:
-            trade = self.trades[contract]
-            if trade["entry"] == 0.0:
-                trade["entry"] = entry_price
-                trade["high"] = max(trade["high"], entry_price)
-                trade["last_price"] = entry_price
+        if contract and entry_price and self._set_entry(contract, entry_price, "gmgn"):
             print(f"Captured entry price {entry_price} for {contract}")
 
-    async def evaluate_sell(self, contract, current_price):
-        trade = self.trades[contract]
-        entry_price = trade["entry"]
-        high_price = trade["high"]
-        sold = trade["sold"]
-
-        if entry_price <= 0:
+    async def evaluate_sell(self, contract, current_price, quoted_at=None):
+        """Run the exit rules for one position (see `apply_prices` for batches)."""
+        triggered_at = quoted_at or time.perf_counter()
+        slots, _, quotes = self.trades.quoted({contract: current_price})
+        for contract, percentage, reason in self.trades.exit_orders(self, slots, quotes, time.time()):
+            try:
+                await self.sell_token(contract, percentage, reason, triggered_at)
+            except Exception as exc:
+                self._log_failed_sell(contract, percentage, reason, exc)
+
+    def _log_failed_sell(self, contract, percentage, reason, exc):
+        # The position stays open and `sold` unchanged, so the next quote retries it.
+        print(f"Failed to sell {percentage}% of {contract} ({reason}): {exc!r}")
+
+    async def apply_prices(self, prices, quoted_at=None):
+        """Update open positions from a `{contract: price}` map and run the exit
+        rules over the whole batch at once; only the resulting sells are awaited."""
+        quoted_at = quoted_at or time.perf_counter()
+        book = self.trades
+        slots, contracts, quotes = book.quoted(prices)
+        if not contracts:
             return
 
-        multiplier = current_price / entry_price
-
-        for level_multiplier, target_sold in self.take_profit_levels:
-            if multiplier >= level_multiplier and sold < target_sold:
-                sell_pct = round((target_sold - sold) * 100)
-                if sell_pct > 0:
-                    await self.sell_token(contract, sell_pct, f"{level_multiplier}x take profit")
-                return
-
-        if multiplier >= self.trailing_start_multiplier:
-            if current_price <= high_price * self.trailing_stop_factor and sold < 1.0:
-                remaining_pct = round((1.0 - sold) * 100)
-                if remaining_pct > 0:
-                    await self.sell_token(contract, remaining_pct, "Trailing stop hit")
-                return
-
-        if current_price <= entry_price * self.hard_stop_factor and sold < 1.0:
-            remaining_pct = round((1.0 - sold) * 100)
-            if remaining_pct > 0:
-                await self.sell_token(contract, remaining_pct, "Hard stop loss")
-            return
-
-        if time.time() - trade["opened_at"] > self.max_hold_seconds and multiplier < self.time_exit_multiplier:
-            remaining_pct = round((1.0 - sold) * 100)
-            if remaining_pct > 0:
-                await self.sell_token(contract, remaining_pct, "Time-based exit")
+        for row in np.nonzero(book.entry[slots] == 0.0)[0]:
+            self._set_entry(contracts[row], float(quotes[row]), "monitor")
+        # `_set_entry` and `_on_sent` persist entry and sold changes; only a new
+        # high needs writing here, not every last_price tick.
+        highs = book.high[slots]
+        book.mark(slots, quotes)
+        for row in np.nonzero(book.high[slots] > highs)[0]:
+            self._persist_trade(contracts[row])
+
+        # Queue every sell at once so the command queue can order them by urgency.
+        orders = book.exit_orders(self, slots, quotes, time.time())
+        if orders:
+            # One failed send must not stop the other sells, or the monitor and stream loops.
+            results = await asyncio.gather(*(
+                self.sell_token(contract, percentage, reason, quoted_at) for contract, percentage, reason in orders
+            ), return_exceptions=True)
+            for (contract, percentage, reason), result in zip(orders, results):
+                if isinstance(result, Exception):
+                    self._log_failed_sell(contract, percentage, reason, result)
+
+    def wake_monitor(self):
+        if self._monitor_wakeup:
+            self._monitor_wakeup.set()
 
     async def monitor_prices(self):
+        """Price open positions in batches as the scheduler says they come due,
+        instead of sweeping every trade on a fixed cadence. Positions with a
+        fresh tick from `price_stream` are skipped until the stream goes quiet."""
+        self._monitor_wakeup = asyncio.Event()
+        scheduler = self.price_scheduler
         while True:
-            for contract in list(self.trades.keys()):
+            now = time.monotonic()
+            scheduler.track(self.trades.open_contracts(), now)
+            due = [
+                contract for contract in scheduler.pop_due(now, max(1, self.price_batch_size))
+                if contract in self.trades and self.trades[contract]["sold"] < 1.0
+            ]
+            if self.price_stream.connected:
+                streamed = [contract for contract in due if self.price_stream.is_fresh(contract, now)]
+                for contract in streamed:
+                    scheduler.schedule(contract, now + self.price_stream.stale_seconds)
+                if streamed:
+                    streamed = set(streamed)
+                    due = [contract for contract in due if contract not in streamed]
+            if not due:
+                next_due = scheduler.next_due()
+                timeout = self.price_poll_seconds if next_due is None else max(next_due - now, 0.0)
+                self._monitor_wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._monitor_wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await scheduler.throttle()
+            cycle_started = time.perf_counter()
+            prices = await self.query_prices(due)
+            await self.apply_prices(prices, time.perf_counter())
+            self.metrics.observe("price_poll_cycle", time.perf_counter() - cycle_started)
+
+            now = time.monotonic()
+            for contract in due:
                 trade = self.trades.get(contract)
                 if not trade or trade["sold"] >= 1.0:
-                    continue
-
-                current_price = await self.query_price(contract)
-                if current_price <= 0:
-                    continue
-
-                if trade["entry"] == 0.0:
-                    trade["entry"] = current_price
-                    trade["high"] = current_price
-
-                trade["high"] = max(trade["high"], current_price)
-                trade["last_price"] = current_price
-
-                await self.evaluate_sell(contract, current_price)
-
-            await asyncio.sleep(self.price_poll_seconds)
-
+                    scheduler.forget(contract)
+                elif prices.get(contract, 0.0) > 0:
+                    scheduler.reschedule(contract, trade, prices[contract], now)
+                else:
+                    scheduler.schedule(contract, now + self.price_poll_seconds)
@@ -0,0 +1,89 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+
+
+class PriceCache:
+    """Contract -> price cache with a short TTL, LRU eviction and single-flight loads.
+
+    Callers that ask for the same contract while a lookup is already in flight
+    await that lookup instead of starting their own, so the buy path, the
+    monitor and any other reader share one Helius round-trip. Only positive
+    prices are cached; failures reach every waiter and are retried next time.
+    """
+
+    def __init__(self, ttl_seconds=None, max_entries=None):
+        self.ttl_seconds = float(
+            ttl_seconds if ttl_seconds is not None else os.getenv("PRICE_CACHE_TTL", "0.5")
+        )
+        self.max_entries = int(
+            max_entries if max_entries is not None else os.getenv("PRICE_CACHE_SIZE", "1024")
+        )
+        self._entries = OrderedDict()  # contract -> (price, expires_at), oldest first
+        self._inflight = {}  # contract -> Task
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get(self, contract, now=None):
+        """Return a fresh cached price, or `None`."""
+        entry = self._entries.get(contract)
+        if entry is None:
+            return None
+        now = time.monotonic() if now is None else now
+        if entry[1] <= now:
+            del self._entries[contract]
+            return None
+        self._entries.move_to_end(contract)
+        return entry[0]
+
+    def put(self, contract, price, now=None):
+        if not price or price <= 0 or self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+        now = time.monotonic() if now is None else now
+        self._entries[contract] = (price, now + self.ttl_seconds)
+        self._entries.move_to_end(contract)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def put_many(self, prices, now=None):
+        now = time.monotonic() if now is None else now
+        for contract, price in prices.items():
+            self.put(contract, price, now)
+
+    async def get_or_fetch(self, contract, fetch):
+        """Return the cached price or await `fetch(contract)`, sharing any lookup already running."""
+        price = self.get(contract)
+        if price is not None:
+            self.hits += 1
+            return price
+        task = self._inflight.get(contract)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(self._load(contract, fetch))
+            self._inflight[contract] = task
+        # Shielded so one cancelled caller does not cancel the lookup the others await.
+        return await asyncio.shield(task)
+
+    async def _load(self, contract, fetch):
+        try:
+            price = await fetch(contract)
+            self.put(contract, price)
+            return price
+        finally:
+            self._inflight.pop(contract, None)
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+        }
@@ -0,0 +1,224 @@
+import asyncio
+import heapq
+import itertools
+import os
+import time
+
+from BrothersTrusts.CoinSniper.Shared.strategy import SELL_REASONS, HARD_STOP, TIME_EXIT, TRAILING_STOP
+
+# Lower sends first: a stop-loss never waits behind a speculative buy.
+STOP_PRIORITY, TIME_EXIT_PRIORITY, TAKE_PROFIT_PRIORITY, BUY_PRIORITY = range(4)
+
+
+def sell_priority(reason):
+    if reason in (SELL_REASONS[HARD_STOP], SELL_REASONS[TRAILING_STOP]):
+        return STOP_PRIORITY
+    if reason == SELL_REASONS[TIME_EXIT]:
+        return TIME_EXIT_PRIORITY
+    return TAKE_PROFIT_PRIORITY
+
+
+def _is_flood_wait(exc):
+    # Telethon is imported lazily (see `Telegram.app`); a send has loaded it by now.
+    from telethon.errors import FloodWaitError
+
+    return isinstance(exc, FloodWaitError)
+
+
+class CommandQueue:
+    """Outbound Telegram commands, sent one at a time in priority order.
+
+    Commands go out through `bot.send_message`. Each chat gets at most `TELEGRAM_CHAT_MESSAGES_PER_SECOND` messages, and a
+    `FloodWaitError` parks that chat for the requested seconds before the
+    command is retried. A sell for a contract that already has a sell queued
+    is merged into it: exit orders are computed against the same unsent
+    `sold`, so the larger percentage covers both and the more urgent priority
+    wins. A sell that arrives while another for the contract is being sent was
+    computed against the `sold` before that one lands, so only the part it
+    does not cover is queued as a follow-up; if the one in flight covers it
+    all, the caller waits on that send instead. Callers await a future that
+    resolves once a command carrying their sell is sent.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.messages_per_second = float(os.getenv("TELEGRAM_CHAT_MESSAGES_PER_SECOND", "5"))
+        self.max_flood_retries = int(os.getenv("TELEGRAM_FLOOD_RETRIES", "5"))
+        self._heap = []
+        self._counter = itertools.count()
+        self._pending_sells = {}  # (chat, contract) -> queued sell command
+        self._in_flight = {}  # (chat, contract) -> sell being sent, until its `on_sent` ran
+        self._next_send_at = {}  # chat -> monotonic time its next message may go out
+        self._wakeup = None
+        self._worker = None
+        self.flood_waits = 0
+        self.merged = 0
+
+    def _ensure_worker(self):
+        if self._worker is None or self._worker.done():
+            self._wakeup = asyncio.Event()
+            self._worker = asyncio.create_task(self._run(), name="telegram.outbox")
+
+    def _push(self, command):
+        heapq.heappush(self._heap, (command["priority"], command["seq"], command))
+        self._wakeup.set()
+
+    def _enqueue(self, chat, kind, priority, text, **fields):
+        self._ensure_worker()
+        command = {
+            "chat": chat,
+            "kind": kind,
+            "priority": priority,
+            "text": text,
+            "seq": next(self._counter),
+            "enqueued_at": time.perf_counter(),
+            "future": asyncio.get_running_loop().create_future(),
+            "flood_retries": 0,
+            **fields,
+        }
+        self._push(command)
+        return command
+
+    def buy(self, chat, text):
+        return self._enqueue(chat, "buy", BUY_PRIORITY, text)["future"]
+
+    def sell(self, chat, contract, percentage, reason, on_sent=None):
+        """Queue `/sell`; `on_sent(percentage, reason, sent_at)` runs once with the merged order."""
+        in_flight = self._in_flight.get((chat, contract))
+        if in_flight is not None:
+            percentage -= in_flight["percentage"]
+            if percentage <= 0:
+                self.merged += 1
+                return _follow(in_flight["future"])
+        command = self._pending_sells.get((chat, contract))
+        if command is not None:
+            self.merged += 1
+            self._merge_sell(command, percentage, reason)
+            return command["future"]
+        command = self._enqueue(
+            chat, "sell", sell_priority(reason), f"/sell {contract} {percentage}%",
+            contract=contract, percentage=percentage, reason=reason, on_sent=on_sent,
+        )
+        self._pending_sells[(chat, contract)] = command
+        return command["future"]
+
+    def _merge_sell(self, command, percentage, reason):
+        command["percentage"] = max(command["percentage"], percentage)
+        command["text"] = f"/sell {command['contract']} {command['percentage']}%"
+        priority = sell_priority(reason)
+        if priority < command["priority"]:
+            command["priority"], command["reason"] = priority, reason
+            self._push(command)  # the stale heap entry is skipped when popped
+
+    def _pop_ready(self, now):
+        """Best command whose chat may send now, or `(None, earliest ready time)`."""
+        deferred = []
+        ready, wait_until = None, None
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            priority, _, command = entry
+            if command["priority"] != priority or command["future"].done():
+                continue
+            chat_ready_at = self._next_send_at.get(command["chat"], 0.0)
+            if chat_ready_at <= now:
+                ready = command
+                break
+            deferred.append(entry)
+            wait_until = chat_ready_at if wait_until is None else min(wait_until, chat_ready_at)
+        for entry in deferred:
+            heapq.heappush(self._heap, entry)
+        return ready, wait_until
+
+    async def _run(self):
+        while True:
+            command, wait_until = self._pop_ready(time.monotonic())
+            if command is None:
+                self._wakeup.clear()
+                timeout = None if wait_until is None else max(wait_until - time.monotonic(), 0.0)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._send(command)
+
+    async def _send(self, command):
+        chat = command["chat"]
+        key = (chat, command.get("contract"))
+        if command["kind"] == "sell":
+            self._pending_sells.pop(key, None)
+            self._in_flight[key] = command
+        started = time.perf_counter()
+        self.bot.metrics.observe(
+            "telegram_queue_wait", started - command["enqueued_at"],
+            command=command["kind"], priority=command["priority"],
+        )
+        try:
+            await self.bot.send_message(chat, command["text"])
+        except Exception as exc:
+            self._in_flight.pop(key, None)
+            # A follow-up queued meanwhile only holds what this sell did not cover;
+            # this one did not go out, so the follow-up has to carry it too.
+            follow_up = self._pending_sells.get(key) if command["kind"] == "sell" else None
+            if follow_up is not None:
+                self._merge_sell(
+                    follow_up, min(follow_up["percentage"] + command["percentage"], 100), command["reason"]
+                )
+            flood = _is_flood_wait(exc)
+            if flood:
+                self.flood_waits += 1
+                self._next_send_at[chat] = time.monotonic() + exc.seconds
+                print(f"Telegram flood wait of {exc.seconds}s for {chat}; re-queueing {command['text']}")
+                command["flood_retries"] += 1
+            if not flood or command["flood_retries"] > self.max_flood_retries:
+                command["future"].set_exception(exc)
+                return
+            if follow_up is not None:
+                follow_up["future"].add_done_callback(lambda done, future=command["future"]: _chain(done, future))
+                return
+            if command["kind"] == "sell":
+                self._pending_sells[key] = command
+            self._push(command)
+            return
+
+        sent_at = time.perf_counter()
+        self.bot.metrics.observe("telegram_send", sent_at - started, command=command["kind"])
+        if self.messages_per_second > 0:
+            self._next_send_at[chat] = time.monotonic() + 1 / self.messages_per_second
+        if command.get("on_sent"):
+            command["on_sent"](command["percentage"], command["reason"], sent_at)
+        # From here on `sold` covers this sell, so a new one for the contract is a new command.
+        self._in_flight.pop(key, None)
+        command["future"].set_result(sent_at)
+
+    def close(self):
+        if self._worker:
+            self._worker.cancel()
+            self._worker = None
+        for _, _, command in self._heap:
+            if not command["future"].done():
+                command["future"].cancel()
+        for command in self._in_flight.values():
+            if not command["future"].done():
+                command["future"].cancel()
+        self._heap = []
+        self._pending_sells = {}
+        self._in_flight = {}
+
+
+def _follow(source):
+    """A new future that settles the way `source` does."""
+    target = asyncio.get_running_loop().create_future()
+    source.add_done_callback(lambda done: _chain(done, target))
+    return target
+
+
+def _chain(source, target):
+    if target.done():
+        return
+    if source.cancelled():
+        target.cancel()
+    elif source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(source.result())
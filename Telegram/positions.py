@@ -0,0 +1,146 @@
+from collections.abc import MutableMapping
+
+import numpy as np
+
+from BrothersTrusts.CoinSniper.Shared.strategy import evaluate_exits, sell_reason_label
+
+PRICE_FIELDS = ("entry", "high", "sold", "opened_at", "last_price")
+ENTRY_SOURCES = (None, "helius", "monitor", "gmgn")
+
+
+class Position(MutableMapping):
+    """Dict-style view of one row of a `PositionBook`; reads and writes go to the arrays."""
+
+    __slots__ = ("_book", "_slot")
+
+    def __init__(self, book, slot):
+        self._book = book
+        self._slot = slot
+
+    def __getitem__(self, key):
+        if key == "entry_source":
+            return ENTRY_SOURCES[self._book.entry_source[self._slot]]
+        if key not in PRICE_FIELDS:
+            raise KeyError(key)
+        return float(getattr(self._book, key)[self._slot])
+
+    def __setitem__(self, key, value):
+        if key == "entry_source":
+            self._book.entry_source[self._slot] = ENTRY_SOURCES.index(value)
+        elif key in PRICE_FIELDS:
+            getattr(self._book, key)[self._slot] = value
+        else:
+            raise KeyError(key)
+
+    def __delitem__(self, key):
+        raise TypeError("position fields cannot be deleted")
+
+    def __iter__(self):
+        return iter(PRICE_FIELDS + ("entry_source",))
+
+    def __len__(self):
+        return len(PRICE_FIELDS) + 1
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class PositionBook(MutableMapping):
+    """Open and closed positions as parallel NumPy arrays (struct of arrays).
+
+    It behaves like the old `{contract: trade_dict}` map, so single-trade code
+    keeps working through `Position` views. Price batches go through `mark` and
+    `exit_orders`, which update and evaluate every quoted position in a few
+    array operations instead of one coroutine per trade. Each row costs
+    5 float64 fields + 1 byte of entry source; `benchmarks/bench_positions.py`
+    measures the full per-position footprint including the contract index.
+    """
+
+    def __init__(self, capacity=64):
+        capacity = max(1, capacity)
+        for field in PRICE_FIELDS:
+            setattr(self, field, np.zeros(capacity))
+        self.entry_source = np.zeros(capacity, dtype=np.uint8)
+        self.contracts = []  # slot -> contract
+        self._slots = {}  # contract -> slot
+
+    @property
+    def capacity(self):
+        return len(self.entry)
+
+    def _grow(self):
+        capacity = self.capacity * 2
+        for field in PRICE_FIELDS + ("entry_source",):
+            old = getattr(self, field)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, field, new)
+
+    def __getitem__(self, contract):
+        return Position(self, self._slots[contract])
+
+    def __setitem__(self, contract, trade):
+        slot = self._slots.get(contract)
+        if slot is None:
+            slot = len(self.contracts)
+            if slot == self.capacity:
+                self._grow()
+            self.contracts.append(contract)
+            self._slots[contract] = slot
+        position = Position(self, slot)
+        for field in PRICE_FIELDS:
+            position[field] = trade.get(field, 0.0)
+        position["entry_source"] = trade.get("entry_source")
+
+    def __delitem__(self, contract):
+        # Move the last row into the freed slot so the arrays stay dense.
+        slot = self._slots.pop(contract)
+        last = len(self.contracts) - 1
+        if slot != last:
+            moved = self.contracts[last]
+            for field in PRICE_FIELDS + ("entry_source",):
+                array = getattr(self, field)
+                array[slot] = array[last]
+            self.contracts[slot] = moved
+            self._slots[moved] = slot
+        self.contracts.pop()
+        for field in PRICE_FIELDS + ("entry_source",):
+            getattr(self, field)[last] = 0
+
+    def __contains__(self, contract):
+        return contract in self._slots
+
+    def __iter__(self):
+        return iter(list(self.contracts))
+
+    def __len__(self):
+        return len(self.contracts)
+
+    def open_contracts(self):
+        count = len(self.contracts)
+        return [self.contracts[slot] for slot in np.nonzero(self.sold[:count] < 1.0)[0]]
+
+    def quoted(self, prices):
+        """Slots, contracts and prices of open positions with a positive quote in `prices`."""
+        contracts = [contract for contract in prices if contract in self._slots]
+        if not contracts:
+            return np.zeros(0, dtype=int), [], np.zeros(0)
+        slots = np.fromiter((self._slots[contract] for contract in contracts), dtype=int, count=len(contracts))
+        quotes = np.fromiter((prices[contract] for contract in contracts), dtype=float, count=len(contracts))
+        with np.errstate(invalid="ignore"):
+            keep = (self.sold[slots] < 1.0) & (quotes > 0)
+        return slots[keep], [contract for contract, kept in zip(contracts, keep) if kept], quotes[keep]
+
+    def mark(self, slots, quotes):
+        self.high[slots] = np.maximum(self.high[slots], quotes)
+        self.last_price[slots] = quotes
+
+    def exit_orders(self, rules, slots, quotes, now):
+        """`[(contract, percentage, reason)]` for every quoted position an exit rule fires on."""
+        pct, reason, level = evaluate_exits(
+            rules, self.entry[slots], self.high[slots], self.sold[slots], quotes, now - self.opened_at[slots]
+        )
+        return [
+            (self.contracts[slots[row]], int(pct[row]), sell_reason_label(rules, reason[row], level[row]))
+            for row in np.nonzero(reason >= 0)[0]
+        ]
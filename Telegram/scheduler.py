@@ -0,0 +1,139 @@
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import time
+
+
+class PriceScheduler:
+    """Decides when each open position is next priced.
+
+    Positions sit in a min-heap keyed by their next check time. After every
+    quote a position is rescheduled from its log-distance to the nearest
+    `evaluate_sell` trigger and its recent volatility: with volatility `sigma`
+    (per sqrt-second) a move of `d` takes roughly `(d / sigma) ** 2` seconds,
+    and we look again after a fraction of that. Batch requests are spaced so
+    they never exceed `max_requests_per_second`.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.min_interval = float(os.getenv("PRICE_MIN_INTERVAL", "0.25"))
+        self.max_interval = float(os.getenv("PRICE_MAX_INTERVAL", "30"))
+        self.max_requests_per_second = float(os.getenv("PRICE_MAX_REQUESTS_PER_SECOND", "4"))
+        self.safety_factor = float(os.getenv("PRICE_SCHEDULE_SAFETY", "0.25"))
+        # Prior used until a position has two quotes: 1% per sqrt-second.
+        self.default_volatility = float(os.getenv("PRICE_DEFAULT_VOLATILITY", "0.01"))
+        self.volatility_decay = 0.3
+
+        self._heap = []
+        self._due = {}
+        self._last_quote = {}  # contract -> (timestamp, price)
+        self._variance = {}  # contract -> EWMA of squared log return per second
+        self._counter = itertools.count()
+        self._next_request_at = 0.0
+
+    def __contains__(self, contract):
+        return contract in self._due
+
+    def __len__(self):
+        return len(self._due)
+
+    def schedule(self, contract, due_at):
+        self._due[contract] = due_at
+        heapq.heappush(self._heap, (due_at, next(self._counter), contract))
+
+    def track(self, contracts, now=None):
+        """Start scheduling any contract not seen before; new positions are due immediately."""
+        now = time.monotonic() if now is None else now
+        for contract in contracts:
+            if contract not in self._due:
+                self.schedule(contract, now)
+
+    def forget(self, contract):
+        self._due.pop(contract, None)
+        self._last_quote.pop(contract, None)
+        self._variance.pop(contract, None)
+
+    def next_due(self):
+        while self._heap:
+            due_at, _, contract = self._heap[0]
+            if self._due.get(contract) == due_at:
+                return due_at
+            heapq.heappop(self._heap)
+        return None
+
+    def pop_due(self, now, limit):
+        """Up to `limit` contracts whose check time has passed, most overdue first."""
+        due = []
+        while self._heap and len(due) < limit:
+            due_at, _, contract = self._heap[0]
+            if self._due.get(contract) != due_at:
+                heapq.heappop(self._heap)
+                continue
+            if due_at > now:
+                break
+            heapq.heappop(self._heap)
+            del self._due[contract]
+            due.append(contract)
+        return due
+
+    async def throttle(self):
+        """Wait until another batch request fits the per-second budget."""
+        if self.max_requests_per_second <= 0:
+            return
+        now = time.monotonic()
+        if self._next_request_at > now:
+            await asyncio.sleep(self._next_request_at - now)
+            now = self._next_request_at
+        self._next_request_at = now + 1.0 / self.max_requests_per_second
+
+    def observe(self, contract, price, now):
+        previous = self._last_quote.get(contract)
+        self._last_quote[contract] = (now, price)
+        if not previous or previous[1] <= 0 or price <= 0:
+            return
+        elapsed = max(now - previous[0], 1e-3)
+        rate = math.log(price / previous[1]) ** 2 / elapsed
+        variance = self._variance.get(contract)
+        self._variance[contract] = rate if variance is None else (
+            self.volatility_decay * rate + (1 - self.volatility_decay) * variance
+        )
+
+    def volatility(self, contract):
+        variance = self._variance.get(contract)
+        return math.sqrt(variance) if variance else self.default_volatility
+
+    def trigger_distance(self, trade, price):
+        """Smallest log-price move that would make `evaluate_sell` act, and the
+        seconds until the time exit deadline (or None once it has passed)."""
+        bot = self.bot
+        entry = trade["entry"]
+        if entry <= 0 or price <= 0:
+            return 0.0, None
+        multiplier = price / entry
+        distances = [math.log(multiplier / bot.hard_stop_factor)]
+        for level_multiplier, target_sold in bot.take_profit_levels:
+            if trade["sold"] < target_sold:
+                distances.append(math.log(level_multiplier / multiplier))
+        if multiplier >= bot.trailing_start_multiplier and trade["high"] > 0:
+            distances.append(math.log(price / (trade["high"] * bot.trailing_stop_factor)))
+
+        # opened_at is wall-clock (it survives restarts), unlike the monotonic schedule.
+        time_left = trade["opened_at"] + bot.max_hold_seconds - time.time()
+        if time_left <= 0:
+            distances.append(math.log(multiplier / bot.time_exit_multiplier))
+            time_left = None
+        return max(min(distances), 0.0), time_left
+
+    def reschedule(self, contract, trade, price, now):
+        self.observe(contract, price, now)
+        distance, time_left = self.trigger_distance(trade, price)
+        sigma = self.volatility(contract)
+        interval = self.safety_factor * (distance / sigma) ** 2
+        if time_left is not None:
+            interval = min(interval, time_left + self.min_interval)
+        interval = min(max(interval, self.min_interval), self.max_interval)
+        self.schedule(contract, now + interval)
+        return interval
@@ -0,0 +1,206 @@
+import asyncio
+import itertools
+import json
+import os
+import random
+import time
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class PriceStream:
+    """Push-based prices over a Solana-style JSON-RPC WebSocket.
+
+    Every open contract is subscribed with `PRICE_STREAM_METHOD` (default
+    `accountSubscribe`); each notification is merged into that subscription's
+    last known state and decoded into a price, which goes straight through
+    `bot.apply_prices`. Payloads may carry a price directly (`price`,
+    `price_per_token` or Helius `token_info.price_info`) or pool reserves
+    (`base_reserve` / `quote_reserve`), and may send only the fields that
+    changed. On disconnect it reconnects with jittered backoff and
+    resubscribes; while a contract has no fresh tick the monitor keeps
+    polling it, so an unhealthy stream degrades to the existing HTTP path.
+
+    Only a feed that pushes price or reserve fields for the subscribed key
+    drives exits: today that is `Loadtest.fakes.FakePriceStream`. A plain
+    Solana `accountSubscribe` on the token mint only reports the mint account
+    (supply, decimals), never a price; decoding pool or bonding-curve accounts
+    is not wired up. Against such a node every contract stays on the HTTP
+    polling path, which is the one to rely on in production, and a warning is
+    printed once per contract.
+    """
+
+    SYNC_SECONDS = 0.25
+
+    def __init__(self, bot, url=None):
+        self.bot = bot
+        # Test-only: nothing decodes a real Solana feed yet (see the class docstring).
+        self.url = url if url is not None else os.getenv("PRICE_STREAM_URL", "")
+        self.method = os.getenv("PRICE_STREAM_METHOD", "accountSubscribe")
+        self.stale_seconds = float(os.getenv("PRICE_STREAM_STALE_SECONDS", "5"))
+        self.reconnect_base = float(os.getenv("PRICE_STREAM_RECONNECT_BASE", "0.5"))
+        self.reconnect_max = float(os.getenv("PRICE_STREAM_RECONNECT_MAX", "30"))
+        self.connected = False
+        self.reconnects = 0
+        self.last_tick = {}  # contract -> monotonic time of its last decoded price
+        self._ids = itertools.count(1)
+        self._pending = {}  # request id -> contract awaiting its subscription id
+        self._subscriptions = {}  # subscription id -> contract
+        self._subscribed = {}  # contract -> subscription id (None while pending)
+        self._state = {}  # contract -> merged payload fields
+        self._ws = None
+        self._synced_at = 0.0
+        self._ticks = {}  # contract -> (price, quoted_at) not yet applied
+        self._applying = {}  # contract -> task applying its ticks
+        self._priceless = set()  # contracts already warned about notifications without a price
+
+    def is_fresh(self, contract, now=None):
+        now = time.monotonic() if now is None else now
+        ticked = self.last_tick.get(contract)
+        return self.connected and ticked is not None and now - ticked < self.stale_seconds
+
+    def decode(self, contract, value):
+        """Merge a notification's fields into the contract's state and return its price (or None)."""
+        if isinstance(value, dict) and isinstance(value.get("data"), dict):
+            value = value["data"].get("parsed", value["data"])
+        if not isinstance(value, dict):
+            return None
+        state = self._state.setdefault(contract, {})
+        state.update(value)
+        for key in ("price", "price_per_token"):
+            price = _number(state.get(key))
+            if price:
+                return price
+        price_info = (state.get("token_info") or {}).get("price_info") or {}
+        price = _number(price_info.get("price_per_token"))
+        if price:
+            return price
+        base, quote = _number(state.get("base_reserve")), _number(state.get("quote_reserve"))
+        if base and quote:
+            return quote / base
+        return None
+
+    async def _subscribe(self, contract):
+        request_id = next(self._ids)
+        self._pending[request_id] = contract
+        self._subscribed[contract] = None
+        await self._ws.send_str(json.dumps({
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "method": self.method,
+            "params": [contract, {"encoding": "jsonParsed", "commitment": "processed"}],
+        }))
+
+    async def _unsubscribe(self, contract):
+        subscription = self._subscribed.pop(contract, None)
+        self._state.pop(contract, None)
+        self._ticks.pop(contract, None)
+        self._priceless.discard(contract)
+        self.last_tick.pop(contract, None)
+        if subscription is None:
+            return
+        self._subscriptions.pop(subscription, None)
+        await self._ws.send_str(json.dumps({
+            "jsonrpc": "2.0",
+            "id": next(self._ids),
+            "method": self.method.replace("Subscribe", "Unsubscribe"),
+            "params": [subscription],
+        }))
+
+    async def sync_subscriptions(self, min_interval=0.0):
+        """Subscribe newly opened positions and drop closed ones."""
+        now = time.monotonic()
+        if not self._ws or now - self._synced_at < min_interval:
+            return
+        self._synced_at = now
+        open_contracts = set(self.bot.trades.open_contracts())
+        for contract in open_contracts - set(self._subscribed):
+            await self._subscribe(contract)
+        for contract in set(self._subscribed) - open_contracts:
+            await self._unsubscribe(contract)
+
+    async def handle_message(self, message):
+        # Anything that is not a JSON-RPC object is noise, not a reason to drop the connection.
+        if not isinstance(message, dict):
+            return
+        if isinstance(message.get("id"), int) and message["id"] in self._pending:
+            contract = self._pending.pop(message["id"])
+            if "result" in message and contract in self._subscribed:
+                self._subscribed[contract] = message["result"]
+                self._subscriptions[message["result"]] = contract
+            return
+        params = message.get("params")
+        subscription = params.get("subscription") if isinstance(params, dict) else None
+        contract = self._subscriptions.get(subscription) if isinstance(subscription, (int, str)) else None
+        if contract is None:
+            return
+        result = params.get("result") or {}
+        price = self.decode(contract, result.get("value", result) if isinstance(result, dict) else result)
+        if price:
+            self.last_tick[contract] = time.monotonic()
+            self._ticks[contract] = (price, time.perf_counter())
+            if contract not in self._applying:
+                # Sells wait on the command queue; keep reading ticks meanwhile.
+                self._applying[contract] = asyncio.create_task(
+                    self._apply_ticks(contract), name="telegram.stream_tick"
+                )
+        elif contract not in self._priceless:
+            self._priceless.add(contract)
+            print(f"Price stream sent no price for {contract}; it stays on HTTP polling")
+
+    async def _apply_ticks(self, contract):
+        """Apply a contract's ticks one at a time, jumping to the newest, so each
+        evaluation sees the `sold` left by the sells of the one before."""
+        try:
+            while contract in self._ticks:
+                price, quoted_at = self._ticks.pop(contract)
+                await self.bot.apply_prices({contract: price}, quoted_at)
+        finally:
+            self._applying.pop(contract, None)
+
+    def _reset(self):
+        self.connected = False
+        self._ws = None
+        self._pending.clear()
+        self._subscriptions.clear()
+        self._subscribed.clear()
+        self.last_tick.clear()
+
+    async def run(self):
+        """Stay connected, resubscribing after every reconnect."""
+        import aiohttp
+
+        print(f"Price stream {self.url} is test-only: only the load-test fake feed sends prices it can decode")
+        attempt = 0
+        async with aiohttp.ClientSession() as session:
+            while True:
+                try:
+                    async with session.ws_connect(self.url, heartbeat=15) as ws:
+                        self._ws = ws
+                        self.connected = True
+                        attempt = 0
+                        await self.sync_subscriptions()
+                        while True:
+                            try:
+                                message = await ws.receive(timeout=self.SYNC_SECONDS)
+                            except asyncio.TimeoutError:
+                                message = None
+                            if message is not None:
+                                if message.type != aiohttp.WSMsgType.TEXT:
+                                    break
+                                await self.handle_message(json.loads(message.data))
+                            await self.sync_subscriptions(self.SYNC_SECONDS)
+                except (aiohttp.ClientError, OSError, ValueError) as exc:
+                    print(f"Price stream error: {exc}")
+                finally:
+                    self._reset()
+                self.reconnects += 1
+                delay = min(self.reconnect_max, self.reconnect_base * 2 ** attempt)
+                attempt += 1
+                print(f"Price stream disconnected; reconnecting in {delay:.1f}s")
+                await asyncio.sleep(random.uniform(delay / 2, delay))
@@ -1,8 +1,47 @@
 from dotenv import load_dotenv
 import os
-import requests
-import re
+import asyncio
+import time
+import httpx
 import json 
+from datetime import datetime
+
+from BrothersTrusts.CoinSniper.Shared.contracts import extract_contracts_from_tweets
+from BrothersTrusts.CoinSniper.Shared.http import get_transport
+from BrothersTrusts.CoinSniper.Shared.metrics import metrics
+from BrothersTrusts.CoinSniper.Twitter.cache import MISSING, UserIdCache
+from BrothersTrusts.CoinSniper.Twitter.parse import read_tweet_page, read_tweet_page_sync
+
+TWEET_SCOUT_BASE_URL = "https://api.tweetscout.io/v2"
+
+
+def tweet_record(tweet):
+    """Keep only the fields we act on from a TweetScout tweet object."""
+    return {
+        "id_str": tweet.get("id_str") or "",
+        "created_at": tweet.get("created_at"),
+        "full_text": tweet.get("full_text") or "",
+        "quoted_text": (tweet.get("quoted_status") or {}).get("full_text") or "",
+        "retweeted_text": (tweet.get("retweeted_status") or {}).get("full_text") or "",
+    }
+
+
+def parse_created_at(created_at):
+    """Parse TweetScout's `Sat Feb 08 20:38:37 +0000 2025` into a unix timestamp."""
+    if not created_at:
+        return None
+    try:
+        return datetime.strptime(created_at, "%a %b %d %H:%M:%S %z %Y").timestamp()
+    except ValueError:
+        return None
+
+
+def tweet_id(record):
+    try:
+        return int(record.get("id_str") or 0)
+    except (TypeError, ValueError):
+        return 0
+
 
 class TwitterClient:
     def __init__(self):
@@ -10,23 +49,55 @@ class TwitterClient:
         self.api_key = os.getenv('TWEET_SCOUT_API_KEY')
         if not self.api_key:
             raise ValueError("API key is not set. Please make sure TWEET_SCOUT_API_KEY is in your environment variables.")
+        self.max_concurrency = int(os.getenv("TWEET_MAX_CONCURRENCY", "10"))
+        self.request_timeout = float(os.getenv("TWEET_REQUEST_TIMEOUT", "10"))
+        self.base_url = os.getenv("TWEET_SCOUT_BASE_URL", TWEET_SCOUT_BASE_URL)
+        self.http = get_transport()
+        # Optional budget hooks, set by a scheduler: an awaitable run before every
+        # async TweetScout request and a callback that sees every response.
+        self.request_gate = None
+        self.response_listener = None
+        self.user_id_cache = UserIdCache()
+        self.max_tweet_pages = int(os.getenv("TWEET_MAX_PAGES", "3"))
+        # Parse `user-tweets` bodies as they stream in, keeping only the tweet
+        # fields instead of building the whole payload (see Twitter/parse.py).
+        self.stream_parse = os.getenv("TWEET_STREAM_PARSE", "0") == "1"
+        self.last_seen_tweet_ids = {}  # handle -> newest tweet id already handed to the caller
+        self._user_id_lookups = {}  # handle -> in-flight user id request
+        self.metrics = metrics
+
+    def _remember_user_id(self, user_handle, status_code, user_id):
+        # Only a 200 or a 404 says something about the handle. Auth and quota
+        # failures (401/402/403), 429 and 5xx are about the key or the service,
+        # and caching them would mark every handle unknown until the TTL ran out.
+        if status_code in (200, 404):
+            self.user_id_cache.set(user_handle, user_id)
+        return user_id
 
     def get_user_id(self, user_handle):
         """Fetch Twitter user ID from handle."""
-        url = f"https://api.tweetscout.io/v2/handle-to-id/{user_handle}"
+        cached = self.user_id_cache.get(user_handle)
+        if cached is not MISSING:
+            return cached
+
+        url = f"{self.base_url}/handle-to-id/{user_handle}"
         headers = {"Accept": "application/json", "ApiKey": self.api_key}
 
-        response = requests.get(url, headers=headers)
+        try:
+            response = self.http.request_sync("GET", url, headers=headers, timeout=self.request_timeout)
+        except httpx.HTTPError as exc:
+            print(f"Failed to fetch user ID for @{user_handle}: {exc}")
+            return None
         if response.status_code == 200:
-            return response.json().get('id')
+            return self._remember_user_id(user_handle, 200, response.json().get('id'))
         else:
             print(f"Failed to fetch user ID for @{user_handle}. Status: {response.status_code}")
-            return None
+            return self._remember_user_id(user_handle, response.status_code, None)
 
     def get_latest_tweets(self, user_handle, user_id, count=5):
         """Fetch the latest `count` tweets from a given user."""
         print('getting latest tweets of user:', str(user_handle) + ' with user_id:', str(user_id))
-        url = "https://api.tweetscout.io/v2/user-tweets"
+        url = f"{self.base_url}/user-tweets"
         headers = {
             "Accept": "application/json",
             "ApiKey": self.api_key,
@@ -34,26 +105,155 @@ class TwitterClient:
         }
         data = {"link": f"https://twitter.com/{user_handle}", "user_id": user_id}
 
-        response = requests.post(url, headers=headers, json=data)
+        if self.stream_parse:
+            response, page = self.http.stream_sync(
+                "POST", url, read_tweet_page_sync, headers=headers, json=data, timeout=self.request_timeout
+            )
+        else:
+            response = self.http.request_sync("POST", url, headers=headers, json=data, timeout=self.request_timeout)
         if response.status_code == 200:
-            tweets = response.json()
-            tweets = tweets.get('tweets', [])
-            # print('got number of tweets:', str(len(tweets)))
-            tweet_text = [tweet.get('full_text', '') for tweet in tweets]
-            print(f"Successfully fetched {len(tweet_text)} tweets for @{user_handle}.")
-            return tweet_text
+            if self.stream_parse:
+                records = page[0]
+            else:
+                tweets = response.json()
+                tweets = tweets.get('tweets', [])
+                # print('got number of tweets:', str(len(tweets)))
+                records = [tweet_record(tweet) for tweet in tweets]
+            print(f"Successfully fetched {len(records)} tweets for @{user_handle}.")
+            return records
         else:
             print(f"Failed to fetch tweets for @{user_handle}. Status: {response.status_code}")
             return []
 
-    def extract_sol_contracts(self, tweets):
-        """Extract valid Solana contract addresses from tweets."""
-        contract_pattern = re.compile(r"\b[A-HJ-NP-Za-km-z1-9]{32,44}\b")  # Matches Solana contract addresses
-        contracts = []
+    async def async_get_user_id(self, user_handle):
+        """Fetch Twitter user ID from handle without blocking the event loop.
+        Concurrent lookups of one handle (warm-up racing its first poll) share a request."""
+        cached = self.user_id_cache.get(user_handle)
+        if cached is not MISSING:
+            return cached
+        lookup = self._user_id_lookups.get(user_handle)
+        if lookup is None:
+            lookup = self._user_id_lookups[user_handle] = asyncio.ensure_future(self._lookup_user_id(user_handle))
+            lookup.add_done_callback(lambda _: self._user_id_lookups.pop(user_handle, None))
+        return await asyncio.shield(lookup)
+
+    async def async_warm_user_ids(self, user_handles):
+        """Resolve every uncached handle, `max_concurrency` at a time, so the first
+        polls start with a warm cache."""
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+
+        async def _resolve(user_handle):
+            async with semaphore:
+                return await self.async_get_user_id(user_handle)
+
+        user_ids = await asyncio.gather(*(_resolve(handle) for handle in user_handles))
+        return dict(zip(user_handles, user_ids))
+
+    async def _lookup_user_id(self, user_handle):
+        url = f"{self.base_url}/handle-to-id/{user_handle}"
+        headers = {"Accept": "application/json", "ApiKey": self.api_key}
 
+        try:
+            response = await self.http.request(
+                "GET", url, headers=headers, timeout=self.request_timeout, **self._request_hooks()
+            )
+        except httpx.HTTPError as exc:
+            print(f"Failed to fetch user ID for @{user_handle}: {exc}")
+            return None
+        if response.status_code == 200:
+            return self._remember_user_id(user_handle, 200, response.json().get('id'))
+        print(f"Failed to fetch user ID for @{user_handle}. Status: {response.status_code}")
+        return self._remember_user_id(user_handle, response.status_code, None)
+
+    async def _fetch_tweet_page(self, user_handle, user_id, cursor=None):
+        url = f"{self.base_url}/user-tweets"
+        headers = {
+            "Accept": "application/json",
+            "ApiKey": self.api_key,
+            "Content-Type": "application/json"
+        }
+        data = {"link": f"https://twitter.com/{user_handle}", "user_id": user_id}
+        if cursor:
+            data["cursor"] = cursor
+
+        try:
+            if self.stream_parse:
+                response, page = await self.http.stream(
+                    "POST", url, read_tweet_page, headers=headers, json=data,
+                    timeout=self.request_timeout, **self._request_hooks()
+                )
+            else:
+                response = await self.http.request(
+                    "POST", url, headers=headers, json=data, timeout=self.request_timeout, **self._request_hooks()
+                )
+        except httpx.HTTPError as exc:
+            print(f"Failed to fetch tweets for @{user_handle}: {exc}")
+            return None, None
+        if response.status_code == 200 and self.stream_parse:
+            records, cursor = page
+            return records, cursor or None
+        if response.status_code == 200:
+            payload = response.json()
+            records = [tweet_record(tweet) for tweet in payload.get('tweets', [])]
+            return records, payload.get('next_cursor') or None
+        print(f"Failed to fetch tweets for @{user_handle}. Status: {response.status_code}")
+        return None, None
+
+    async def async_get_new_tweets(self, user_handle, user_id):
+        """Fetch only tweets newer than the handle's high-water mark, newest first.
+
+        Pages are followed through `next_cursor` only while every tweet on the
+        page is unseen, so a quiet handle costs exactly one request and no parsing.
+        The first fetch for a handle just takes the latest page. The high-water
+        mark only moves once the pages reach back to it.
+        """
+        last_seen = self.last_seen_tweet_ids.get(user_handle)
+        new_tweets = []
+        cursor = None
+        # Whether the pages fetched reach back to `last_seen`; if a page failed or
+        # the page cap cut in first, the gap behind them has not been read yet.
+        caught_up = False
+        for _ in range(max(1, self.max_tweet_pages)):
+            records, cursor = await self._fetch_tweet_page(user_handle, user_id, cursor)
+            if records is None:
+                break
+            fresh = [record for record in records if last_seen is None or tweet_id(record) > last_seen]
+            new_tweets.extend(fresh)
+            if not records or last_seen is None or len(fresh) < len(records) or not cursor:
+                caught_up = True
+                break
+
+        if new_tweets and not caught_up:
+            # Keep the old mark so the next poll pages back over the gap again;
+            # the signal bus drops the contracts it has already seen.
+            print(f"Fetched {len(new_tweets)} new tweets for @{user_handle} without reaching the last seen one.")
+        elif new_tweets:
+            newest = max(tweet_id(record) for record in new_tweets)
+            self.last_seen_tweet_ids[user_handle] = max(newest, last_seen or 0)
+            print(f"Fetched {len(new_tweets)} new tweets for @{user_handle}.")
+        return new_tweets
+
+    def _request_hooks(self):
+        return {"before_attempt": self.request_gate, "on_response": self.response_listener}
+
+    async def fetch_new_tweets(self, user_handle):
+        """Resolve `user_handle` and fetch its unseen tweets: `(user_id, new_tweets)`."""
+        started = time.perf_counter()
+        user_id = await self.async_get_user_id(user_handle)
+        if not user_id:
+            return None, []
+        tweets = await self.async_get_new_tweets(user_handle, user_id)
+        self.metrics.observe("tweetscout_fetch", time.perf_counter() - started, handle=user_handle)
+        fetched_at = time.time()
         for tweet in tweets:
-            matches = contract_pattern.findall(tweet)
-            contracts.extend(matches)
+            created_at = parse_created_at(tweet.get("created_at"))
+            if created_at:
+                self.metrics.observe("tweet_age_at_fetch", fetched_at - created_at, handle=user_handle)
+        return user_id, tweets
+
+    def extract_sol_contracts(self, tweets):
+        """Extract valid Solana contract addresses from tweets, including quoted and retweeted text."""
+        contracts = extract_contracts_from_tweets(tweets)
         print('found number of contracts:', str(len(contracts)))
 
         return contracts
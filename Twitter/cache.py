@@ -0,0 +1,116 @@
+import json
+import os
+import threading
+import time
+
+MISSING = object()
+
+
+class UserIdCache:
+    """Handle -> Twitter user id cache with TTLs, persisted as JSON so restarts start warm.
+
+    Successful lookups live for `ttl_seconds`; failed lookups are stored as `None`
+    for the much shorter `negative_ttl_seconds` so a bad handle stops costing a
+    request every sweep. `set` only marks the cache dirty, so lookups on the
+    event loop never wait on disk; a daemon thread rewrites the file at most
+    every `flush_seconds`, and `close` writes whatever is left.
+    """
+
+    def __init__(self, path=None, ttl_seconds=None, negative_ttl_seconds=None, flush_seconds=None):
+        self.path = path if path is not None else os.getenv("USER_ID_CACHE_PATH", "user_id_cache.json")
+        self.ttl_seconds = float(
+            ttl_seconds if ttl_seconds is not None else os.getenv("USER_ID_CACHE_TTL", str(7 * 24 * 3600))
+        )
+        self.negative_ttl_seconds = float(
+            negative_ttl_seconds if negative_ttl_seconds is not None else os.getenv("USER_ID_NEGATIVE_TTL", "600")
+        )
+        self.flush_seconds = float(
+            flush_seconds if flush_seconds is not None else os.getenv("USER_ID_CACHE_FLUSH_SECONDS", "5")
+        )
+        self.closed = False
+        self._entries = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self.load()
+
+    @staticmethod
+    def _key(user_handle):
+        return user_handle.lstrip("@").lower()
+
+    def get(self, user_handle):
+        """Return the cached user id (or `None` for a cached failure), or `MISSING`."""
+        with self._lock:
+            entry = self._entries.get(self._key(user_handle))
+            if not entry:
+                return MISSING
+            if entry["expires_at"] <= time.time():
+                del self._entries[self._key(user_handle)]
+                return MISSING
+            return entry["id"]
+
+    def set(self, user_handle, user_id):
+        ttl = self.ttl_seconds if user_id else self.negative_ttl_seconds
+        with self._lock:
+            self._entries[self._key(user_handle)] = {"id": user_id, "expires_at": time.time() + ttl}
+            self._dirty = True
+        self._ensure_writer()
+
+    def _ensure_writer(self):
+        if self._thread is None and self.path and not self.closed:
+            self._thread = threading.Thread(target=self._run, name="user-id-cache-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self.closed:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Write the file if anything changed since the last write."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, False
+        if dirty:
+            self.save()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as exc:
+            print(f"Ignoring unreadable user id cache {self.path}: {exc}")
+            return
+        now = time.time()
+        with self._lock:
+            self._entries = {
+                handle: entry for handle, entry in entries.items()
+                if entry.get("expires_at", 0) > now
+            }
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            snapshot = dict(self._entries)
+        tmp_path = f"{self.path}.tmp"
+        with self._save_lock:
+            try:
+                with open(tmp_path, "w") as f:
+                    json.dump(snapshot, f)
+                os.replace(tmp_path, self.path)
+            except OSError as exc:
+                print(f"Failed to persist user id cache {self.path}: {exc}")
@@ -0,0 +1,363 @@
+import json
+import re
+
+# A record before any field is read; matches `tweet_record` on an empty tweet.
+RECORD_DEFAULTS = {
+    "id_str": "",
+    "created_at": None,
+    "full_text": "",
+    "quoted_text": "",
+    "retweeted_text": "",
+}
+
+CHUNK_SIZE = 64 * 1024
+
+# Every token swallows the whitespace after it, so a match leaves the parser
+# on the next significant byte.
+_WS = rb"[ \t\n\r]*"
+_STRING_TOKEN = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+_SCALAR_TOKEN = rb"(?:-?[0-9][0-9.eE+-]*|true|false|null)"
+_WHITESPACE = re.compile(_WS)
+_MEMBER = re.compile(rb'"([^"\\]*(?:\\.[^"\\]*)*)"' + _WS + b":" + _WS, re.DOTALL)
+_STRING = re.compile(b"(" + _STRING_TOKEN + b")" + _WS, re.DOTALL)
+_SCALAR = re.compile(b"(" + _SCALAR_TOKEN + b")" + _WS)
+# Everything up to the next bracket, stepping over complete strings. It stops
+# on a bracket, on the quote of a string the buffer cuts off, or at the end.
+_SKIP_RUN = re.compile(rb'(?:[^"{}\[\]]+|' + _STRING_TOKEN + b")*", re.DOTALL)
+
+_QUOTE, _COMMA, _BACKSLASH = ord('"'), ord(","), ord("\\")
+_OPEN_OBJECT, _CLOSE_OBJECT, _OPEN_ARRAY, _CLOSE_ARRAY = ord("{"), ord("}"), ord("["), ord("]")
+_SCALAR_START = frozenset(b"-0123456789tfn")
+_WHITESPACE_BYTES = frozenset(b" \t\n\r")
+
+# Frame states: what the parser expects next inside an object or array.
+_KEY, _VALUE, _NEXT = range(3)
+
+
+class _Object:
+    """Which members of an object to keep: key -> record key (a decoded
+    value) or a nested spec. With `record`, the object starts a new record.
+
+    `skip` steps over a run of unwanted members with string or scalar values
+    in a single match; it only takes members whose `,` or `}` is already in
+    the buffer, so a chunk boundary never splits what it consumed.
+    """
+
+    def __init__(self, fields, record=False):
+        self.fields = {key.encode(): spec for key, spec in fields.items()}
+        self.record = record
+        wanted = b"|".join(re.escape(key) for key in self.fields)
+        self.skip = re.compile(
+            b'(?:"(?!(?:' + wanted + b')")' + _STRING_TOKEN[1:] + _WS + b":" + _WS
+            + b"(?:" + _STRING_TOKEN + b"|" + _SCALAR_TOKEN + b"(?=[,} \t\n\r]))"
+            + _WS + b"(?:," + _WS + b"|(?=}))" + b")*",
+            re.DOTALL,
+        )
+
+
+class _Each:
+    """Apply `spec` to every element of an array."""
+
+    def __init__(self, spec):
+        self.spec = spec
+
+
+TWEET_FIELDS = {
+    "id_str": "id_str",
+    "created_at": "created_at",
+    "full_text": "full_text",
+    "quoted_status": _Object({"full_text": "quoted_text"}),
+    "retweeted_status": _Object({"full_text": "retweeted_text"}),
+}
+
+
+def page_spec(tweet_fields):
+    """A `user-tweets` response keeping `tweet_fields` of every tweet.
+    Recorded datasets nest such pages under `test_data`."""
+    page = _Object({
+        "tweets": _Each(_Object(tweet_fields, record=True)),
+        "next_cursor": "next_cursor",
+        "test_data": _Each(None),
+    })
+    page.fields[b"test_data"].spec = page
+    return page
+
+
+PAGE_SPEC = page_spec(TWEET_FIELDS)
+# Recorded dumps mix handles, so they also keep who posted each tweet.
+RECORDED_PAGE_SPEC = page_spec(dict(TWEET_FIELDS, user=_Object({"screen_name": "screen_name"})))
+
+
+class _Frame:
+    __slots__ = ("is_object", "spec", "record", "state", "key")
+
+    def __init__(self, is_object, spec, record):
+        self.is_object = is_object
+        self.spec = spec
+        self.record = record
+        self.state = _KEY if is_object else _VALUE
+        self.key = None
+
+
+def _is_flat(buffer, start, close):
+    """True if nothing between `start` and `close` can nest or hide a bracket:
+    no brackets that open, no escapes and an even number of quotes. The whole
+    container is then stepped over by `bytes.count`, without the regex."""
+    return not (
+        buffer.count(b"{", start, close)
+        or buffer.count(b"[", start, close)
+        or buffer.count(b"\\", start, close)
+        or buffer.count(b'"', start, close) & 1
+    )
+
+
+def _decode(raw):
+    if raw[0] == _QUOTE and _BACKSLASH not in raw:
+        return raw[1:-1].decode("utf-8")
+    return json.loads(raw)
+
+
+class TweetStreamParser:
+    """Incremental, selective parser for TweetScout JSON.
+
+    Bytes are fed in chunks of any size as they arrive, and every tweet comes
+    back as a `tweet_record` dict as soon as its closing brace is read. Only
+    the members named in the spec are decoded: `user` objects, counters,
+    entities and the rest of the quoted and retweeted statuses are stepped
+    over by regex without building a Python object. The buffer never holds
+    more than a chunk plus the longest single string, so a multi-GB
+    recording streams in constant memory.
+
+    Any number of top-level values may follow each other (one response per
+    line). Top-level members such as `next_cursor` land in `fields`.
+    Malformed input raises `ValueError`, like `json.loads`.
+    """
+
+    def __init__(self, spec=PAGE_SPEC):
+        self.spec = spec
+        self.fields = {}
+        self._buffer = b""
+        self._pos = 0
+        self._stack = []
+        self._skip_depth = 0
+        self._records = []
+
+    def feed(self, chunk):
+        """Parse another chunk; returns the records it completed."""
+        if self._pos:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        self._buffer = self._buffer + chunk if self._buffer else bytes(chunk)
+        self._parse(final=False)
+        return self._take()
+
+    def close(self):
+        """Finish the stream; raises `ValueError` if it stopped mid-value."""
+        self._parse(final=True)
+        if self._stack or self._skip_depth:
+            raise ValueError("Truncated TweetScout JSON")
+        return self._take()
+
+    def _take(self):
+        records, self._records = self._records, []
+        return records
+
+    def _error(self, pos, expected):
+        raise ValueError(f"Expected {expected} in TweetScout JSON at byte {pos} of the buffer")
+
+    def _close_frame(self):
+        frame = self._stack.pop()
+        if frame.is_object and frame.spec.record:
+            self._records.append(frame.record)
+        if self._stack:
+            self._stack[-1].state = _NEXT
+
+    def _skip(self, buffer, pos):
+        """Step over the rest of a skipped container; returns where to resume."""
+        depth = self._skip_depth
+        end = len(buffer)
+        run = _SKIP_RUN.match
+        while depth:
+            pos = run(buffer, pos).end()
+            if pos >= end or buffer[pos] == _QUOTE:
+                break  # wait for the rest of the container or of a split string
+            if buffer[pos] == _OPEN_OBJECT or buffer[pos] == _OPEN_ARRAY:
+                depth += 1
+            else:
+                depth -= 1
+            pos += 1
+        self._skip_depth = depth
+        return pos
+
+    def _parse(self, final):
+        buffer, pos, stack = self._buffer, self._pos, self._stack
+        end = len(buffer)
+        whitespace = _WHITESPACE.match
+        while True:
+            if self._skip_depth:
+                pos = self._skip(buffer, pos)
+                if self._skip_depth:
+                    break
+                if stack:
+                    stack[-1].state = _NEXT
+                pos = whitespace(buffer, pos).end()
+            if pos >= end:
+                break
+            char = buffer[pos]
+            frame = stack[-1] if stack else None
+            state = frame.state if frame is not None else _VALUE
+
+            if state == _NEXT:
+                if char == _COMMA:
+                    frame.state = _KEY if frame.is_object else _VALUE
+                    pos = whitespace(buffer, pos + 1).end()
+                elif char == (_CLOSE_OBJECT if frame.is_object else _CLOSE_ARRAY):
+                    pos = whitespace(buffer, pos + 1).end()
+                    self._close_frame()
+                elif char in _WHITESPACE_BYTES:
+                    pos = whitespace(buffer, pos).end()
+                else:
+                    self._error(pos, "',' or a closing bracket")
+                continue
+            if state == _KEY:
+                if char == _QUOTE:
+                    pos = frame.spec.skip.match(buffer, pos).end()
+                    if pos >= end:
+                        break
+                    if buffer[pos] == _CLOSE_OBJECT:
+                        continue
+                    match = _MEMBER.match(buffer, pos)
+                    if match is None:
+                        break
+                    frame.key = match.group(1)
+                    frame.state = _VALUE
+                    pos = match.end()
+                    if pos >= end:
+                        break
+                    char = buffer[pos]  # straight on to the member's value
+                elif char == _CLOSE_OBJECT:
+                    pos = whitespace(buffer, pos + 1).end()
+                    self._close_frame()
+                    continue
+                elif char in _WHITESPACE_BYTES:
+                    pos = whitespace(buffer, pos).end()
+                    continue
+                else:
+                    self._error(pos, "a key")
+
+            # A value: the document root, an object member or an array element.
+            if frame is None:
+                spec, record = self.spec, self.fields
+            elif frame.is_object:
+                spec, record = frame.spec.fields.get(frame.key), frame.record
+            else:
+                if char == _CLOSE_ARRAY:  # an empty array
+                    pos = whitespace(buffer, pos + 1).end()
+                    self._close_frame()
+                    continue
+                spec, record = frame.spec, frame.record
+            if char == _QUOTE:
+                match = _STRING.match(buffer, pos)
+            elif char in _SCALAR_START:
+                match = _SCALAR.match(buffer, pos)
+                if match is not None and match.end() == end and not final:
+                    match = None  # the number may continue in the next chunk
+            elif char == _OPEN_OBJECT or char == _OPEN_ARRAY:
+                pos = whitespace(buffer, pos + 1).end()
+                if char == _OPEN_OBJECT and spec.__class__ is _Object:
+                    stack.append(_Frame(True, spec, dict(RECORD_DEFAULTS) if spec.record else record))
+                elif char == _OPEN_ARRAY and spec.__class__ is _Each:
+                    stack.append(_Frame(False, spec.spec, record))
+                elif char == _OPEN_ARRAY and spec.__class__ is _Object and not spec.record:
+                    stack.append(_Frame(False, spec, record))  # a list of pages
+                else:
+                    close = buffer.find(_CLOSE_OBJECT if char == _OPEN_OBJECT else _CLOSE_ARRAY, pos)
+                    if close >= 0 and _is_flat(buffer, pos, close):
+                        pos = whitespace(buffer, close + 1).end()
+                        if frame is not None:
+                            frame.state = _NEXT
+                    else:
+                        self._skip_depth = 1
+                continue
+            elif char in _WHITESPACE_BYTES:
+                pos = whitespace(buffer, pos).end()
+                continue
+            else:
+                self._error(pos, "a value")
+            if match is None:
+                if final:
+                    self._error(pos, "a complete value")
+                break
+            if spec.__class__ is str:
+                value = _decode(match.group(1))
+                if value is not None:
+                    record[spec] = value
+            pos = match.end()
+            if frame is not None:
+                if pos < end and buffer[pos] == _COMMA:
+                    frame.state = _KEY if frame.is_object else _VALUE
+                    pos = whitespace(buffer, pos + 1).end()
+                else:
+                    frame.state = _NEXT
+        self._pos = pos
+
+
+def iter_tweets(chunks, spec=PAGE_SPEC):
+    """Yield tweet records from an iterable of byte chunks as they complete."""
+    parser = TweetStreamParser(spec)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+async def read_tweet_page(response):
+    """Parse a streamed `user-tweets` response as its body arrives.
+    Returns `(records, next_cursor)`, or None for a non-200 response."""
+    if response.status_code != 200:
+        return None
+    parser = TweetStreamParser()
+    records = []
+    async for chunk in response.aiter_bytes():
+        records.extend(parser.feed(chunk))
+    records.extend(parser.close())
+    return records, parser.fields.get("next_cursor")
+
+
+def read_tweet_page_sync(response):
+    """Blocking twin of `read_tweet_page`."""
+    if response.status_code != 200:
+        return None
+    parser = TweetStreamParser()
+    records = []
+    for chunk in response.iter_bytes():
+        records.extend(parser.feed(chunk))
+    records.extend(parser.close())
+    return records, parser.fields.get("next_cursor")
+
+
+def iter_tweet_file(path, chunk_size=CHUNK_SIZE):
+    """Stream the tweets of a recorded TweetScout dump (`results.json`,
+    `Twitter-Test-Data/*.json`) in constant memory, with `screen_name`."""
+    with open(path, "rb") as f:
+        yield from iter_tweets(iter(lambda: f.read(chunk_size), b""), RECORDED_PAGE_SPEC)
+
+
+# Lines the old polling script printed after a tweet's text.
+_LOG_TWEET_PREFIX = "Tweet: "
+_LOG_TWEET_END = ("No Program ID found", "Program ID: ")
+
+
+def iter_logged_tweets(path):
+    """Yield the tweets of a `twitter_log_*.txt` console log, line by line.
+    The log only kept the text, so the other record fields keep their defaults."""
+    lines = None
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if line.startswith(_LOG_TWEET_PREFIX):
+                lines = [line[len(_LOG_TWEET_PREFIX):]]
+            elif lines is not None and line.startswith(_LOG_TWEET_END):
+                yield dict(RECORD_DEFAULTS, full_text="\n".join(lines))
+                lines = None
+            elif lines is not None:
+                lines.append(line)
@@ -0,0 +1,209 @@
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import time
+
+
+def parse_priorities(value):
+    """`"handle:3,other:0.5"` -> `{"handle": 3.0, "other": 0.5}`."""
+    priorities = {}
+    for item in (value or "").split(","):
+        handle, _, weight = item.strip().partition(":")
+        if handle and weight:
+            priorities[handle.lstrip("@").lower()] = float(weight)
+    return priorities
+
+
+class TweetScheduler:
+    """Spends a TweetScout requests-per-minute budget across handles.
+
+    A token bucket refilled at `TWEETSCOUT_RPM / 60` per second gates every
+    TweetScout request (installed as `TwitterClient.request_gate`). Each
+    handle's next poll is due after `1 / share` of the budget, where its share
+    is its configured priority boosted by how recently it posted a contract,
+    so hot callers are polled fast and quiet accounts slowly. 429s and
+    exhausted `X-RateLimit-*` headers pause the bucket until the reset time.
+    In multi-process mode the `ClusterServer` hands each worker its share of
+    the budget (`set_budget`) and relays every pause to the other workers
+    (`pause_listener` / `pause`), since they all spend the same API key.
+    """
+
+    def __init__(self, user_handles):
+        self.requests_per_minute = float(os.getenv("TWEETSCOUT_RPM", "60"))
+        self.burst = float(os.getenv("TWEETSCOUT_BURST", "5"))
+        self.min_interval = float(os.getenv("TWEET_MIN_INTERVAL", "5"))
+        self.max_interval = float(os.getenv("TWEET_POLL_SECONDS", "120"))
+        self.recency_boost = float(os.getenv("TWEET_RECENCY_BOOST", "4"))
+        self.recency_half_life = float(os.getenv("TWEET_RECENCY_HALF_LIFE", "1800"))
+        self.rate_limit_pause = float(os.getenv("TWEETSCOUT_RATE_LIMIT_PAUSE", "30"))
+        self.max_concurrency = int(os.getenv("TWEET_MAX_CONCURRENCY", "10"))
+        self.priorities = parse_priorities(os.getenv("TWITTER_PRIORITIES", ""))
+
+        self.user_handles = list(user_handles)
+        self.pause_listener = None  # called with the seconds of every rate-limit pause
+        self.last_contract_at = {}
+        self.tokens = self.burst
+        self.blocked_until = 0.0
+        self._refilled_at = time.monotonic()
+        self._heap = []
+        self._due = {}
+        self._counter = itertools.count()
+        self._wakeup = None
+        for handle in self.user_handles:
+            self.schedule(handle, 0.0)
+
+    # -- per-handle cadence -------------------------------------------------
+
+    def weight(self, handle, now=None):
+        now = time.time() if now is None else now
+        weight = self.priorities.get(handle.lstrip("@").lower(), 1.0)
+        posted_at = self.last_contract_at.get(handle)
+        if posted_at is not None:
+            weight *= 1 + self.recency_boost * math.exp(-(now - posted_at) * math.log(2) / self.recency_half_life)
+        return weight
+
+    def interval(self, handle, now=None):
+        """Seconds between polls of `handle` so all handles together fit the budget."""
+        now = time.time() if now is None else now
+        total = sum(self.weight(other, now) for other in self.user_handles) or 1.0
+        polls_per_second = self.requests_per_minute / 60 * self.weight(handle, now) / total
+        if polls_per_second <= 0:
+            return self.max_interval
+        return min(max(1 / polls_per_second, self.min_interval), self.max_interval)
+
+    def record_contract(self, handle, posted_at=None):
+        """A handle just produced a contract: boost it and poll it again sooner."""
+        self.last_contract_at[handle] = time.time() if posted_at is None else posted_at
+        due_at = time.monotonic() + self.interval(handle)
+        if due_at < self._due.get(handle, math.inf):
+            self.schedule(handle, due_at)
+
+    def set_handles(self, user_handles):
+        """Replace the polled handles (cluster rebalancing): new ones are due
+        now, dropped ones are forgotten, the rest keep their schedule."""
+        current = set(self.user_handles)
+        self.user_handles = list(user_handles)
+        for handle in current - set(self.user_handles):
+            self._due.pop(handle, None)
+            self.last_contract_at.pop(handle, None)
+        for handle in self.user_handles:
+            if handle not in current:
+                self.schedule(handle, 0.0)
+
+    def schedule(self, handle, due_at):
+        self._due[handle] = due_at
+        heapq.heappush(self._heap, (due_at, next(self._counter), handle))
+        if self._wakeup:
+            self._wakeup.set()
+
+    def pop_due(self, now):
+        while self._heap:
+            due_at, _, handle = self._heap[0]
+            if self._due.get(handle) != due_at:
+                heapq.heappop(self._heap)
+                continue
+            if due_at > now:
+                return None, due_at
+            heapq.heappop(self._heap)
+            del self._due[handle]
+            return handle, due_at
+        return None, None
+
+    # -- request budget ----------------------------------------------------
+
+    def _refill(self, now):
+        rate = self.requests_per_minute / 60
+        self.tokens = min(self.burst, self.tokens + (now - self._refilled_at) * rate)
+        self._refilled_at = now
+
+    async def acquire(self):
+        """Take one request token, waiting out rate-limit pauses and an empty bucket."""
+        while True:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                await asyncio.sleep(self.blocked_until - now)
+                continue
+            self._refill(now)
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) * 60 / self.requests_per_minute)
+
+    def set_budget(self, requests_per_minute, burst):
+        """Spend `requests_per_minute` with bursts of `burst` from now on."""
+        self._refill(time.monotonic())
+        self.requests_per_minute = requests_per_minute
+        self.burst = max(1.0, burst)
+        self.tokens = min(self.tokens, self.burst)
+
+    def pause(self, seconds):
+        """Send nothing for `seconds`."""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = min(self.tokens, 0.0)
+
+    def observe_response(self, response):
+        """React to TweetScout rate limiting (installed as `TwitterClient.response_listener`)."""
+        headers = response.headers
+        pause = None
+        if response.status_code == 429:
+            pause = self.rate_limit_pause
+            retry_after = headers.get("Retry-After")
+            if retry_after:
+                try:
+                    pause = float(retry_after)
+                except ValueError:
+                    pass
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        if remaining is not None and reset is not None:
+            try:
+                if float(remaining) <= 0:
+                    reset = float(reset)
+                    # Either an epoch timestamp or seconds until the window resets.
+                    pause = max(pause or 0.0, reset - time.time() if reset > 1e9 else reset)
+            except ValueError:
+                pass
+        if pause is not None and pause > 0:
+            self.pause(pause)
+            print(f"TweetScout rate limited; pausing requests for {pause:.1f}s")
+            if self.pause_listener:
+                self.pause_listener(pause)
+
+    # -- driver ------------------------------------------------------------
+
+    async def run(self, poll_handle):
+        """Poll handles forever as they come due, `max_concurrency` at a time."""
+        self._wakeup = asyncio.Event()
+        slots = asyncio.Semaphore(max(1, self.max_concurrency))
+        tasks = set()
+
+        async def _poll(handle):
+            try:
+                await poll_handle(handle)
+            except Exception as exc:
+                print(f"Polling @{handle} failed: {exc}")
+            finally:
+                if handle not in self._due and handle in self.user_handles:
+                    self.schedule(handle, time.monotonic() + self.interval(handle))
+                slots.release()
+
+        try:
+            while True:
+                handle, due_at = self.pop_due(time.monotonic())
+                if handle is None:
+                    timeout = None if due_at is None else max(due_at - time.monotonic(), 0.0)
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                await slots.acquire()
+                task = asyncio.create_task(_poll(handle), name="ingest.poll")
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            for task in tasks:
+                task.cancel()
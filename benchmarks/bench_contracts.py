@@ -0,0 +1,66 @@
+"""Micro-benchmark: legacy per-call regex extraction vs the shared validated extractor.
+
+Runs over every tweet in `results.json` and `Twitter-Test-Data/*.json`:
+
+    python benchmarks/bench_contracts.py [--repeat 200]
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import time
+
+from BrothersTrusts.CoinSniper.Shared.contracts import extract_contracts_from_tweets, tweet_texts
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_tweets():
+    tweets = []
+    with open(os.path.join(REPO_ROOT, "results.json")) as f:
+        tweets.extend(json.load(f).get("tweets", []))
+    for path in sorted(glob.glob(os.path.join(REPO_ROOT, "Twitter-Test-Data", "*.json"))):
+        with open(path) as f:
+            for page in json.load(f).get("test_data", []):
+                tweets.extend(page.get("tweets", []))
+    return tweets
+
+
+def legacy_extract(texts):
+    contracts = []
+    for text in texts:
+        contract_pattern = re.compile(r"\b[A-HJ-NP-Za-km-z1-9]{32,44}\b")
+        contracts.extend(contract_pattern.findall(text))
+    return contracts
+
+
+def _time(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    tweets = load_tweets()
+    texts = [text for tweet in tweets for text in tweet_texts(tweet)]
+
+    legacy_seconds, legacy = _time(lambda: legacy_extract(texts), args.repeat)
+    shared_seconds, shared = _time(lambda: extract_contracts_from_tweets(tweets), args.repeat)
+
+    per_tweet = 1e6 / (len(tweets) * args.repeat)
+    print(f"tweets={len(tweets)} texts={len(texts)} repeat={args.repeat}")
+    print(f"legacy regex   : {legacy_seconds * per_tweet:8.2f} us/tweet  matches={len(legacy)}")
+    print(f"shared extract : {shared_seconds * per_tweet:8.2f} us/tweet  contracts={len(shared)}")
+    rejected = sorted(set(legacy) - set(shared))
+    if rejected:
+        print(f"rejected {len(rejected)} legacy match(es): {rejected}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Micro-benchmark: dict-per-trade exit checks vs the struct-of-arrays PositionBook.
+
+Builds N random positions both ways, reports bytes per position (tracemalloc,
+contract strings excluded since both layouts hold the same ones) and the time
+to run the exit rules over one price batch covering every position:
+
+    python benchmarks/bench_positions.py [--positions 5000] [--repeat 20]
+"""
+import argparse
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import numpy as np
+
+from BrothersTrusts.CoinSniper.Shared.strategy import exit_params_from_env
+from BrothersTrusts.CoinSniper.Telegram.positions import PositionBook
+
+
+def random_positions(count, seed=0):
+    rng = np.random.default_rng(seed)
+    contracts = [f"{index:044d}" for index in range(count)]
+    entry = rng.uniform(0.001, 1.0, count)
+    columns = {
+        "entry": entry,
+        "high": entry * rng.uniform(1.0, 1.5, count),
+        "sold": rng.choice([0.0, 0.3, 0.6], count),
+        "opened_at": time.time() - rng.uniform(0, 1800, count),
+        "last_price": entry,
+    }
+    prices = entry * np.exp(rng.normal(0, 0.1, count))
+    return contracts, columns, dict(zip(contracts, prices.tolist()))
+
+
+def build_dicts(contracts, columns):
+    return {
+        contract: {field: float(values[row]) for field, values in columns.items()} | {"entry_source": "helius"}
+        for row, contract in enumerate(contracts)
+    }
+
+
+def build_book(contracts, columns):
+    book = PositionBook(capacity=len(contracts))
+    for row, contract in enumerate(contracts):
+        book[contract] = {field: values[row] for field, values in columns.items()} | {"entry_source": "helius"}
+    return book
+
+
+def legacy_exit(rules, trade, price, now):
+    """The pre-PositionBook per-trade `evaluate_sell` branching, minus the awaits."""
+    entry, high, sold = trade["entry"], max(trade["high"], price), trade["sold"]
+    if entry <= 0:
+        return None
+    multiplier = price / entry
+    for level_multiplier, target_sold in rules.take_profit_levels:
+        if multiplier >= level_multiplier and sold < target_sold:
+            pct = round((target_sold - sold) * 100)
+            return (pct, f"{level_multiplier}x take profit") if pct > 0 else None
+    remaining = round((1.0 - sold) * 100)
+    if multiplier >= rules.trailing_start_multiplier and price <= high * rules.trailing_stop_factor and sold < 1.0:
+        return (remaining, "Trailing stop hit") if remaining > 0 else None
+    if price <= entry * rules.hard_stop_factor and sold < 1.0 and remaining > 0:
+        return remaining, "Hard stop loss"
+    if now - trade["opened_at"] > rules.max_hold_seconds and multiplier < rules.time_exit_multiplier and remaining > 0:
+        return remaining, "Time-based exit"
+    return None
+
+
+def _measure(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--positions", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rules = SimpleNamespace(**exit_params_from_env())
+    contracts, columns, prices = random_positions(args.positions)
+    # Intern the contract strings first so neither measurement pays for them.
+    contracts = [str(contract) for contract in contracts]
+    trades, dict_bytes = _measure(lambda: build_dicts(contracts, columns))
+    book, book_bytes = _measure(lambda: build_book(contracts, columns))
+
+    now = time.time()
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        legacy = {}
+        for contract, trade in trades.items():
+            order = legacy_exit(rules, trade, prices[contract], now)
+            if order:
+                legacy[contract] = order
+    legacy_seconds = (time.perf_counter() - started) / args.repeat
+
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        slots, _, quotes = book.quoted(prices)
+        high = np.maximum(book.high[slots], quotes)
+        saved, book.high[slots] = book.high[slots].copy(), high
+        orders = book.exit_orders(rules, slots, quotes, now)
+        book.high[slots] = saved
+    book_seconds = (time.perf_counter() - started) / args.repeat
+
+    vectorized = {contract: (pct, reason) for contract, pct, reason in orders}
+    print(f"positions={args.positions} repeat={args.repeat} sells/batch={len(vectorized)}")
+    print(f"dict per trade : {dict_bytes / args.positions:8.1f} B/position  {legacy_seconds * 1e3:8.2f} ms/batch")
+    print(f"position book  : {book_bytes / args.positions:8.1f} B/position  {book_seconds * 1e3:8.2f} ms/batch")
+    if vectorized != legacy:
+        print(f"MISMATCH: {len(set(vectorized.items()) ^ set(legacy.items()))} differing orders")
+
+
+if __name__ == "__main__":
+    main()
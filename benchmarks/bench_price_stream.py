@@ -0,0 +1,96 @@
+"""Benchmark: market move to `/sell` sent, HTTP polling vs the WebSocket price stream.
+
+Opens N positions against the local fakes, crashes each one through its hard
+stop at a random moment, and measures how long the bot takes to send the
+sell — once polling `FakeHelius`, once fed by `FakePriceStream` over the same
+price paths. Polling uses the adaptive scheduler capped at `--max-interval`
+(far-from-trigger positions are otherwise re-polled only every
+`PRICE_MAX_INTERVAL`, 30s by default). Needs aiohttp for the streaming run:
+
+    python benchmarks/bench_price_stream.py [--positions 50] [--seconds 8] [--tick 0.05] [--max-interval 2]
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import random
+import time
+
+from BrothersTrusts.CoinSniper.Loadtest.app import patched_env
+from BrothersTrusts.CoinSniper.Loadtest.fakes import (
+    FakeHelius,
+    FakePriceStream,
+    FakeTelegramClient,
+    FakeUpstreams,
+    fake_contract,
+)
+from BrothersTrusts.CoinSniper.Shared.metrics import LatencyHistogram
+from BrothersTrusts.CoinSniper.Telegram.app import TelegramBot
+
+
+def crash_path(at):
+    return lambda elapsed: 1.0 if elapsed < at else 0.5
+
+
+async def measure(stream, positions, seconds, tick, max_interval, seed):
+    rng = random.Random(seed)
+    crashes = {fake_contract(rng): rng.uniform(0.5, seconds - 1.5) for _ in range(positions)}
+    helius = FakeHelius(price_paths={contract: crash_path(at) for contract, at in crashes.items()})
+    feed = FakePriceStream(helius.price, interval=tick)
+    client = FakeTelegramClient()
+    latency = LatencyHistogram()
+
+    def _on_send(handle, message, sent_at):
+        parts = message.split()
+        if parts[0] == "/sell" and parts[1] in crashes:
+            latency.observe(time.monotonic() - helius.started_at - crashes[parts[1]])
+
+    client.on_send = _on_send
+    with FakeUpstreams(helius, feed):
+        env = {
+            "API_ID": "1",
+            "API_HASH": "bench",
+            "HELIUS_API_KEY": "bench",
+            "HELIUS_RPC_URL": f"{helius.base_url}/",
+            "STATE_DB_PATH": "",
+            "TELEGRAM_CHAT_MESSAGES_PER_SECOND": "0",
+            "PRICE_MAX_INTERVAL": str(max_interval),
+            "PRICE_STREAM_URL": feed.base_url if stream else "",
+        }
+        with patched_env(env), open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            bot = TelegramBot(client=client)
+            now = time.time()
+            for contract in crashes:
+                bot.trades[contract] = {"entry": 1.0, "high": 1.0, "sold": 0.0, "opened_at": now, "last_price": 1.0}
+            await bot.start()
+            await asyncio.sleep(seconds)
+            await bot.close()
+    return latency, helius.requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--positions", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=8.0)
+    parser.add_argument("--tick", type=float, default=0.05, help="stream tick interval (s)")
+    parser.add_argument("--max-interval", type=float, default=2.0, help="longest gap between polls of one position (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(
+        f"positions={args.positions} seconds={args.seconds} tick={args.tick * 1e3:.0f}ms "
+        f"max_interval={args.max_interval}s"
+    )
+    for label, stream in (("polling", False), ("streaming", True)):
+        latency, requests = asyncio.run(
+            measure(stream, args.positions, args.seconds, args.tick, args.max_interval, args.seed)
+        )
+        summary = latency.summary()
+        print(
+            f"{label:10s}: missed={args.positions - summary['count']:3d}  p50 {summary['p50_ms']:8.1f} ms  "
+            f"p95 {summary['p95_ms']:8.1f} ms  max {summary['max_ms']:8.1f} ms  helius requests={requests}"
+        )
+
+
+if __name__ == "__main__":
+    main()
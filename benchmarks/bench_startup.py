@@ -0,0 +1,139 @@
+"""Benchmark: start-up cost, time to the first TweetScout poll, and standby takeover.
+
+1. Cold import of the controller, with Telethon deferred (as now) and with
+   Telethon imported up front (as before), each in a fresh interpreter.
+2. Controller created -> first poll done against the load-test fakes, with a
+   slow Telegram connect: the old order (warm up, connect, then poll) vs
+   `Controller.run`, which polls while Telegram connects.
+3. Hot standby: primary lock released -> first poll by a warmed-up standby.
+
+    python benchmarks/bench_startup.py [--handles 20] [--connect-latency 1.5] [--latency 0.05]
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from BrothersTrusts.CoinSniper.Controller.app import Controller
+from BrothersTrusts.CoinSniper.Loadtest.app import patched_env
+from BrothersTrusts.CoinSniper.Loadtest.fakes import (
+    FakeHelius,
+    FakeTelegramClient,
+    FakeTweetScout,
+    FakeUpstreams,
+    FaultProfile,
+)
+from BrothersTrusts.CoinSniper.Shared.standby import LeaderLock
+from BrothersTrusts.CoinSniper.Telegram.app import TelegramBot
+
+IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); {prelude}"
+    "import BrothersTrusts.CoinSniper.Controller.app; print(time.perf_counter() - started)"
+)
+
+
+def import_seconds(prelude, repeat):
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET.format(prelude=prelude)],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        runs.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(runs)
+
+
+def upstream_env(tweetscout, helius, handles, state_path):
+    return {
+        "TWEET_SCOUT_API_KEY": "bench",
+        "TWEET_SCOUT_BASE_URL": tweetscout.base_url,
+        "HELIUS_API_KEY": "bench",
+        "HELIUS_RPC_URL": f"{helius.base_url}/",
+        "API_ID": "1",
+        "API_HASH": "bench",
+        "STATE_DB_PATH": state_path,
+        "USER_ID_CACHE_PATH": "",
+        "TWEETSCOUT_RPM": str(600 * handles),
+        "TWEETSCOUT_BURST": str(2 * handles),
+        "LOOP_PROFILER": "0",
+    }
+
+
+async def _until(condition, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError("benchmark condition not met")
+        await asyncio.sleep(0.001)
+
+
+async def _stop(task):
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+async def first_poll_serial(handles, connect_latency):
+    controller = Controller(handles, telegram_bot=TelegramBot(client=FakeTelegramClient(connect_latency=connect_latency)))
+    await controller.warm_up()
+    await controller.poll_handle(handles[0])
+    seconds = controller._first_poll_at - controller.started_at
+    await controller.telegram_bot.close()
+    await controller.http.aclose()
+    return seconds
+
+
+async def first_poll_parallel(handles, connect_latency):
+    controller = Controller(handles, telegram_bot=TelegramBot(client=FakeTelegramClient(connect_latency=connect_latency)))
+    task = asyncio.create_task(controller.run())
+    await _until(lambda: controller._first_poll_at is not None)
+    await _stop(task)
+    return controller._first_poll_at - controller.started_at
+
+
+async def standby_takeover(handles, lock_path):
+    primary = LeaderLock(lock_path)
+    primary.try_acquire()
+    with patched_env({"STANDBY_LOCK_PATH": lock_path, "STANDBY_POLL_SECONDS": "0.05"}):
+        controller = Controller(handles, telegram_bot=TelegramBot(client=FakeTelegramClient()))
+    task = asyncio.create_task(controller.run())
+    await _until(lambda: controller.metrics.histogram("startup_warm_up") is not None)
+    released_at = time.perf_counter()
+    primary.release()
+    await _until(lambda: controller._first_poll_at is not None)
+    await _stop(task)
+    return controller._first_poll_at - released_at
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--handles", type=int, default=20)
+    parser.add_argument("--connect-latency", type=float, default=1.5, help="fake Telegram connect time (s)")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake TweetScout/Helius latency (s)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    lazy = import_seconds("", args.repeat)
+    eager = import_seconds("import telethon; ", args.repeat)
+    print(f"cold import      : {lazy * 1e3:7.0f} ms (Telethon deferred) vs {eager * 1e3:7.0f} ms (Telethon up front)")
+
+    handles = [f"handle{index}" for index in range(args.handles)]
+    faults = FaultProfile(latency=args.latency)
+    with tempfile.TemporaryDirectory() as tmp, FakeUpstreams(FakeTweetScout(faults), FakeHelius(faults)) as upstreams:
+        tweetscout, helius = upstreams.servers
+        env = upstream_env(tweetscout, helius, len(handles), os.path.join(tmp, "state.db"))
+        with patched_env(env), open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            serial = asyncio.run(first_poll_serial(handles, args.connect_latency))
+            parallel = asyncio.run(first_poll_parallel(handles, args.connect_latency))
+            takeover = asyncio.run(standby_takeover(handles, os.path.join(tmp, "primary.lock")))
+    print(f"first poll       : {serial * 1e3:7.0f} ms (warm-up, connect, then poll) vs "
+          f"{parallel * 1e3:7.0f} ms (poll alongside a {args.connect_latency:.1f} s connect)")
+    print(f"standby takeover : {takeover * 1e3:7.0f} ms from primary lock released to first poll")
+
+
+if __name__ == "__main__":
+    main()
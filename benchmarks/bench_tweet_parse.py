@@ -0,0 +1,142 @@
+"""Benchmark: streaming, selective tweet parsing vs `json.loads` of the whole payload.
+
+1. Every shipped dump (`results.json`, `Twitter-Test-Data/*.json`) plus a
+   synthetic recording of `--megabytes` built from their pages: time and
+   peak traced memory to turn each into tweet records, `json.loads` +
+   `tweet_record` against `iter_tweet_file`.
+2. One `user-tweets` page (the tweets of `results.json`) fetched through
+   `TwitterClient` from an in-process transport, buffered vs streamed.
+
+    python benchmarks/bench_tweet_parse.py [--megabytes 50] [--repeat 20]
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+import httpx
+
+from BrothersTrusts.CoinSniper.Shared.http import HttpTransport
+from BrothersTrusts.CoinSniper.Twitter.app import TwitterClient, tweet_record
+from BrothersTrusts.CoinSniper.Twitter.parse import iter_tweet_file
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_PATHS = [os.path.join(REPO_ROOT, "results.json")] + sorted(
+    glob.glob(os.path.join(REPO_ROOT, "Twitter-Test-Data", "*.json"))
+)
+
+
+def _pages(payload):
+    if isinstance(payload, list):
+        for page in payload:
+            yield from _pages(page)
+        return
+    yield payload
+    for page in payload.get("test_data", []):
+        yield from _pages(page)
+
+
+# Both count the records instead of keeping them, as `load_signals` does, so
+# the peaks below are the parsing alone.
+def load_whole(path):
+    """What the dumps were read with before: the whole document, then the fields."""
+    with open(path, "rb") as f:
+        payload = json.loads(f.read())
+    return sum(1 for page in _pages(payload) for tweet in page.get("tweets", []) if tweet_record(tweet))
+
+
+def load_streamed(path):
+    return sum(1 for _ in iter_tweet_file(path))
+
+
+def write_recording(path, megabytes):
+    pages = []
+    for sample in SAMPLE_PATHS:
+        with open(sample) as f:
+            pages.extend(page for page in _pages(json.load(f)) if page.get("tweets"))
+    with open(path, "w") as f:
+        f.write('{"test_data": [')
+        written, index = 0, 0
+        while written < megabytes * 1024 * 1024:
+            text = json.dumps(pages[index % len(pages)], indent=2)
+            f.write((",\n" if index else "\n") + text)
+            written += len(text)
+            index += 1
+        f.write("\n]}\n")
+
+
+def _seconds(fn, path, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        count = fn(path)
+        best = min(best, time.perf_counter() - started)
+    return best, count
+
+
+def _peak_bytes(fn, path):
+    tracemalloc.start()
+    try:
+        fn(path)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def compare_files(paths, repeat):
+    for path in paths:
+        size = os.path.getsize(path)
+        runs = repeat if size < 10 * 1024 * 1024 else 1
+        whole, count = _seconds(load_whole, path, runs)
+        streamed, _ = _seconds(load_streamed, path, runs)
+        whole_peak, streamed_peak = _peak_bytes(load_whole, path), _peak_bytes(load_streamed, path)
+        print(f"{os.path.basename(path)}: {size / 1e6:.2f} MB, {count} tweets")
+        print(f"  json.loads + tweet_record : {whole * 1e3:8.1f} ms  {size / whole / 1e6:6.1f} MB/s  peak {whole_peak / 1e6:8.2f} MB")
+        print(f"  iter_tweet_file           : {streamed * 1e3:8.1f} ms  {size / streamed / 1e6:6.1f} MB/s  peak {streamed_peak / 1e6:8.2f} MB")
+
+
+async def _fetch(client, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        records, _ = await client._fetch_tweet_page("bench", "42")
+        best = min(best, time.perf_counter() - started)
+    await client.http.aclose()
+    return best, len(records)
+
+
+def compare_fetch(repeat):
+    with open(SAMPLE_PATHS[0], "rb") as f:
+        body = f.read()
+    os.environ.setdefault("TWEET_SCOUT_API_KEY", "bench")
+    os.environ["USER_ID_CACHE_PATH"] = ""
+    results = {}
+    for streamed in (False, True):
+        client = TwitterClient()
+        client.stream_parse = streamed
+        client.http = HttpTransport(async_transport=httpx.MockTransport(lambda request: httpx.Response(200, content=body)))
+        results[streamed] = asyncio.run(_fetch(client, repeat))
+    print(f"user-tweets page: {len(body) / 1e3:.0f} kB, {results[False][1]} tweets")
+    print(f"  buffered + response.json() : {results[False][0] * 1e3:6.2f} ms")
+    print(f"  streamed + TweetStreamParser: {results[True][0] * 1e3:6.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megabytes", type=float, default=50, help="size of the synthetic recording")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        recording = os.path.join(tmp, "recording.json")
+        write_recording(recording, args.megabytes)
+        compare_files(SAMPLE_PATHS + [recording], args.repeat)
+    compare_fetch(args.repeat)
+
+
+if __name__ == "__main__":
+    main()
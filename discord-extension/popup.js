@@ -1,4 +1,33 @@
+// Same defaults as background.js; the endpoint refuses requests without the token.
+const DEFAULT_SETTINGS = {
+    signalEndpoint: "http://127.0.0.1:8765/signal",
+    signalToken: ""
+};
+
+const loadSettings = () => {
+    chrome.storage.local.get(DEFAULT_SETTINGS, settings => {
+        document.getElementById("signalEndpoint").value = settings.signalEndpoint;
+        document.getElementById("signalToken").value = settings.signalToken;
+        if (!settings.signalToken) {
+            document.getElementById("settingsStatus").textContent = "Set the token to forward messages.";
+        }
+    });
+};
+
+const saveSettings = () => {
+    const settings = {
+        signalEndpoint: document.getElementById("signalEndpoint").value.trim() || DEFAULT_SETTINGS.signalEndpoint,
+        signalToken: document.getElementById("signalToken").value.trim()
+    };
+    chrome.storage.local.set(settings, () => {
+        document.getElementById("settingsStatus").textContent = "Saved.";
+    });
+};
+
 document.addEventListener("DOMContentLoaded", () => {
+    loadSettings();
+    document.getElementById("saveSettings").addEventListener("click", saveSettings);
+
     chrome.storage.local.get("messages", data => {
         let messages = data.messages || [];
         console.log("📥 Messages retrieved in popup:", messages);
@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _isolated_state(monkeypatch, tmp_path):
+    # Keep every test's trades and dedup set out of the working directory.
+    monkeypatch.setenv("STATE_DB_PATH", str(tmp_path / "state.db"))
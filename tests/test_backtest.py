@@ -0,0 +1,218 @@
+import asyncio
+
+import numpy as np
+
+from test_telegram_bot import _make_bot
+
+
+def _random_paths(seed, count=40, ticks=80):
+    rng = np.random.default_rng(seed)
+    volatility = rng.choice([0.03, 0.25], size=(count, 1))
+    steps = rng.normal(0.01, 1.0, size=(count, ticks)) * volatility
+    prices = np.exp(np.cumsum(steps, axis=1)) * rng.uniform(0.001, 1.0, size=(count, 1))
+    prices[rng.random(size=prices.shape) < 0.05] = np.nan
+    times = 1_000.0 + np.arange(ticks) * 5.0
+    return prices, times
+
+
+def _baseline_evaluate_sell(rules, trade, current_price, now):
+    """Frozen copy of the original per-trade `TelegramBot.evaluate_sell`, returning
+    `(percentage, reason)` instead of selling. Do not refactor: it is the oracle."""
+    entry_price = trade["entry"]
+    high_price = trade["high"]
+    sold = trade["sold"]
+
+    if entry_price <= 0:
+        return None
+
+    multiplier = current_price / entry_price
+
+    for level_multiplier, target_sold in rules.take_profit_levels:
+        if multiplier >= level_multiplier and sold < target_sold:
+            sell_pct = round((target_sold - sold) * 100)
+            if sell_pct > 0:
+                return sell_pct, f"{level_multiplier}x take profit"
+            return None
+
+    if multiplier >= rules.trailing_start_multiplier:
+        if current_price <= high_price * rules.trailing_stop_factor and sold < 1.0:
+            remaining_pct = round((1.0 - sold) * 100)
+            if remaining_pct > 0:
+                return remaining_pct, "Trailing stop hit"
+            return None
+
+    if current_price <= entry_price * rules.hard_stop_factor and sold < 1.0:
+        remaining_pct = round((1.0 - sold) * 100)
+        if remaining_pct > 0:
+            return remaining_pct, "Hard stop loss"
+        return None
+
+    if now - trade["opened_at"] > rules.max_hold_seconds and multiplier < rules.time_exit_multiplier:
+        remaining_pct = round((1.0 - sold) * 100)
+        if remaining_pct > 0:
+            return remaining_pct, "Time-based exit"
+    return None
+
+
+def _run_baseline(rules, contracts, prices, times):
+    """Replay the original monitor loop trade by trade over the same ticks."""
+    trades = {contract: {"entry": 0.0, "high": 0.0, "sold": 0.0, "opened_at": times[0]} for contract in contracts}
+    fills = []
+    for tick in range(len(times)):
+        for row, contract in enumerate(contracts):
+            trade, price = trades[contract], prices[row, tick]
+            if trade["sold"] >= 1.0 or np.isnan(price) or price <= 0:
+                continue
+            if trade["entry"] == 0.0:
+                trade["entry"] = trade["high"] = price
+            trade["high"] = max(trade["high"], price)
+            order = _baseline_evaluate_sell(rules, trade, price, times[tick])
+            if order:
+                fills.append((contract, tick, order[0]))
+                trade["sold"] = min(trade["sold"] + order[0] / 100, 1.0)
+    return fills
+
+
+def _run_live(monkeypatch, bot, contracts, prices, times):
+    from BrothersTrusts.CoinSniper.Telegram import app as telegram_app
+
+    clock = {"tick": 0}
+    fills = []
+    monkeypatch.setattr(telegram_app.time, "time", lambda: times[clock["tick"]])
+
+    async def _send_message(handle, message):
+        if message.startswith("/sell"):
+            _, contract, pct = message.split()
+            fills.append((contract, clock["tick"], int(pct.rstrip("%"))))
+
+    bot.send_message = _send_message
+    for contract in contracts:
+        bot.trades[contract] = {"entry": 0.0, "high": 0.0, "sold": 0.0, "opened_at": times[0], "last_price": 0.0}
+
+    async def _run():
+        # One poll cycle per tick: every open position priced, as in the fixed-cadence loop.
+        for tick in range(len(times)):
+            clock["tick"] = tick
+            quotes = {
+                contract: 0.0 if np.isnan(prices[row, tick]) else float(prices[row, tick])
+                for row, contract in enumerate(contracts)
+                if bot.trades[contract]["sold"] < 1.0
+            }
+            await bot.apply_prices(quotes)
+
+    asyncio.run(_run())
+    return fills
+
+
+def test_backtester_matches_live_exit_logic_tick_for_tick(monkeypatch):
+    from BrothersTrusts.CoinSniper.Backtest.app import Backtester
+
+    bot = _make_bot(monkeypatch)
+    bot.max_hold_seconds = 200
+    prices, times = _random_paths(seed=7)
+    contracts = [f"contract{row}" for row in range(prices.shape[0])]
+
+    live_fills = _run_live(monkeypatch, bot, contracts, prices, times)
+    state = Backtester.from_bot(bot).simulate(prices, times, np.full(len(contracts), times[0]))
+
+    simulated = [
+        (contracts[row], int(tick), int(pct))
+        for row, tick, pct in zip(state["fill_rows"], state["fill_ticks"], state["fill_pct"])
+    ]
+    assert sorted(simulated, key=lambda fill: (fill[1], fill[0])) == sorted(live_fills, key=lambda fill: (fill[1], fill[0]))
+    assert set(state["fill_reason"].tolist()) == {0, 1, 2, 3}
+    for row, contract in enumerate(contracts):
+        assert state["sold"][row] == bot.trades[contract]["sold"]
+        assert state["high"][row] == bot.trades[contract]["high"]
+    # Both sides above share `evaluate_exits`; the frozen per-trade rules keep them honest.
+    assert sorted(_run_baseline(bot, contracts, prices, times), key=lambda fill: (fill[1], fill[0])) == sorted(
+        live_fills, key=lambda fill: (fill[1], fill[0])
+    )
+
+
+def test_evaluate_exits_matches_the_baseline_per_trade_rules():
+    from BrothersTrusts.CoinSniper.Backtest.app import Backtester
+    from BrothersTrusts.CoinSniper.Shared.strategy import evaluate_exits, sell_reason_label
+
+    rules = Backtester(
+        max_hold_seconds=100, trailing_start_multiplier=1.55, time_exit_multiplier=1.99, hard_stop_factor=0.7
+    )
+    rng = np.random.default_rng(11)
+    count = 5000
+    entry = rng.choice([0.0, 1.0], size=count, p=[0.05, 0.95])
+    price = rng.uniform(0.3, 12.0, size=count)
+    high = np.maximum(price, price * rng.uniform(1.0, 3.0, size=count))
+    sold = rng.choice([0.0, 0.3, 0.6, 0.9, 1.0], size=count)
+    held = rng.uniform(0, 200, size=count)
+    # Above the trailing start, trailing stop not hit, past max hold: the baseline time-exits.
+    entry[0], price[0], high[0], sold[0], held[0] = 1.0, 1.55, 1.6, 0.0, 150.0
+
+    pct, reason, level = evaluate_exits(rules, entry, high, sold, price, held)
+    for row in range(count):
+        trade = {"entry": entry[row], "high": high[row], "sold": sold[row], "opened_at": 0.0}
+        expected = _baseline_evaluate_sell(rules, trade, price[row], held[row])
+        actual = (int(pct[row]), sell_reason_label(rules, reason[row], level[row])) if reason[row] >= 0 else None
+        assert actual == expected, (row, trade, price[row], held[row])
+    assert (int(pct[0]), reason[0]) == (100, 3)
+
+
+def test_backtester_reports_pnl_and_reasons():
+    from BrothersTrusts.CoinSniper.Backtest.app import Backtester
+
+    backtester = Backtester(max_hold_seconds=1800)
+    times = np.array([0.0, 5.0, 10.0, 15.0])
+    prices = np.array([
+        [1.0, 2.0, 1.0, 0.5],
+        [1.0, 0.6, np.nan, np.nan],
+    ])
+    result = backtester.run(["runner", "rug"], times, prices, opened_at=np.array([0.0, 0.0]))
+
+    reasons = [(fill["contract"], fill["reason"], fill["percentage"]) for fill in result["fills"]]
+    assert reasons == [
+        ("runner", "2.0x take profit", 30),
+        ("rug", "Hard stop loss", 100),
+        ("runner", "Hard stop loss", 70),
+    ]
+    runner, rug = result["trades"]
+    assert runner["realized_pnl"] == 0.3 * 1.0 + 0.7 * -0.5
+    assert rug["realized_pnl"] == -0.4
+    assert result["summary"]["fully_exited"] == 2
+    assert result["summary"]["fills_by_reason"]["Hard stop loss"] == 2
+
+
+def test_load_signals_reads_recorded_tweets():
+    from BrothersTrusts.CoinSniper.Backtest.app import load_signals
+
+    signals = load_signals()
+    assert signals
+    for signal in signals.values():
+        assert signal["created_at"] is not None
+
+
+def test_pareto_front_keeps_non_dominated_results():
+    from BrothersTrusts.CoinSniper.Backtest.sweep import pareto_front
+
+    results = [
+        {"return": 0.1, "max_drawdown": 0.05},
+        {"return": 0.3, "max_drawdown": 0.20},
+        {"return": 0.2, "max_drawdown": 0.25},
+        {"return": 0.05, "max_drawdown": 0.01},
+    ]
+    front = pareto_front(results)
+    assert [(r["return"], r["max_drawdown"]) for r in front] == [(0.05, 0.01), (0.1, 0.05), (0.3, 0.20)]
+
+
+def test_run_sweep_matches_serial_evaluation():
+    from BrothersTrusts.CoinSniper.Backtest.app import Backtester, mask_before_open
+    from BrothersTrusts.CoinSniper.Backtest.sweep import grid_configs, run_sweep, score
+
+    prices, times = _random_paths(seed=3, count=20, ticks=40)
+    configs = grid_configs({"hard_stop_factor": [0.5, 0.7], "trailing_stop_factor": [0.6, 0.8], "max_hold_seconds": [100]})
+    results, front = run_sweep(times, prices, configs, workers=2)
+
+    assert [result["params"] for result in results] == configs
+    masked, opened_at = mask_before_open(times, prices)
+    for result, config in zip(results, configs):
+        state = Backtester(**config).simulate(masked, times, opened_at)
+        assert result["return"] == score(state, times)["return"]
+    assert front
@@ -0,0 +1,189 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from test_controller import DummyTelegramBot, DummyTwitterClient
+
+from BrothersTrusts.CoinSniper.Cluster.app import worker_cache_path
+from BrothersTrusts.CoinSniper.Cluster.ring import HashRing
+
+CONTRACT = "7GCihgDB8fe6KNjn2MYtkzZcRjQy3t9GHdC8uHYmW2hr"
+HANDLES = [f"handle{index}" for index in range(12)]
+
+
+class WorkerTwitterClient:
+    """Every handle has one tweet with the same contract in it."""
+
+    def __init__(self):
+        self.last_seen_tweet_ids = {}
+        self.fetched = []
+        self.request_gate = None
+        self.response_listener = None
+        self.http = self
+
+    async def fetch_new_tweets(self, user_handle):
+        self.fetched.append(user_handle)
+        if self.last_seen_tweet_ids.get(user_handle):
+            return "1", []
+        self.last_seen_tweet_ids[user_handle] = 100
+        return "1", [{"id_str": "100", "created_at": None, "full_text": f"aping {CONTRACT}"}]
+
+    async def aclose(self):
+        return None
+
+
+async def _until(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+def _cluster(monkeypatch):
+    from BrothersTrusts.CoinSniper.Cluster import app as cluster_app
+    from BrothersTrusts.CoinSniper.Controller import app as controller_app
+
+    monkeypatch.setenv("CLUSTER_PORT", "1")
+    monkeypatch.setenv("CLUSTER_TOKEN", "cluster-secret")
+    monkeypatch.setenv("CLUSTER_RECONNECT_SECONDS", "0.01")
+    dummy_bot = DummyTelegramBot()
+    monkeypatch.setattr(controller_app, "TelegramBot", lambda: dummy_bot)
+    monkeypatch.setattr(controller_app, "TwitterClient", lambda: DummyTwitterClient())
+    monkeypatch.setattr(cluster_app, "TwitterClient", WorkerTwitterClient)
+    controller = controller_app.Controller(list(HANDLES))
+    controller.cluster.port = 0
+    return cluster_app, controller, dummy_bot
+
+
+def test_ring_moves_only_the_new_workers_share():
+    ring = HashRing(["a", "b", "c"])
+    keys = [f"handle{index}" for index in range(3000)]
+    before = {key: ring.node_for(key) for key in keys}
+    assert all(200 < len(share) for share in ring.assign(keys).values())
+
+    ring.add("d")
+    moved = [key for key in keys if ring.node_for(key) != before[key]]
+    assert {ring.node_for(key) for key in moved} == {"d"}
+    assert 0.15 < len(moved) / len(keys) < 0.35
+
+    ring.remove("d")
+    assert {key: ring.node_for(key) for key in keys} == before
+
+
+def test_workers_split_handles_and_buy_once(monkeypatch):
+    cluster_app, controller, dummy_bot = _cluster(monkeypatch)
+    server = controller.cluster
+
+    async def _run():
+        await server.start()
+        bus_task = asyncio.create_task(controller.signal_bus.run())
+        workers = [cluster_app.IngestWorker(f"w{index}", port=server.port) for index in range(2)]
+        tasks = [asyncio.create_task(worker.run()) for worker in workers]
+        try:
+            await _until(lambda: len(server.last_seen) == len(HANDLES))
+            await controller.signal_bus.queue.join()
+        finally:
+            for task in tasks + [bus_task]:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await server.close()
+        return workers
+
+    workers = asyncio.run(_run())
+    shares = [set(worker.twitter_client.fetched) for worker in workers]
+    assert all(shares) and not shares[0] & shares[1]
+    assert shares[0] | shares[1] == set(HANDLES)
+    assert dummy_bot.buys == [CONTRACT]
+    assert controller.signal_bus.duplicates["twitter"] == len(HANDLES) - 1
+
+
+def test_joining_and_leaving_workers_rebalance(monkeypatch):
+    cluster_app, controller, _ = _cluster(monkeypatch)
+    server = controller.cluster
+
+    async def _run():
+        await server.start()
+        first = cluster_app.IngestWorker("w0", port=server.port)
+        second = cluster_app.IngestWorker("w1", port=server.port)
+        first_task = asyncio.create_task(first.run())
+        await _until(lambda: len(first.handles) == len(HANDLES))
+        await _until(lambda: len(server.last_seen) == len(HANDLES))
+
+        second_task = asyncio.create_task(second.run())
+        await _until(lambda: second.handles and len(first.handles) + len(second.handles) == len(HANDLES))
+        # The new owner starts from the tweets the old one had already seen.
+        assert all(second.twitter_client.last_seen_tweet_ids[handle] == 100 for handle in second.handles)
+        assert set(first.handles).isdisjoint(second.handles)
+
+        second_task.cancel()
+        await asyncio.gather(second_task, return_exceptions=True)
+        await _until(lambda: len(first.handles) == len(HANDLES))
+        first_task.cancel()
+        await asyncio.gather(first_task, return_exceptions=True)
+        await server.close()
+
+    asyncio.run(_run())
+
+
+def test_workers_split_the_request_budget_and_share_pauses(monkeypatch):
+    monkeypatch.setenv("TWEETSCOUT_RPM", "60")
+    monkeypatch.setenv("TWEETSCOUT_BURST", "5")
+    cluster_app, controller, _ = _cluster(monkeypatch)
+    server = controller.cluster
+
+    async def _run():
+        await server.start()
+        workers = [cluster_app.IngestWorker(f"w{index}", port=server.port) for index in range(2)]
+        tasks = [asyncio.create_task(workers[0].run())]
+        try:
+            await _until(lambda: workers[0].tweet_scheduler.requests_per_minute == 60)
+            tasks.append(asyncio.create_task(workers[1].run()))
+            schedulers = [worker.tweet_scheduler for worker in workers]
+            await _until(lambda: [scheduler.requests_per_minute for scheduler in schedulers] == [30, 30])
+            assert [scheduler.burst for scheduler in schedulers] == [2.5, 2.5]
+
+            schedulers[0].observe_response(httpx.Response(429, headers={"Retry-After": "7"}))
+            await _until(lambda: schedulers[1].blocked_until > time.monotonic() + 5)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await server.close()
+
+    asyncio.run(_run())
+
+
+def test_server_needs_a_token_and_rechecks_worker_contracts(monkeypatch):
+    cluster_app, controller, dummy_bot = _cluster(monkeypatch)
+    server = controller.cluster
+
+    async def _run():
+        server.token = None
+        with pytest.raises(ValueError):
+            await server.start()
+        server.token = "cluster-secret"
+        await server.start()
+        intruder = cluster_app.IngestWorker("intruder", port=server.port, token="guess")
+        intruder_task = asyncio.create_task(intruder.run())
+        await asyncio.sleep(0.1)
+        assert "intruder" not in server.workers and not intruder.handles
+        intruder_task.cancel()
+        await asyncio.gather(intruder_task, return_exceptions=True)
+
+        server.receive_signals("w0", {"signals": [
+            {"source": "twitter", "handle": "handle0", "contracts": ["1" * 40, {"x": 1}, CONTRACT]},
+        ]})
+        await controller.signal_bus.drain()
+        await server.close()
+
+    asyncio.run(_run())
+    assert dummy_bot.buys == [CONTRACT]
+
+
+def test_each_worker_persists_its_own_user_id_cache(monkeypatch):
+    monkeypatch.setenv("USER_ID_CACHE_PATH", "/data/user_id_cache.json")
+    assert worker_cache_path("worker-0") == "/data/user_id_cache.worker-0.json"
+    assert worker_cache_path("host:1/2") == "/data/user_id_cache.host_1_2.json"
+    assert worker_cache_path("worker-0", "") == ""
@@ -0,0 +1,29 @@
+from BrothersTrusts.CoinSniper.Shared import contracts
+
+POPCAT = "7GCihgDB8fe6KNjn2MYtkzZcRjQy3t9GHdC8uHYmW2hr"
+USDC = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
+
+
+def test_is_valid_address_requires_32_bytes():
+    assert contracts.is_valid_address(POPCAT)
+    assert contracts.is_valid_address("So11111111111111111111111111111111111111112")
+    assert not contracts.is_valid_address("7xKX9S8P9q9Jq9T8W2t7Z5mX3pQz1Yv4U9nH2aX")
+    assert not contracts.is_valid_address(POPCAT + "z")
+
+
+def test_extract_contracts_skips_urls_and_dedupes():
+    text = (
+        f"chart https://dexscreener.com/solana/{USDC} "
+        f"img pbs.twimg.com/media/{USDC} "
+        f"CA: {POPCAT} again {POPCAT}"
+    )
+    assert contracts.extract_contracts(text) == [POPCAT]
+
+
+def test_extract_contracts_from_tweets_reads_nested_text():
+    tweets = [
+        {"full_text": "gm", "quoted_status": {"full_text": f"ape {POPCAT}"}, "retweeted_status": None},
+        {"full_text": f"RT {USDC}", "retweeted_status": {"full_text": f"{USDC}"}},
+        "plain string with nothing",
+    ]
+    assert contracts.extract_contracts_from_tweets(tweets) == [POPCAT, USDC]
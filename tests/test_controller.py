@@ -5,7 +5,7 @@ class DummyTelegramBot:
     def __init__(self):
         self.buys = []
 
-    async def buy_token(self, contract):
+    async def buy_token(self, contract, signal=None):
         self.buys.append(contract)
 
     async def start(self):
@@ -26,11 +26,27 @@ class DummyTwitterClient:
     def get_latest_tweets(self, user_handle, user_id, count=5):
         return ["tweet one", "tweet two"]
 
+    async def fetch_new_tweets(self, user_handle):
+        user_id = self.get_user_id(user_handle)
+        return user_id, self.get_latest_tweets(user_handle, user_id) if user_id else []
+
     def extract_sol_contracts(self, tweets):
         return self.contracts
 
 
-def test_process_tweets_buys_and_dedupes(monkeypatch):
+async def _sweep(controller, sweeps=1):
+    """Poll every handle `sweeps` times with the bus consumer running, as `Controller.run` does."""
+    await controller.start_ingest()
+    try:
+        for _ in range(sweeps):
+            for user_handle in controller.twitter_users:
+                await controller.poll_handle(user_handle)
+            await controller.signal_bus.queue.join()
+    finally:
+        controller.stop_ingest()
+
+
+def test_poll_sweeps_buy_and_dedupe(monkeypatch):
     from BrothersTrusts.CoinSniper.Controller import app as controller_app
 
     dummy_bot = DummyTelegramBot()
@@ -40,13 +56,12 @@ def test_process_tweets_buys_and_dedupes(monkeypatch):
     monkeypatch.setattr(controller_app, "TwitterClient", lambda: dummy_client)
 
     controller = controller_app.Controller(["user1"])
-    asyncio.run(controller.process_tweets())
-    asyncio.run(controller.process_tweets())
+    asyncio.run(_sweep(controller, sweeps=2))
 
     assert dummy_bot.buys == ["abc", "def"]
 
 
-def test_process_tweets_skips_missing_user_id(monkeypatch):
+def test_poll_sweep_skips_missing_user_id(monkeypatch):
     from BrothersTrusts.CoinSniper.Controller import app as controller_app
 
     dummy_bot = DummyTelegramBot()
@@ -56,6 +71,46 @@ def test_process_tweets_skips_missing_user_id(monkeypatch):
     monkeypatch.setattr(controller_app, "TwitterClient", lambda: dummy_client)
 
     controller = controller_app.Controller(["user1"])
-    asyncio.run(controller.process_tweets())
+    asyncio.run(_sweep(controller))
 
     assert dummy_bot.buys == []
+
+
+def test_seen_contracts_survive_restart(monkeypatch):
+    from BrothersTrusts.CoinSniper.Controller import app as controller_app
+    from BrothersTrusts.CoinSniper.Shared.state import open_state_store
+
+    dummy_bot = DummyTelegramBot()
+    dummy_client = DummyTwitterClient(contracts=["abc"])
+
+    monkeypatch.setattr(controller_app, "TelegramBot", lambda: dummy_bot)
+    monkeypatch.setattr(controller_app, "TwitterClient", lambda: dummy_client)
+
+    asyncio.run(_sweep(controller_app.Controller(["user1"])))
+    open_state_store().close()
+
+    restarted = controller_app.Controller(["user1"])
+    asyncio.run(_sweep(restarted))
+
+    assert restarted.seen_contracts == {"abc"}
+    assert dummy_bot.buys == ["abc"]
+
+
+def test_poll_handle_buys_and_boosts_handle(monkeypatch):
+    from BrothersTrusts.CoinSniper.Controller import app as controller_app
+
+    dummy_bot = DummyTelegramBot()
+    dummy_client = DummyTwitterClient(contracts=["abc"])
+
+    monkeypatch.setattr(controller_app, "TelegramBot", lambda: dummy_bot)
+    monkeypatch.setattr(controller_app, "TwitterClient", lambda: dummy_client)
+
+    controller = controller_app.Controller(["user1", "user2"])
+    assert dummy_client.request_gate == controller.tweet_scheduler.acquire
+    asyncio.run(controller.poll_handle("user1"))
+    assert dummy_bot.buys == []
+    asyncio.run(controller.signal_bus.drain())
+
+    assert dummy_bot.buys == ["abc"]
+    assert "user1" in controller.tweet_scheduler.last_contract_at
+    assert "user2" not in controller.tweet_scheduler.last_contract_at
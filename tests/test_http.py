@@ -0,0 +1,109 @@
+import asyncio
+import time
+
+import httpx
+
+from BrothersTrusts.CoinSniper.Shared.http import HttpTransport
+
+
+def _transport(monkeypatch, handler=None, sync_handler=None, **env):
+    monkeypatch.setenv("HTTP_BACKOFF_BASE", "0.001")
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return HttpTransport(
+        transport=httpx.MockTransport(sync_handler) if sync_handler else None,
+        async_transport=httpx.MockTransport(handler) if handler else None,
+    )
+
+
+def test_request_retries_rate_limits_and_server_errors(monkeypatch):
+    statuses = [429, 503, 200]
+
+    async def handler(request):
+        return httpx.Response(statuses.pop(0), headers={"Retry-After": "0.01"})
+
+    transport = _transport(monkeypatch, handler=handler)
+    response = asyncio.run(transport.request("GET", "https://api.example/x"))
+
+    assert response.status_code == 200
+    assert statuses == []
+
+
+def test_request_gives_up_after_max_retries(monkeypatch):
+    attempts = []
+
+    def sync_handler(request):
+        attempts.append(request)
+        return httpx.Response(502)
+
+    transport = _transport(monkeypatch, sync_handler=sync_handler, HTTP_MAX_RETRIES="2")
+    response = transport.request_sync("POST", "https://api.example/x", json={})
+
+    assert response.status_code == 502
+    assert len(attempts) == 3
+
+
+def test_request_does_not_retry_client_errors(monkeypatch):
+    attempts = []
+
+    async def handler(request):
+        attempts.append(request)
+        return httpx.Response(404)
+
+    transport = _transport(monkeypatch, handler=handler)
+    assert asyncio.run(transport.request("GET", "https://api.example/x")).status_code == 404
+    assert len(attempts) == 1
+
+
+def test_per_host_connection_limit(monkeypatch):
+    in_flight = {"a.example": 0, "b.example": 0}
+    peak = {"a.example": 0, "b.example": 0}
+
+    async def handler(request):
+        host = request.url.host
+        in_flight[host] += 1
+        peak[host] = max(peak[host], in_flight[host])
+        await asyncio.sleep(0.01)
+        in_flight[host] -= 1
+        return httpx.Response(200)
+
+    transport = _transport(monkeypatch, handler=handler, HTTP_MAX_CONNECTIONS_PER_HOST="2")
+
+    async def _run():
+        await asyncio.gather(*(
+            transport.request("GET", f"https://{host}/{i}") for i in range(6) for host in in_flight
+        ))
+
+    asyncio.run(_run())
+    assert peak == {"a.example": 2, "b.example": 2}
+
+
+def test_backoff_honours_retry_after_and_caps(monkeypatch):
+    transport = _transport(monkeypatch, HTTP_BACKOFF_MAX="1")
+    assert transport.backoff(0, httpx.Response(429, headers={"Retry-After": "0.5"})) == 0.5
+    assert transport.backoff(0, httpx.Response(429, headers={"Retry-After": "30"})) == 1.0
+    assert all(0 <= transport.backoff(10) <= 1.0 for _ in range(20))
+
+
+def test_warm_touches_every_host(monkeypatch):
+    warmed = []
+
+    async def handler(request):
+        warmed.append(("async", request.method, request.url.host))
+        return httpx.Response(200)
+
+    def sync_handler(request):
+        warmed.append(("sync", request.method, request.url.host))
+        return httpx.Response(200)
+
+    transport = _transport(monkeypatch, handler=handler, sync_handler=sync_handler)
+    started = time.perf_counter()
+    asyncio.run(transport.warm(["https://a.example/", "https://b.example/"]))
+
+    assert time.perf_counter() - started < 1
+    assert sorted(warmed) == [
+        ("async", "HEAD", "a.example"),
+        ("async", "HEAD", "b.example"),
+        ("sync", "HEAD", "a.example"),
+        ("sync", "HEAD", "b.example"),
+    ]
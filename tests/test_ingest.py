@@ -0,0 +1,123 @@
+import asyncio
+import datetime
+import json
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from test_controller import DummyTelegramBot, DummyTwitterClient
+
+CONTRACT = "7GCihgDB8fe6KNjn2MYtkzZcRjQy3t9GHdC8uHYmW2hr"
+
+
+def _controller(monkeypatch, **env):
+    from BrothersTrusts.CoinSniper.Controller import app as controller_app
+
+    for key, value in env.items():
+        monkeypatch.setenv(key, value)
+    dummy_bot = DummyTelegramBot()
+    dummy_bot.watched = []
+    dummy_bot.watch_channels = lambda channels, publish: dummy_bot.watched.append((channels, publish))
+    monkeypatch.setattr(controller_app, "TelegramBot", lambda: dummy_bot)
+    monkeypatch.setattr(controller_app, "TwitterClient", lambda: DummyTwitterClient(contracts=[CONTRACT]))
+    return controller_app.Controller(["user1"]), dummy_bot
+
+
+def test_same_contract_from_several_sources_buys_once(monkeypatch):
+    controller, bot = _controller(monkeypatch)
+    bus = controller.signal_bus
+
+    bus.publish({"source": "discord", "handle": "caller", "text": f"gem {CONTRACT}"})
+    controller.handle_tweets("user1", "123", [{"full_text": "tweet"}])
+    bus.publish({"source": "telegram", "handle": "alpha", "text": f"{CONTRACT} send it"})
+    asyncio.run(bus.drain())
+
+    assert bot.buys == [CONTRACT]
+    assert bus.first_seen[CONTRACT][1] == "discord"
+    assert bus.duplicates == {"twitter": 1, "telegram": 1}
+    assert controller.metrics.histogram("cross_source_lag", source="telegram").count == 1
+    # The tweet still carried a contract, so its handle gets polled sooner.
+    assert "user1" in controller.tweet_scheduler.last_contract_at
+
+
+def test_telegram_channels_publish_onto_the_bus(monkeypatch):
+    controller, bot = _controller(monkeypatch, TELEGRAM_SIGNAL_CHANNELS="@alpha, @beta")
+    (channels, publish), = bot.watched
+    assert channels == ["@alpha", "@beta"]
+    assert publish == controller.signal_bus.publish
+
+
+def test_bot_watch_channels_turns_messages_into_signals(monkeypatch):
+    from test_telegram_bot import _make_bot
+
+    bot = _make_bot(monkeypatch)
+    published = []
+    bot.watch_channels(["@alpha"], published.append)
+    handler, _ = bot.client.handlers[-1]
+    message = SimpleNamespace(text=f"ape {CONTRACT}", date=datetime.datetime(2025, 2, 8, tzinfo=datetime.timezone.utc))
+    event = SimpleNamespace(chat=SimpleNamespace(username="alpha"), chat_id=-100, message=message)
+
+    asyncio.run(handler(event))
+
+    assert published == [{
+        "source": "telegram", "handle": "alpha", "created_at": message.date.timestamp(), "text": message.text,
+    }]
+
+
+def test_http_endpoint_queues_discord_messages(monkeypatch):
+    controller, bot = _controller(monkeypatch)
+    bus = controller.signal_bus
+    extension = {"Origin": "chrome-extension://abcdef", "X-Signal-Token": "secret"}
+    message = {"username": "caller", "message": f"new {CONTRACT}", "source": "discord"}
+
+    async def _run():
+        server = await bus.serve_http(port=0, token="secret")
+        port = server.sockets[0].getsockname()[1]
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+            statuses = [
+                (await client.post("/signal", json={"message": CONTRACT})).status_code,
+                (await client.post("/signal", json={}, headers=extension)).status_code,
+                (await client.post(
+                    "/signal", json=message, headers={**extension, "Origin": "https://evil.example"}
+                )).status_code,
+                (await client.post(
+                    "/signal", content=json.dumps(message), headers={**extension, "Content-Type": "text/plain"}
+                )).status_code,
+                (await client.options("/signal", headers=extension)).status_code,
+            ]
+            accepted = await client.post("/signal", json=message, headers=extension)
+        server.close()
+        await bus.drain()
+        return statuses, accepted
+
+    statuses, accepted = asyncio.run(_run())
+    assert statuses == [401, 400, 403, 415, 404]
+    assert accepted.status_code == 202
+    assert "access-control-allow-origin" not in accepted.headers
+    assert bot.buys == [CONTRACT]
+    assert bus.first_seen[CONTRACT][1] == "discord"
+
+
+def test_http_endpoint_needs_a_token_and_can_pin_the_origin(monkeypatch):
+    controller, bot = _controller(monkeypatch)
+    bus = controller.signal_bus
+
+    async def _run():
+        with pytest.raises(ValueError):
+            await bus.serve_http(port=0)
+        server = await bus.serve_http(port=0, token="secret", origin="chrome-extension://mine")
+        port = server.sockets[0].getsockname()[1]
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+            other = await client.post(
+                "/signal", json={"message": CONTRACT},
+                headers={"Origin": "chrome-extension://other", "X-Signal-Token": "secret"},
+            )
+            mine = await client.post(
+                "/signal", json={"message": CONTRACT},
+                headers={"Origin": "chrome-extension://mine", "X-Signal-Token": "secret"},
+            )
+        server.close()
+        return other.status_code, mine.status_code
+
+    assert asyncio.run(_run()) == (403, 202)
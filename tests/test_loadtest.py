@@ -0,0 +1,49 @@
+import asyncio
+import json
+
+from BrothersTrusts.CoinSniper.Loadtest.app import LoadTest, compare_results
+from BrothersTrusts.CoinSniper.Loadtest.fakes import FakeHelius, FakeTelegramClient, FakeUpstreams, FaultProfile
+
+
+def test_fake_helius_serves_scripted_prices_to_the_bot(monkeypatch):
+    from test_telegram_bot import _make_bot
+    from BrothersTrusts.CoinSniper.Shared.http import HttpTransport
+
+    helius = FakeHelius(price_paths={"abc": lambda elapsed: 2.5})
+    with FakeUpstreams(helius):
+        bot = _make_bot(monkeypatch)
+        bot.http = HttpTransport()
+        bot.helius_rpc_url = f"{helius.base_url}/"
+        prices = bot._fetch_prices_sync(["abc", "def"])
+        single = bot._fetch_price_sync("abc")
+
+    assert prices["abc"] == 2.5 and single == 2.5
+    assert prices["def"] > 0
+    assert helius.requests == 2
+
+
+def test_fake_telegram_client_injects_failures():
+    client = FakeTelegramClient(faults=FaultProfile(error_rate=1.0))
+
+    async def _send():
+        try:
+            await client.send_message("@bot", "/buy abc 0.1")
+        except ConnectionError:
+            return True
+        return False
+
+    assert asyncio.run(_send())
+    assert client.failures == 1 and client.sent == []
+
+
+def test_load_level_reports_every_stage():
+    result = LoadTest(seconds=1.0, signals_per_second=5, poll_seconds=0.2).run([(3, 20)])
+    level = result["levels"][0]
+
+    assert level["buys"] > 0
+    assert level["signal_to_buy"]["count"] == level["buys"]
+    assert level["price_poll_cycle"]["count"] > 0
+    assert level["loop_lag"]["count"] > 0
+    assert level["helius"]["requests"] > 0 and level["tweetscout"]["requests"] > 0
+    json.dumps(result)
+    assert len(compare_results(result, result)) == 3
@@ -0,0 +1,69 @@
+import asyncio
+import json
+import threading
+
+from BrothersTrusts.CoinSniper.Shared.metrics import LatencyHistogram, Metrics
+
+
+def test_histogram_percentiles_within_bucket_error():
+    histogram = LatencyHistogram()
+    for millis in range(1, 1001):
+        histogram.observe(millis / 1000)
+
+    assert histogram.count == 1000
+    assert abs(histogram.percentile(0.50) - 0.500) / 0.500 < 0.06
+    assert abs(histogram.percentile(0.99) - 0.990) / 0.990 < 0.06
+    assert histogram.percentile(1.0) == 1.0
+
+
+def test_metrics_keeps_overall_and_labelled_series(tmp_path):
+    registry = Metrics()
+    registry.observe("signal_to_buy", 1.0, handle="a")
+    registry.observe("signal_to_buy", 3.0, handle="b")
+
+    snapshot = registry.snapshot()["signal_to_buy"]
+    assert [series["labels"] for series in snapshot] == [{}, {"handle": "a"}, {"handle": "b"}]
+    assert snapshot[0]["count"] == 2
+
+    path = tmp_path / "metrics.json"
+    registry.dump(str(path))
+    assert json.loads(path.read_text())["metrics"]["signal_to_buy"][1]["count"] == 1
+
+
+def test_periodic_dump_reads_the_histograms_on_the_loop_thread(tmp_path):
+    registry = Metrics()
+    registry.observe("dedup", 0.001)
+    readers = []
+    snapshot = registry.snapshot
+    registry.snapshot = lambda: readers.append(threading.get_ident()) or snapshot()
+    path = tmp_path / "metrics.json"
+
+    async def _run():
+        task = asyncio.create_task(registry.dump_periodically(str(path), 0.01))
+        while not path.exists():
+            await asyncio.sleep(0.01)
+        task.cancel()
+
+    asyncio.run(_run())
+    assert readers and set(readers) == {threading.get_ident()}
+    assert json.loads(path.read_text())["metrics"]["dedup"][0]["count"] == 1
+
+
+def test_metrics_served_over_http():
+    registry = Metrics()
+    registry.observe("price_poll_cycle", 0.2)
+
+    async def _run():
+        server = await registry.serve(port=0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET / HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        response = await reader.read()
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return response
+
+    response = asyncio.run(_run())
+    body = response.split(b"\r\n\r\n", 1)[1]
+    assert json.loads(body)["price_poll_cycle"][0]["count"] == 1
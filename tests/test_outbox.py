@@ -0,0 +1,227 @@
+import asyncio
+import time
+
+from telethon.errors import FloodWaitError
+
+from test_telegram_bot import _make_bot
+
+
+def _recording_bot(monkeypatch, fail=None):
+    bot = _make_bot(monkeypatch)
+    sent = []
+
+    async def _send_message(chat, message):
+        if fail and fail(chat, message):
+            raise FloodWaitError(request=None, capture=1)
+        sent.append((chat, message))
+
+    bot.send_message = _send_message
+    return bot, sent
+
+
+def _trade():
+    return {"entry": 1.0, "high": 1.0, "sold": 0.0, "opened_at": time.time(), "last_price": 1.0}
+
+
+def test_stops_jump_ahead_of_take_profits_and_buys(monkeypatch):
+    bot, sent = _recording_bot(monkeypatch)
+    for contract in ("tp", "timed", "stop"):
+        bot.trades[contract] = _trade()
+
+    async def _run():
+        await asyncio.gather(
+            bot.buy_token("new"),
+            bot.sell_token("tp", 30, "2.0x take profit"),
+            bot.sell_token("timed", 100, "Time-based exit"),
+            bot.sell_token("stop", 100, "Hard stop loss"),
+        )
+
+    asyncio.run(_run())
+
+    assert [message.split()[:2] for _, message in sent] == [
+        ["/sell", "stop"], ["/sell", "timed"], ["/sell", "tp"], ["/buy", "new"],
+    ]
+    assert bot.metrics.histogram("telegram_queue_wait", command="sell", priority=0).count >= 1
+
+
+def test_redundant_sells_for_one_contract_are_merged(monkeypatch):
+    bot, sent = _recording_bot(monkeypatch)
+    bot.trades["abc"] = _trade()
+
+    async def _run():
+        await asyncio.gather(
+            bot.sell_token("abc", 30, "2.0x take profit"),
+            bot.sell_token("abc", 30, "2.0x take profit"),
+            bot.sell_token("abc", 100, "Trailing stop hit"),
+        )
+
+    asyncio.run(_run())
+
+    assert [message for _, message in sent] == ["/sell abc 100%"]
+    assert bot.trades["abc"]["sold"] == 1.0
+    assert bot.commands.merged == 2
+
+
+def test_flood_wait_parks_only_that_chat(monkeypatch):
+    flooded = []
+
+    def _fail(chat, message):
+        if chat == "@flooded" and not flooded:
+            flooded.append(message)
+            return True
+        return False
+
+    bot, sent = _recording_bot(monkeypatch, fail=_fail)
+
+    async def _run():
+        first = bot.commands.buy("@flooded", "/buy a 1")
+        await asyncio.sleep(0.05)
+        await bot.commands.buy("@other", "/buy b 1")
+        assert sent == [("@other", "/buy b 1")]
+        await first
+
+    started = time.monotonic()
+    asyncio.run(_run())
+
+    assert sent == [("@other", "/buy b 1"), ("@flooded", "/buy a 1")]
+    assert time.monotonic() - started >= 1.0
+    assert bot.commands.flood_waits == 1
+
+
+def test_sell_in_flight_absorbs_sells_computed_before_it_landed(monkeypatch):
+    bot = _make_bot(monkeypatch)
+    bot.trades["abc"] = _trade()
+    sent = []
+
+    async def _run():
+        release = asyncio.Event()
+
+        async def _send_message(chat, message):
+            sent.append(message)
+            await release.wait()
+
+        bot.send_message = _send_message
+        first = asyncio.create_task(bot.apply_prices({"abc": 2.1}))
+        while not sent:
+            await asyncio.sleep(0)
+        # The 2.2x tick is evaluated while `/sell 30%` is still being sent.
+        second = asyncio.create_task(bot.apply_prices({"abc": 2.2}))
+        await asyncio.sleep(0.01)
+        release.set()
+        await asyncio.gather(first, second)
+        await bot.apply_prices({"abc": 2.3})
+
+    asyncio.run(_run())
+
+    assert sent == ["/sell abc 30%"]
+    assert bot.trades["abc"]["sold"] == 0.3
+    assert bot.commands.merged == 1
+
+
+def test_a_failed_sell_is_logged_and_retried_on_the_next_quote(monkeypatch, capsys):
+    bot = _make_bot(monkeypatch)
+    bot.trades["abc"] = _trade()
+    bot.trades["xyz"] = _trade()
+    attempts = []
+
+    async def _send_message(chat, message):
+        attempts.append(message)
+        if "abc" in message:
+            raise ConnectionError("telegram went away")
+
+    bot.send_message = _send_message
+
+    async def _run():
+        # Both hit the hard stop; the failing send must not take the other sell down.
+        await bot.apply_prices({"abc": 0.5, "xyz": 0.5})
+        await bot.apply_prices({"abc": 0.5})
+
+    asyncio.run(_run())
+
+    assert attempts.count("/sell abc 100%") == 2
+    assert bot.trades["xyz"]["sold"] == 1.0 and bot.trades["abc"]["sold"] == 0.0
+    assert "Failed to sell 100% of abc" in capsys.readouterr().out
+
+
+def test_stop_during_an_in_flight_take_profit_sells_the_rest(monkeypatch):
+    bot = _make_bot(monkeypatch)
+    bot.trades["abc"] = _trade()
+    sent = []
+
+    async def _run():
+        release = asyncio.Event()
+
+        async def _send_message(chat, message):
+            sent.append(message)
+            await release.wait()
+
+        bot.send_message = _send_message
+        take_profit = asyncio.create_task(bot.sell_token("abc", 30, "2.0x take profit"))
+        while not sent:
+            await asyncio.sleep(0)
+        # Computed against sold == 0 while the 30% is still going out.
+        stop = asyncio.create_task(bot.sell_token("abc", 100, "Hard stop loss"))
+        await asyncio.sleep(0.01)
+        assert not stop.done()
+        release.set()
+        await asyncio.gather(take_profit, stop)
+
+    asyncio.run(_run())
+    assert sent == ["/sell abc 30%", "/sell abc 70%"]
+    assert bot.trades["abc"]["sold"] == 1.0
+
+
+def test_follow_up_carries_an_in_flight_sell_that_failed(monkeypatch):
+    bot = _make_bot(monkeypatch)
+    bot.trades["abc"] = _trade()
+    sent = []
+
+    async def _run():
+        release = asyncio.Event()
+
+        async def _send_message(chat, message):
+            sent.append(message)
+            if len(sent) == 1:
+                await release.wait()
+                raise ConnectionError("dropped")
+
+        bot.send_message = _send_message
+        first = bot.commands.sell(bot.gmgn_bot, "abc", 30, "2.0x take profit")
+        while not sent:
+            await asyncio.sleep(0)
+        second = bot.commands.sell(bot.gmgn_bot, "abc", 50, "3.0x take profit")
+        release.set()
+        results = await asyncio.gather(first, second, return_exceptions=True)
+        assert isinstance(results[0], ConnectionError) and not isinstance(results[1], Exception)
+
+        # Shutting down settles a sell that is still being sent.
+        stuck = bot.commands.sell(bot.gmgn_bot, "xyz", 100, "Hard stop loss")
+        bot.send_message = lambda chat, message: asyncio.sleep(3600)
+        await asyncio.sleep(0.01)
+        bot.commands.close()
+        assert stuck.cancelled()
+
+    asyncio.run(_run())
+    assert sent == ["/sell abc 30%", "/sell abc 50%"]
+
+
+def test_price_ticks_persist_only_new_highs(monkeypatch):
+    bot = _make_bot(monkeypatch)
+    bot.trades["abc"] = _trade()
+    saved = []
+
+    class _Store:
+        def save_trade(self, contract, trade):
+            saved.append((contract, trade["high"]))
+
+    bot.state_store = _Store()
+
+    async def _run():
+        # Below every exit rule: only the high moves, and only on the first tick.
+        await bot.apply_prices({"abc": 1.2})
+        await bot.apply_prices({"abc": 1.1})
+        await bot.apply_prices({"abc": 1.15})
+
+    asyncio.run(_run())
+    assert saved == [("abc", 1.2)]
+    assert bot.trades["abc"]["last_price"] == 1.15
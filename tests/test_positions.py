@@ -0,0 +1,93 @@
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from BrothersTrusts.CoinSniper.Shared.strategy import exit_params_from_env
+from BrothersTrusts.CoinSniper.Telegram.positions import PositionBook
+
+
+def _trade(**fields):
+    trade = {"entry": 1.0, "high": 1.0, "sold": 0.0, "opened_at": 1000.0, "last_price": 1.0, "entry_source": "gmgn"}
+    trade.update(fields)
+    return trade
+
+
+def test_book_behaves_like_the_trade_dict():
+    book = PositionBook(capacity=2)
+    for index in range(5):
+        book[f"c{index}"] = _trade(entry=float(index))
+
+    assert book.capacity == 8
+    assert list(book) == ["c0", "c1", "c2", "c3", "c4"]
+    assert dict(book["c3"]) == _trade(entry=3.0)
+    book["c3"]["sold"] += 0.3
+    assert book["c3"]["sold"] == 0.3
+    assert book.get("missing") is None
+
+    del book["c1"]
+    assert "c1" not in book
+    assert list(book) == ["c0", "c4", "c2", "c3"]
+    assert book["c4"]["entry"] == 4.0
+    assert book["c3"]["sold"] == 0.3
+    assert book.open_contracts() == ["c0", "c4", "c2", "c3"]
+
+
+def test_exit_orders_match_the_per_trade_rules():
+    rules = SimpleNamespace(**exit_params_from_env())
+    rules.max_hold_seconds = 100
+    book = PositionBook()
+    book["take_profit"] = _trade()
+    book["second_level"] = _trade(sold=0.3)
+    book["trailing"] = _trade(high=4.0, sold=0.6)
+    book["hard_stop"] = _trade()
+    book["timed_out"] = _trade(opened_at=0.0)
+    book["holding"] = _trade()
+    book["closed"] = _trade(sold=1.0)
+    book["no_entry"] = _trade(entry=0.0)
+    prices = {
+        "take_profit": 2.0, "second_level": 5.5, "trailing": 2.8,
+        "hard_stop": 0.6, "timed_out": 1.1, "holding": 1.1, "closed": 0.1, "no_entry": 0.1,
+    }
+
+    slots, contracts, quotes = book.quoted(prices)
+    book.mark(slots, quotes)
+    orders = book.exit_orders(rules, slots, quotes, now=1050.0)
+
+    assert "closed" not in contracts
+    assert sorted(orders) == sorted([
+        ("take_profit", 30, "2.0x take profit"),
+        ("second_level", 30, "5.0x take profit"),
+        ("trailing", 40, "Trailing stop hit"),
+        ("hard_stop", 100, "Hard stop loss"),
+        ("timed_out", 100, "Time-based exit"),
+    ])
+
+
+def test_only_a_fired_trailing_stop_preempts_the_later_rules():
+    rules = SimpleNamespace(**exit_params_from_env())
+    rules.trailing_start_multiplier = 1.05
+    rules.max_hold_seconds = 100
+    book = PositionBook()
+    book["above_start"] = _trade(opened_at=0.0, sold=0.9)
+    book["below_start"] = _trade(opened_at=0.0, sold=0.9)
+    book["trailing_hit"] = _trade(opened_at=0.0, sold=0.9, high=2.0)
+
+    slots, _, quotes = book.quoted({"above_start": 1.1, "below_start": 1.01, "trailing_hit": 1.1})
+    book.mark(slots, quotes)
+
+    assert sorted(book.exit_orders(rules, slots, quotes, now=1050.0)) == [
+        ("above_start", 10, "Time-based exit"),
+        ("below_start", 10, "Time-based exit"),
+        ("trailing_hit", 10, "Trailing stop hit"),
+    ]
+
+
+def test_bot_trades_live_in_the_position_book(monkeypatch):
+    from test_telegram_bot import _make_bot
+
+    bot = _make_bot(monkeypatch)
+    bot.trades["contract"] = _trade(opened_at=time.time())
+
+    assert isinstance(bot.trades, PositionBook)
+    assert np.array_equal(bot.trades.entry[:1], [1.0])
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import time
+
+from test_telegram_bot import _make_bot
+
+
+def test_concurrent_queries_share_one_lookup(monkeypatch):
+    bot = _make_bot(monkeypatch)
+    calls = []
+    release = threading.Event()
+
+    def _fetch(contract):
+        calls.append(contract)
+        release.wait(1)
+        return 1.5
+
+    monkeypatch.setattr(bot, "_fetch_price_sync", _fetch)
+
+    async def _run():
+        queries = [asyncio.create_task(bot.query_price("abc")) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        release.set()
+        prices = await asyncio.gather(*queries)
+        # Within the TTL the next read is served from memory.
+        prices.append(await bot.query_price("abc"))
+        return prices
+
+    assert asyncio.run(_run()) == [1.5] * 6
+    assert calls == ["abc"]
+    stats = bot.price_cache.stats()
+    assert (stats["misses"], stats["coalesced"], stats["hits"]) == (1, 4, 1)
+    assert stats["inflight"] == 0
+
+
+def test_failed_lookup_reaches_every_waiter_and_is_not_cached(monkeypatch):
+    bot = _make_bot(monkeypatch)
+    calls = []
+
+    def _fetch(contract):
+        calls.append(contract)
+        time.sleep(0.02)
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(bot, "_fetch_price_sync", _fetch)
+
+    async def _run():
+        first = await asyncio.gather(bot.query_price("abc"), bot.query_price("abc"))
+        return first, await bot.query_price("abc")
+
+    assert asyncio.run(_run()) == ([0.0, 0.0], 0.0)
+    assert calls == ["abc", "abc"]
+
+
+def test_ttl_and_lru_bounds(monkeypatch):
+    from BrothersTrusts.CoinSniper.Telegram.cache import PriceCache
+
+    cache = PriceCache(ttl_seconds=1.0, max_entries=2)
+    cache.put("a", 1.0, now=0)
+    cache.put("b", 2.0, now=0)
+    assert cache.get("a", now=0.5) == 1.0  # touch "a" so "b" is least recently used
+    cache.put("c", 3.0, now=0.5)
+
+    assert cache.get("b", now=0.5) is None
+    assert cache.get("a", now=0.9) == 1.0
+    assert cache.get("a", now=1.0) is None
+    assert cache.get("c", now=1.2) == 3.0
+    assert cache.evictions == 1
+
+    cache.put("zero", 0.0, now=0)
+    assert cache.get("zero", now=0) is None
+
+
+def test_batched_prices_warm_the_cache(monkeypatch):
+    bot = _make_bot(monkeypatch)
+    monkeypatch.setattr(bot, "_fetch_prices_sync", lambda contracts: {c: 2.0 for c in contracts})
+    monkeypatch.setattr(bot, "_fetch_price_sync", lambda contract: 9.0)
+
+    async def _run():
+        await bot.query_prices(["abc"])
+        return await bot.query_price("abc")
+
+    assert asyncio.run(_run()) == 2.0
+    assert bot.price_cache.hits == 1
@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+from test_telegram_bot import _make_bot
+
+
+def _trade(entry=1.0, high=1.0, sold=0.0, opened_at=None):
+    return {
+        "entry": entry,
+        "high": high,
+        "sold": sold,
+        "opened_at": time.time() if opened_at is None else opened_at,
+        "last_price": entry,
+    }
+
+
+def test_near_trigger_positions_are_checked_sooner(monkeypatch):
+    bot = _make_bot(monkeypatch)
+    scheduler = bot.price_scheduler
+
+    near_stop = scheduler.reschedule("near", _trade(), 0.71, now=0.0)
+    flat = scheduler.reschedule("flat", _trade(), 1.0, now=0.0)
+    near_take_profit = scheduler.reschedule("tp", _trade(), 1.98, now=0.0)
+
+    assert near_stop < 1.0
+    assert near_take_profit < 1.0
+    assert flat > 5 * near_stop
+    assert sorted(scheduler.pop_due(now=1.0, limit=10)) == ["near", "tp"]
+
+
+def test_volatile_positions_back_off_less(monkeypatch):
+    bot = _make_bot(monkeypatch)
+    scheduler = bot.price_scheduler
+
+    calm = [scheduler.reschedule("calm", _trade(), price, now=t) for t, price in enumerate([1.0, 1.001, 1.0, 1.001])]
+    wild = [scheduler.reschedule("wild", _trade(), price, now=t) for t, price in enumerate([1.0, 1.3, 0.95, 1.25])]
+
+    assert calm[-1] == scheduler.max_interval
+    assert wild[-1] < calm[-1]
+
+
+def test_time_exit_deadline_caps_interval(monkeypatch):
+    bot = _make_bot(monkeypatch)
+    bot.max_hold_seconds = 10
+    scheduler = bot.price_scheduler
+    trade = _trade(opened_at=time.time() - 8)
+
+    interval = scheduler.reschedule("aging", trade, 1.0, now=0.0)
+    assert interval <= 2 + scheduler.min_interval
+
+
+def test_throttle_caps_request_rate(monkeypatch):
+    bot = _make_bot(monkeypatch)
+    scheduler = bot.price_scheduler
+    scheduler.max_requests_per_second = 50
+
+    async def _run():
+        started = time.monotonic()
+        for _ in range(6):
+            await scheduler.throttle()
+        return time.monotonic() - started
+
+    assert asyncio.run(_run()) >= 5 / 50 - 0.01
+
+
+def test_monitor_prices_batches_only_due_positions(monkeypatch):
+    bot = _make_bot(monkeypatch)
+    requested = []
+
+    async def _query_prices(contracts):
+        requested.append(sorted(contracts))
+        return {contract: 1.0 for contract in contracts}
+
+    bot.query_prices = _query_prices
+    bot.trades["a"] = _trade()
+    bot.trades["b"] = _trade()
+    bot.price_scheduler.schedule("b", time.monotonic() + 60)
+
+    async def _run():
+        task = asyncio.create_task(bot.monitor_prices())
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+    asyncio.run(_run())
+    assert requested == [["a"]]
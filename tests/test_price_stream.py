@@ -0,0 +1,156 @@
+import asyncio
+import time
+
+import pytest
+
+from test_telegram_bot import _make_bot
+
+pytest.importorskip("aiohttp")
+
+from BrothersTrusts.CoinSniper.Loadtest.fakes import FakePriceStream  # noqa: E402
+
+CONTRACT = "7xKX9S8P9q9Jq9T8W2t7Z5mX3pQz1Yv4U9nH2aX"
+
+
+async def _until(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+def _open(bot, entry=1.0):
+    bot.trades[CONTRACT] = {"entry": entry, "high": entry, "sold": 0.0, "opened_at": time.time(), "last_price": entry}
+
+
+def test_decode_merges_partial_reserve_updates(monkeypatch):
+    stream = _make_bot(monkeypatch).price_stream
+
+    assert stream.decode(CONTRACT, {"base_reserve": 1000, "quote_reserve": 2000}) == 2.0
+    assert stream.decode(CONTRACT, {"quote_reserve": 500}) == 0.5
+    assert stream.decode(CONTRACT, {"data": {"parsed": {"token_info": {"price_info": {"price_per_token": 3}}}}}) == 3.0
+    assert stream.decode("other", {"lamports": 1}) is None
+
+
+def test_mint_account_notifications_leave_the_contract_on_polling(monkeypatch, capsys):
+    stream = _make_bot(monkeypatch).price_stream
+    stream.connected = True
+    stream._subscriptions[1] = CONTRACT
+    mint = {"data": {"parsed": {"info": {"supply": "999", "decimals": 6}, "type": "mint"}}, "lamports": 1}
+
+    async def _run():
+        for _ in range(3):
+            await stream.handle_message({"params": {"subscription": 1, "result": {"value": mint}}})
+
+    asyncio.run(_run())
+    assert not stream.is_fresh(CONTRACT) and not stream._applying
+    assert capsys.readouterr().out.count("stays on HTTP polling") == 1
+
+
+def test_messages_of_the_wrong_shape_are_ignored(monkeypatch):
+    stream = _make_bot(monkeypatch).price_stream
+    stream._subscriptions[1] = CONTRACT
+
+    async def _run():
+        for message in ([1, 2], 5, "hi", None, {"id": [1]}, {"params": [1]}, {"params": {"subscription": [1]}},
+                        {"params": {"subscription": 1, "result": [3]}}):
+            await stream.handle_message(message)
+
+    asyncio.run(_run())
+    assert not stream._applying and CONTRACT not in stream.last_tick
+
+
+def test_stream_tick_triggers_hard_stop(monkeypatch):
+    bot = _make_bot(monkeypatch)
+    sells = []
+
+    async def _send_message(handle, message):
+        sells.append(message)
+
+    bot.send_message = _send_message
+    _open(bot)
+    crash_at = time.monotonic() + 0.2
+    fake = FakePriceStream(lambda contract: 1.0 if time.monotonic() < crash_at else 0.5, interval=0.01)
+
+    async def _run():
+        bot.price_stream.url = await fake.start()
+        task = asyncio.create_task(bot.price_stream.run())
+        try:
+            await _until(lambda: bot.trades[CONTRACT]["sold"] == 1.0)
+        finally:
+            task.cancel()
+            await fake.close()
+
+    asyncio.run(_run())
+    assert sells == [f"/sell {CONTRACT} 100%"]
+    assert fake.subscribes == 1
+
+
+def test_ticks_for_one_contract_are_applied_in_turn_from_the_newest(monkeypatch):
+    bot = _make_bot(monkeypatch)
+    stream = bot.price_stream
+    stream._subscriptions[1] = CONTRACT
+    applied = []
+
+    async def _run():
+        release = asyncio.Event()
+
+        async def _apply_prices(prices, quoted_at=None):
+            applied.append(prices[CONTRACT])
+            await release.wait()
+
+        bot.apply_prices = _apply_prices
+        for price in (2.1, 2.2, 2.3):
+            await stream.handle_message({"params": {"subscription": 1, "result": {"value": {"price": price}}}})
+            await asyncio.sleep(0)
+        assert applied == [2.1]
+        release.set()
+        await _until(lambda: not stream._applying)
+
+    asyncio.run(_run())
+    assert applied == [2.1, 2.3]
+
+
+def test_stream_reconnects_and_resubscribes(monkeypatch):
+    monkeypatch.setenv("PRICE_STREAM_RECONNECT_BASE", "0.01")
+    bot = _make_bot(monkeypatch)
+    _open(bot)
+    fake = FakePriceStream(lambda contract: 1.0, interval=0.01)
+
+    async def _run():
+        bot.price_stream.url = await fake.start()
+        task = asyncio.create_task(bot.price_stream.run())
+        try:
+            await _until(lambda: bot.price_stream.is_fresh(CONTRACT))
+            await fake.drop()
+            await _until(lambda: fake.subscribes == 2 and bot.price_stream.is_fresh(CONTRACT))
+        finally:
+            task.cancel()
+            await fake.close()
+
+    asyncio.run(_run())
+    assert fake.connections == 2
+    assert bot.price_stream.reconnects == 1
+
+
+def test_monitor_skips_contracts_with_fresh_ticks(monkeypatch):
+    bot = _make_bot(monkeypatch)
+    requested = []
+
+    async def _query_prices(contracts):
+        requested.append(sorted(contracts))
+        return {}
+
+    bot.query_prices = _query_prices
+    _open(bot)
+    bot.trades["polled"] = {"entry": 1.0, "high": 1.0, "sold": 0.0, "opened_at": time.time(), "last_price": 1.0}
+    bot.price_stream.connected = True
+    bot.price_stream.last_tick[CONTRACT] = time.monotonic()
+
+    async def _run():
+        task = asyncio.create_task(bot.monitor_prices())
+        await asyncio.sleep(0.01)
+        task.cancel()
+
+    asyncio.run(_run())
+    assert requested == [["polled"]]
@@ -0,0 +1,98 @@
+import asyncio
+import asyncio.events
+import json
+import threading
+import time
+
+from BrothersTrusts.CoinSniper.Shared.metrics import Metrics
+from BrothersTrusts.CoinSniper.Shared.profiler import LoopProfiler
+
+
+def _profiler(monkeypatch):
+    monkeypatch.setenv("LOOP_BLOCK_THRESHOLD", "0.03")
+    monkeypatch.setenv("LOOP_SAMPLE_INTERVAL", "0.005")
+    monkeypatch.setenv("LOOP_LAG_INTERVAL", "0.005")
+    return LoopProfiler(Metrics())
+
+
+def _blocking_sleep():
+    time.sleep(0.08)
+
+
+async def _blocker():
+    await asyncio.sleep(0.02)
+    _blocking_sleep()
+
+
+async def _light():
+    for _ in range(5):
+        await asyncio.sleep(0.005)
+
+
+def test_blocking_step_is_flagged_with_its_stack(monkeypatch):
+    profiler = _profiler(monkeypatch)
+    original_run = asyncio.events.Handle._run
+
+    async def _run():
+        profiler.start()
+        try:
+            await asyncio.gather(asyncio.create_task(_blocker(), name="ingest.blocker"), _light())
+            await asyncio.sleep(0.02)
+        finally:
+            profiler.stop()
+
+    asyncio.run(_run())
+    assert asyncio.events.Handle._run is original_run
+
+    blocked = [event for event in profiler.blocked if event["task"] == "ingest.blocker"]
+    assert len(blocked) == 1 and blocked[0]["ms"] >= 80
+    assert blocked[0]["stack"][-1].startswith("_blocking_sleep (test_profiler.py:")
+    assert profiler.metrics.histogram("loop_blocked", task="ingest.blocker").count == 1
+    assert profiler.metrics.histogram("loop_lag").max >= 0.05
+
+
+def test_time_is_attributed_per_task_and_exported_folded(monkeypatch, tmp_path):
+    profiler = _profiler(monkeypatch)
+
+    async def _run():
+        profiler.start()
+        try:
+            await asyncio.gather(asyncio.create_task(_blocker(), name="ingest.blocker"), _light())
+        finally:
+            profiler.stop()
+
+    asyncio.run(_run())
+    report = profiler.report()
+    assert report["tasks"]["ingest.blocker"]["busy_ms"] >= 80
+    assert report["tasks"]["_light"]["steps"] >= 5
+    assert report["tasks"]["ingest.blocker"]["busy_ms"] > report["tasks"]["_light"]["busy_ms"]
+
+    path = tmp_path / "loop.folded"
+    profiler.dump(str(path))
+    lines = path.read_text().splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any(line.startswith("ingest.blocker;") and "_blocking_sleep" in line for line in lines)
+    assert (tmp_path / "loop.folded.json").exists()
+
+
+def test_periodic_dump_reads_state_on_the_loop_thread(monkeypatch, tmp_path):
+    profiler = _profiler(monkeypatch)
+    readers = []
+    report = profiler.report
+    profiler.report = lambda: readers.append(threading.get_ident()) or report()
+    path = tmp_path / "loop.folded"
+
+    async def _run():
+        profiler.start()
+        try:
+            task = asyncio.create_task(profiler.dump_periodically(str(path), 0.01))
+            await _light()
+            while not path.with_name("loop.folded.json").exists():
+                await asyncio.sleep(0.01)
+            task.cancel()
+        finally:
+            profiler.stop()
+
+    asyncio.run(_run())
+    assert readers and set(readers) == {threading.get_ident()}
+    assert json.loads(path.with_name("loop.folded.json").read_text())["lag"]["count"] > 0
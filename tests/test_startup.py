@@ -0,0 +1,123 @@
+import asyncio
+import subprocess
+import sys
+import time
+
+import httpx
+
+from test_telegram_bot import _make_bot
+from test_twitter_client import _make_client
+
+from BrothersTrusts.CoinSniper.Shared.standby import LeaderLock
+
+CONTRACT = "7GCihgDB8fe6KNjn2MYtkzZcRjQy3t9GHdC8uHYmW2hr"
+OTHER_CONTRACT = "7xKX9S8P9q9Jq9T8W2t7Z5mX3pQz1Yv4U9nH2aX"
+
+
+async def _until(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+def _controller(monkeypatch, connect_seconds=0.0):
+    from BrothersTrusts.CoinSniper.Controller import app as controller_app
+
+    lookups = []
+
+    async def handler(request):
+        if "handle-to-id" in request.url.path:
+            lookups.append(request.url.path)
+            return httpx.Response(200, json={"id": "42"})
+        return httpx.Response(200, json={"tweets": []})
+
+    bot = _make_bot(monkeypatch)
+
+    async def _start():
+        await asyncio.sleep(connect_seconds)
+        bot.client.connected = True
+
+    bot.client.start = _start
+    twitter_client = _make_client(monkeypatch, handler)
+    monkeypatch.setattr(controller_app, "TwitterClient", lambda: twitter_client)
+    controller = controller_app.Controller(["user1"], telegram_bot=bot)
+    controller.http = twitter_client.http
+    return controller, lookups
+
+
+def test_controller_import_defers_telethon():
+    code = "import sys, BrothersTrusts.CoinSniper.Controller.app; print('telethon' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "False"
+
+
+def test_first_poll_does_not_wait_for_telegram(monkeypatch):
+    controller, lookups = _controller(monkeypatch, connect_seconds=5.0)
+
+    async def _run():
+        task = asyncio.create_task(controller.run())
+        await _until(lambda: controller._first_poll_at is not None)
+        connected = controller.telegram_bot.client.is_connected()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return connected
+
+    assert asyncio.run(_run()) is False
+    # The warm-up and the first poll resolved the handle together.
+    assert len(lookups) == 1
+
+
+def test_standby_takes_over_with_the_primarys_state(monkeypatch, tmp_path):
+    lock_path = str(tmp_path / "primary.lock")
+    monkeypatch.setenv("STANDBY_LOCK_PATH", lock_path)
+    monkeypatch.setenv("STANDBY_POLL_SECONDS", "0.01")
+    primary = LeaderLock(lock_path)
+    assert primary.try_acquire()
+    controller, _ = _controller(monkeypatch)
+    trade = {"entry": 1.0, "high": 1.0, "sold": 0.0, "opened_at": time.time(), "last_price": 1.0}
+
+    async def _run():
+        bot = controller.telegram_bot
+        task = asyncio.create_task(controller.run())
+        await _until(lambda: bot.client.is_connected())
+        await asyncio.sleep(0.05)
+        assert controller._first_poll_at is None
+        # Connected, but no GMGN fill is handled and nothing is written yet.
+        assert bot.standby and bot.client.handlers == []
+        bot.trades[OTHER_CONTRACT] = dict(trade)
+        bot._persist_trade(OTHER_CONTRACT)
+        # What the primary persisted before dying.
+        controller.state_store.add_seen(CONTRACT)
+        controller.state_store.save_trade(CONTRACT, trade)
+        primary.release()
+        await _until(lambda: controller._first_poll_at is not None)
+        assert not bot.standby
+        assert [handler for handler, _ in bot.client.handlers] == [bot._handle_gmgn_message]
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(_run())
+    assert CONTRACT in controller.seen_contracts
+    assert CONTRACT in controller.telegram_bot.trades
+    assert OTHER_CONTRACT not in controller.telegram_bot.trades
+    # Shutting down hands the lock on to the next standby.
+    assert LeaderLock(lock_path).try_acquire()
+
+
+def test_leader_lock_is_exclusive_until_released(tmp_path):
+    path = str(tmp_path / "lock")
+    first, second = LeaderLock(path), LeaderLock(path, poll_seconds=0.01)
+    assert first.try_acquire()
+    assert not second.try_acquire()
+
+    async def _run():
+        waiter = asyncio.create_task(second.acquire())
+        await asyncio.sleep(0.03)
+        assert not waiter.done()
+        first.release()
+        await asyncio.wait_for(waiter, 1.0)
+
+    asyncio.run(_run())
+    assert second.held
+    second.release()
@@ -0,0 +1,59 @@
+import asyncio
+import time
+
+from BrothersTrusts.CoinSniper.Shared.state import StateStore, open_state_store
+
+
+def test_state_store_round_trip(tmp_path):
+    path = str(tmp_path / "state.db")
+    store = StateStore(path)
+    store.save_trade("open", {"entry": 1.0, "high": 2.0, "sold": 0.3, "opened_at": 1.0, "last_price": 1.5})
+    store.save_trade("closed", {"entry": 1.0, "high": 1.0, "sold": 1.0, "opened_at": 1.0, "last_price": 0.5})
+    store.add_seen("open")
+    store.add_seen("closed")
+    store.close()
+
+    reopened = StateStore(path)
+    assert reopened.load_open_trades() == {
+        "open": {"entry": 1.0, "high": 2.0, "sold": 0.3, "opened_at": 1.0, "last_price": 1.5}
+    }
+    assert reopened.load_seen_contracts() == {"open", "closed"}
+    reopened.close()
+
+
+def test_state_store_writer_flushes_in_background(tmp_path):
+    store = StateStore(str(tmp_path / "state.db"), flush_seconds=0.01)
+    for tick in range(100):
+        store.save_trade("contract", {"sold": 0.0, "last_price": float(tick)})
+
+    deadline = time.time() + 2
+    while time.time() < deadline and store.load_open_trades().get("contract", {}).get("last_price") != 99.0:
+        time.sleep(0.01)
+    assert store.load_open_trades()["contract"]["last_price"] == 99.0
+    store.close()
+
+
+def test_telegram_bot_reloads_open_positions(monkeypatch):
+    from test_telegram_bot import _make_bot
+
+    bot = _make_bot(monkeypatch)
+
+    async def _query_price(contract):
+        return 0.25
+
+    async def _send_message(handle, message):
+        return None
+
+    bot.query_price = _query_price
+    bot.send_message = _send_message
+    async def _run():
+        await bot.buy_token("contract")
+        await bot.settle_entries()
+        await bot.sell_token("contract", 30, "test")
+
+    asyncio.run(_run())
+    open_state_store().close()
+
+    restarted = _make_bot(monkeypatch)
+    assert restarted.trades["contract"]["entry"] == 0.25
+    assert restarted.trades["contract"]["sold"] == 0.3
@@ -2,6 +2,10 @@ import asyncio
 import os
 import time
 
+import httpx
+
+from BrothersTrusts.CoinSniper.Shared.http import HttpTransport
+
 
 class DummyTelegramClient:
     def __init__(self, *args, **kwargs):
@@ -12,6 +16,9 @@ class DummyTelegramClient:
     def add_event_handler(self, handler, event):
         self.handlers.append((handler, event))
 
+    def remove_event_handler(self, handler, event=None):
+        self.handlers = [(other, event) for other, event in self.handlers if other != handler]
+
     def is_connected(self):
         return self.connected
 
@@ -32,17 +39,24 @@ def _make_bot(monkeypatch):
     monkeypatch.setenv("API_ID", "123")
     monkeypatch.setenv("API_HASH", "abc")
     monkeypatch.setenv("HELIUS_API_KEY", "helius")
+    # No per-chat spacing: tests that fire many sells should not sleep between them.
+    monkeypatch.setenv("TELEGRAM_CHAT_MESSAGES_PER_SECOND", "0")
 
     from BrothersTrusts.CoinSniper.Telegram import app as telegram_app
 
     monkeypatch.setattr(telegram_app, "TelegramClient", DummyTelegramClient)
-    return telegram_app.TelegramBot()
+    bot = telegram_app.TelegramBot()
+    # Never reach the real Helius from tests, even via the background monitor task.
+    bot.http = HttpTransport(transport=httpx.MockTransport(lambda request: httpx.Response(503)))
+    bot.http.max_retries = 0
+    return bot
 
 
 def test_extract_sol_contract(monkeypatch):
     bot = _make_bot(monkeypatch)
-    message = "Call: 7xKX9S8P9q9Jq9T8W2t7Z5mX3pQz1Yv4U9nH2aX"
-    assert bot.extract_sol_contract(message) == "7xKX9S8P9q9Jq9T8W2t7Z5mX3pQz1Yv4U9nH2aX"
+    message = "Call: 7GCihgDB8fe6KNjn2MYtkzZcRjQy3t9GHdC8uHYmW2hr"
+    assert bot.extract_sol_contract(message) == "7GCihgDB8fe6KNjn2MYtkzZcRjQy3t9GHdC8uHYmW2hr"
+    assert bot.extract_sol_contract("Call: 7xKX9S8P9q9Jq9T8W2t7Z5mX3pQz1Yv4U9nH2aX") is None
 
 
 def test_extract_token_price(monkeypatch):
@@ -59,6 +73,19 @@ def test_query_price_handles_error(monkeypatch):
     assert price == 0.0
 
 
+def test_helius_errors_do_not_print_the_api_key(monkeypatch, capsys):
+    bot = _make_bot(monkeypatch)
+    bot.helius_api_key = "s3cr3t-key"
+    bot.http = HttpTransport(transport=httpx.MockTransport(lambda request: httpx.Response(401)))
+    bot.http.max_retries = 0
+
+    assert asyncio.run(bot.query_price("contract")) == 0.0
+    assert asyncio.run(bot.query_prices(["contract"])) == {}
+    output = capsys.readouterr().out
+    assert "401" in output and "api-key=***" in output
+    assert "s3cr3t-key" not in output
+
+
 def test_take_profit_sell(monkeypatch):
     bot = _make_bot(monkeypatch)
     async def _send_message(handle, message):
@@ -145,3 +172,140 @@ def test_time_based_exit(monkeypatch):
 
     asyncio.run(_run())
     assert bot.trades[contract]["sold"] == 1.0
+
+
+def test_fetch_prices_sync_batches_in_chunks(monkeypatch):
+    import json
+
+    bot = _make_bot(monkeypatch)
+    bot.price_batch_size = 2
+    calls = []
+
+    def _handler(request):
+        payload = json.loads(request.content)
+        calls.append(payload)
+        assert request.url.params["api-key"] == "helius"
+        return httpx.Response(200, json={
+            "result": [
+                {"id": contract, "token_info": {"price_info": {"price_per_token": len(contract)}}}
+                for contract in payload["params"]["ids"]
+            ]
+        })
+
+    bot.http = HttpTransport(transport=httpx.MockTransport(_handler))
+    prices = bot._fetch_prices_sync(["a", "bb", "ccc"])
+
+    assert [call["method"] for call in calls] == ["getAssetBatch", "getAssetBatch"]
+    assert [call["params"]["ids"] for call in calls] == [["a", "bb"], ["ccc"]]
+    assert prices == {"a": 1.0, "bb": 2.0, "ccc": 3.0}
+
+
+def test_monitor_prices_evaluates_batched_price_map(monkeypatch):
+    bot = _make_bot(monkeypatch)
+    bot.price_poll_seconds = 0
+    requested = []
+    sells = []
+
+    async def _query_prices(contracts):
+        requested.append(sorted(contracts))
+        return {"open": 2.0, "closed": 2.0}
+
+    async def _send_message(handle, message):
+        sells.append(message)
+
+    bot.query_prices = _query_prices
+    bot.send_message = _send_message
+    bot.trades["open"] = {"entry": 1.0, "high": 1.0, "sold": 0.0, "opened_at": time.time(), "last_price": 1.0}
+    bot.trades["closed"] = {"entry": 1.0, "high": 1.0, "sold": 1.0, "opened_at": time.time(), "last_price": 1.0}
+
+    async def _run():
+        task = asyncio.create_task(bot.monitor_prices())
+        await asyncio.sleep(0.01)
+        task.cancel()
+
+    asyncio.run(_run())
+    assert requested[0] == ["open"]
+    assert sells[0] == "/sell open 30%"
+    assert bot.trades["open"]["high"] == 2.0
+    assert bot.trades["closed"]["high"] == 1.0
+
+
+def test_buy_token_records_signal_latency(monkeypatch):
+    from BrothersTrusts.CoinSniper.Shared.metrics import Metrics
+
+    bot = _make_bot(monkeypatch)
+    bot.metrics = Metrics()
+
+    async def _query_price(contract):
+        return 0.5
+
+    bot.query_price = _query_price
+    signal = {"handle": "caller", "created_at": time.time() - 3}
+
+    async def _run():
+        await bot.buy_token("contract", signal=signal)
+        await bot.settle_entries()
+
+    asyncio.run(_run())
+
+    assert bot.client.sent == [(bot.gmgn_bot, f"/buy contract {bot.buy_amount_sol}")]
+    assert bot.metrics.histogram("signal_to_buy", handle="caller").percentile(0.5) >= 2.9
+    assert bot.metrics.histogram("entry_price_capture", handle="caller", source="helius").count == 1
+    assert bot.metrics.histogram("telegram_send", command="buy").count == 1
+
+
+class DummyEvent:
+    def __init__(self, text):
+        self.message = type("Message", (), {"text": text})()
+
+
+def test_buy_token_does_not_wait_for_entry_price(monkeypatch):
+    bot = _make_bot(monkeypatch)
+    lookup_started = []
+    release = None
+
+    async def _query_price(contract):
+        lookup_started.append(contract)
+        await release.wait()
+        return 0.5
+
+    bot.query_price = _query_price
+    first = "7GCihgDB8fe6KNjn2MYtkzZcRjQy3t9GHdC8uHYmW2hr"
+    second = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
+
+    async def _run():
+        nonlocal release
+        release = asyncio.Event()
+        await bot.buy_token(first)
+        await bot.buy_token(second)
+        sent_before_prices = list(bot.client.sent)
+        release.set()
+        await bot.settle_entries()
+        return sent_before_prices
+
+    sent_before_prices = asyncio.run(_run())
+    assert [message for _, message in sent_before_prices] == [
+        f"/buy {first} {bot.buy_amount_sol}",
+        f"/buy {second} {bot.buy_amount_sol}",
+    ]
+    assert bot.trades[first]["entry"] == 0.5
+    assert bot.trades[first]["entry_source"] == "helius"
+
+
+def test_gmgn_confirmation_replaces_helius_estimate(monkeypatch):
+    bot = _make_bot(monkeypatch)
+    contract = "7GCihgDB8fe6KNjn2MYtkzZcRjQy3t9GHdC8uHYmW2hr"
+
+    async def _query_price(contract):
+        return 0.5
+
+    bot.query_price = _query_price
+
+    async def _run():
+        await bot.buy_token(contract)
+        await bot.settle_entries()
+        await bot._handle_gmgn_message(DummyEvent(f"Bought {contract} Price $0.48"))
+
+    asyncio.run(_run())
+    assert bot.trades[contract]["entry"] == 0.48
+    assert bot.trades[contract]["entry_source"] == "gmgn"
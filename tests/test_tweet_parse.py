@@ -0,0 +1,120 @@
+import asyncio
+import glob
+import json
+import os
+
+import httpx
+import pytest
+
+from test_twitter_client import _make_client
+
+from BrothersTrusts.CoinSniper.Twitter.app import tweet_record
+from BrothersTrusts.CoinSniper.Twitter.parse import TweetStreamParser, iter_logged_tweets, iter_tweet_file, iter_tweets
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRICKY_PAGE = (
+    b'{"tweets": [{"user": {"bio": "a } b ] \\" {", "tags": [[1, {"x": []}], "]"]}, '
+    b'"id_str": "7", "created_at": null, "view_count": 12345, '
+    b'"full_text": "caf\\u00e9 \\"quoted\\"\\nnext", "entities": [], '
+    b'"quoted_status": {"full_text": "inner", "user": {"full_text": "not this"}}, '
+    b'"retweeted_status": null}], "next_cursor": "c2"}\n'
+    b'{"tweets": [], "next_cursor": "c3"}'
+)
+
+
+def _chunks(data, size):
+    return [data[index:index + size] for index in range(0, len(data), size)]
+
+
+def _recorded_tweets(payload):
+    if isinstance(payload, list):
+        for page in payload:
+            yield from _recorded_tweets(page)
+        return
+    yield from payload.get("tweets", [])
+    for page in payload.get("test_data", []):
+        yield from _recorded_tweets(page)
+
+
+@pytest.mark.parametrize("path", [os.path.join(REPO_ROOT, "results.json")] + glob.glob(
+    os.path.join(REPO_ROOT, "Twitter-Test-Data", "*.json")
+))
+def test_records_match_tweet_record_on_recorded_dumps(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    tweets = list(_recorded_tweets(json.loads(data)))
+    expected = [tweet_record(tweet) for tweet in tweets]
+    compact = json.dumps(json.loads(data), separators=(",", ":")).encode()
+    for chunk_size in (1, 7, 4096):
+        assert list(iter_tweets(_chunks(data, chunk_size))) == expected
+        assert list(iter_tweets(_chunks(compact, chunk_size))) == expected
+    recorded = list(iter_tweet_file(path, chunk_size=333))
+    assert [record["screen_name"] for record in recorded] == [tweet["user"]["screen_name"] for tweet in tweets]
+
+
+def test_keeps_only_the_tweet_fields_across_chunk_boundaries():
+    expected = {
+        "id_str": "7",
+        "created_at": None,
+        "full_text": 'café "quoted"\nnext',
+        "quoted_text": "inner",
+        "retweeted_text": "",
+    }
+    for chunk_size in range(1, 12):
+        parser = TweetStreamParser()
+        records = [record for chunk in _chunks(TRICKY_PAGE, chunk_size) for record in parser.feed(chunk)]
+        records += parser.close()
+        assert records == [expected]
+        assert parser.fields == {"next_cursor": "c3"}
+
+    with pytest.raises(ValueError):
+        list(iter_tweets([TRICKY_PAGE[:-5]]))
+    with pytest.raises(ValueError):
+        list(iter_tweets([b'{"tweets": [}']))
+
+
+def test_skipped_subtrees_stream_in_constant_memory():
+    user = json.dumps({"followers": list(range(20000)), "names": ["x" * 20] * 2000}).encode()
+    page = b'{"tweets": [{"user": ' + user + b', "id_str": "1", "full_text": "gm"}]}'
+    parser = TweetStreamParser()
+    records, largest = [], 0
+    for chunk in _chunks(page, 512):
+        records += parser.feed(chunk)
+        largest = max(largest, len(parser._buffer))
+    records += parser.close()
+    assert [record["full_text"] for record in records] == ["gm"]
+    assert len(page) > 100_000 and largest < 1024
+
+
+def test_streamed_fetch_matches_buffered_fetch(monkeypatch):
+    with open(os.path.join(REPO_ROOT, "results.json"), "rb") as f:
+        body = f.read()
+    attempts = []
+
+    async def handler(request):
+        attempts.append(request.url.path)
+        if len(attempts) == 1:
+            return httpx.Response(503)
+        return httpx.Response(200, content=body)
+
+    async def _fetch(client):
+        try:
+            return await client._fetch_tweet_page("elonmusk", "44196397")
+        finally:
+            await client.http.aclose()
+
+    buffered = asyncio.run(_fetch(_make_client(monkeypatch, handler)))
+    monkeypatch.setenv("TWEET_STREAM_PARSE", "1")
+    attempts.clear()
+    streamed = asyncio.run(_fetch(_make_client(monkeypatch, handler)))
+    assert len(attempts) == 2  # the 503 was retried before anything was parsed
+    assert streamed == buffered and len(streamed[0]) == 20
+
+
+def test_logged_tweets_are_read_line_by_line():
+    path = glob.glob(os.path.join(REPO_ROOT, "twitter_log_*.txt"))[0]
+    tweets = list(iter_logged_tweets(path))
+    assert len(tweets) == 422
+    assert tweets[0]["full_text"].startswith("Paid private group is here!")
+    assert tweets[0]["full_text"].endswith("https://pbs.twimg.com/media/GjTjD00XsAAEipp.jpg")
+    assert "\n\nIf you want in" in tweets[0]["full_text"]
@@ -0,0 +1,100 @@
+import asyncio
+import time
+
+import httpx
+
+
+def _scheduler(monkeypatch, handles, **env):
+    from BrothersTrusts.CoinSniper.Twitter.scheduler import TweetScheduler
+
+    for key, value in env.items():
+        monkeypatch.setenv(key, str(value))
+    return TweetScheduler(handles)
+
+
+def test_priorities_split_the_request_budget(monkeypatch):
+    scheduler = _scheduler(
+        monkeypatch, ["alpha", "beta", "gamma"],
+        TWEETSCOUT_RPM=60, TWEET_MIN_INTERVAL=0, TWITTER_PRIORITIES="@Alpha:2",
+    )
+
+    # 1 request/s split 2:1:1 -> alpha every 2 s, the others every 4 s.
+    assert abs(scheduler.interval("alpha", now=0) - 2.0) < 1e-9
+    assert abs(scheduler.interval("beta", now=0) - 4.0) < 1e-9
+    assert sum(1 / scheduler.interval(h, now=0) for h in scheduler.user_handles) <= 1.0 + 1e-9
+
+
+def test_recent_contract_boosts_handle_and_decays(monkeypatch):
+    scheduler = _scheduler(
+        monkeypatch, ["alpha", "beta"],
+        TWEET_MIN_INTERVAL=0, TWEET_RECENCY_BOOST=4, TWEET_RECENCY_HALF_LIFE=100,
+    )
+    before = scheduler.interval("alpha", now=1000)
+
+    scheduler.record_contract("alpha", posted_at=1000)
+
+    assert abs(scheduler.weight("alpha", now=1000) - 5.0) < 1e-9
+    assert abs(scheduler.weight("alpha", now=1100) - 3.0) < 1e-9
+    assert scheduler.interval("alpha", now=1000) < before
+    assert scheduler.interval("beta", now=1000) > before
+
+
+def test_rate_limit_headers_pause_the_bucket(monkeypatch):
+    scheduler = _scheduler(monkeypatch, ["alpha"], TWEETSCOUT_RATE_LIMIT_PAUSE=30)
+
+    scheduler.observe_response(httpx.Response(429, headers={"Retry-After": "7"}))
+    assert 6 < scheduler.blocked_until - time.monotonic() <= 7
+
+    scheduler.blocked_until = 0.0
+    reset_at = time.time() + 12
+    scheduler.observe_response(httpx.Response(200, headers={
+        "X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(reset_at),
+    }))
+    assert 11 < scheduler.blocked_until - time.monotonic() <= 12
+
+    scheduler.blocked_until = 0.0
+    scheduler.observe_response(httpx.Response(200, headers={
+        "X-RateLimit-Remaining": "3", "X-RateLimit-Reset": "60",
+    }))
+    assert scheduler.blocked_until == 0.0
+
+
+def test_acquire_spends_burst_then_waits_for_refill(monkeypatch):
+    scheduler = _scheduler(monkeypatch, ["alpha"], TWEETSCOUT_RPM=1200, TWEETSCOUT_BURST=2)
+
+    async def _take(count):
+        started = time.perf_counter()
+        for _ in range(count):
+            await scheduler.acquire()
+        return time.perf_counter() - started
+
+    # Two tokens are free; the third waits ~1/20 s for the bucket to refill.
+    assert asyncio.run(_take(3)) >= 0.04
+
+
+def test_run_polls_weighted_handles_and_gates_requests(monkeypatch):
+    scheduler = _scheduler(
+        monkeypatch, ["alpha", "beta"],
+        TWEETSCOUT_RPM=6000, TWEETSCOUT_BURST=1, TWEET_MIN_INTERVAL=0,
+        TWITTER_PRIORITIES="alpha:3",
+    )
+    polls = []
+
+    async def _poll(handle):
+        await scheduler.acquire()
+        polls.append(handle)
+
+    async def _run():
+        task = asyncio.create_task(scheduler.run(_poll))
+        await asyncio.sleep(0.5)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(_run())
+
+    # 100 requests/s shared 3:1, never more than the bucket allows.
+    assert polls.count("alpha") > 2 * polls.count("beta") > 0
+    assert len(polls) <= 0.5 * 100 + 2
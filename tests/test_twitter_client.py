@@ -0,0 +1,145 @@
+import asyncio
+import json
+import time
+
+import httpx
+
+
+def _make_client(monkeypatch, handler, max_concurrency="10", cache_path="", sync_handler=None):
+    monkeypatch.setenv("TWEET_SCOUT_API_KEY", "scout")
+    monkeypatch.setenv("TWEET_MAX_CONCURRENCY", max_concurrency)
+    monkeypatch.setenv("USER_ID_CACHE_PATH", str(cache_path))
+    monkeypatch.setenv("HTTP_BACKOFF_BASE", "0.001")
+
+    from BrothersTrusts.CoinSniper.Shared.http import HttpTransport
+    from BrothersTrusts.CoinSniper.Twitter import app as twitter_app
+
+    client = twitter_app.TwitterClient()
+    client.http = HttpTransport(
+        transport=httpx.MockTransport(sync_handler or (lambda request: httpx.Response(500))),
+        async_transport=httpx.MockTransport(handler),
+    )
+    return client
+
+
+def test_fetch_new_tweets_reports_missing_user_id(monkeypatch):
+    async def handler(request):
+        return httpx.Response(404)
+
+    client = _make_client(monkeypatch, handler)
+
+    assert asyncio.run(client.fetch_new_tweets("ghost")) == (None, [])
+
+
+def test_last_seen_waits_until_the_pages_reach_it(monkeypatch):
+    pages = {
+        None: {"tweets": [{"id_str": "30"}, {"id_str": "29"}], "next_cursor": "p2"},
+        "p2": {"tweets": [{"id_str": "28"}, {"id_str": "20"}], "next_cursor": "p3"},
+    }
+    failing = {"p2"}
+
+    async def handler(request):
+        if "handle-to-id" in request.url.path:
+            return httpx.Response(200, json={"id": "1"})
+        cursor = json.loads(request.content).get("cursor")
+        if cursor in failing:
+            return httpx.Response(500)
+        return httpx.Response(200, json=pages[cursor])
+
+    monkeypatch.setenv("HTTP_MAX_RETRIES", "0")
+    client = _make_client(monkeypatch, handler)
+    client.last_seen_tweet_ids["caller"] = 20
+
+    async def _run():
+        first = await client.fetch_new_tweets("caller")
+        assert client.last_seen_tweet_ids["caller"] == 20  # page two failed: 21-28 unread
+        failing.clear()
+        second = await client.fetch_new_tweets("caller")
+        return first, second
+
+    (_, first), (_, second) = asyncio.run(_run())
+    assert [tweet["id_str"] for tweet in first] == ["30", "29"]
+    assert [tweet["id_str"] for tweet in second] == ["30", "29", "28"]
+    assert client.last_seen_tweet_ids["caller"] == 30
+
+
+def test_user_id_cache_persists_across_clients(monkeypatch, tmp_path):
+    cache_path = tmp_path / "user_ids.json"
+    lookups = []
+
+    async def handler(request):
+        lookups.append(request.url.path)
+        return httpx.Response(200, json={"id": "42"})
+
+    first = _make_client(monkeypatch, handler, cache_path=cache_path)
+    assert asyncio.run(first.async_get_user_id("Caller")) == "42"
+    # Writes are batched off the event loop; shutting down writes the rest.
+    assert not cache_path.exists()
+    first.user_id_cache.close()
+
+    second = _make_client(monkeypatch, handler, cache_path=cache_path)
+    assert asyncio.run(second.async_get_user_id("@caller")) == "42"
+    assert len(lookups) == 1
+
+
+def test_user_id_cache_writes_in_the_background(tmp_path):
+    from BrothersTrusts.CoinSniper.Twitter.cache import UserIdCache
+
+    path = tmp_path / "user_ids.json"
+    cache = UserIdCache(str(path), flush_seconds=0.01)
+    cache.set("caller", "42")
+    deadline = time.monotonic() + 2.0
+    while not path.exists():
+        assert time.monotonic() < deadline, "cache was never written"
+        time.sleep(0.01)
+    cache.set("other", None)
+    cache.close()
+    assert UserIdCache(str(path)).get("other") is None
+
+
+def test_user_id_cache_negative_entries_expire(monkeypatch):
+    lookups = []
+
+    async def handler(request):
+        lookups.append(request.url.path)
+        return httpx.Response(404)
+
+    client = _make_client(monkeypatch, handler)
+    client.user_id_cache.negative_ttl_seconds = 0.05
+
+    async def _run():
+        await client.async_get_user_id("ghost")
+        await client.async_get_user_id("ghost")
+        await asyncio.sleep(0.06)
+        await client.async_get_user_id("ghost")
+
+    asyncio.run(_run())
+    assert len(lookups) == 2
+
+
+def test_user_id_cache_skips_transient_failures(monkeypatch):
+    from BrothersTrusts.CoinSniper.Twitter.cache import MISSING
+
+    for status in (401, 402, 403, 429, 503):
+        async def handler(request, status=status):
+            return httpx.Response(status)
+
+        client = _make_client(monkeypatch, handler)
+        asyncio.run(client.async_get_user_id("caller"))
+        assert client.user_id_cache.get("caller") is MISSING, status
+
+
+def test_warm_user_ids_resolves_concurrently(monkeypatch):
+    async def handler(request):
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"id": request.url.path.rsplit("/", 1)[-1] + "-id"})
+
+    client = _make_client(monkeypatch, handler, max_concurrency="8")
+
+    started = time.perf_counter()
+    user_ids = asyncio.run(client.async_warm_user_ids([f"user{i}" for i in range(8)]))
+    elapsed = time.perf_counter() - started
+
+    assert user_ids["user3"] == "user3-id"
+    assert elapsed < 0.05 * 4
+    assert client.user_id_cache.get("user3") == "user3-id"